@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+#
+# Benchmark of the JSON codecs on realistic pages of the paginated endpoints:
+# generic decoding (dictionaries) and schema-aware decoding (entity models).
+#
+# usage: PYTHONPATH=. python benchmarks/bench_codecs.py [pages]
+#
+
+import sys
+import timeit
+
+from typing import Any, Dict, List
+
+from pyDUDe.codec import CODECS, getCodec
+from pyDUDe.config import MAX_SEARCH_LIMIT
+from pyDUDe.models import User, UserRight
+
+
+#----- Functions
+def usersPage(offset: int) -> Dict[str, Any]:
+    """A full page of users, as returned by GET /users"""
+    users = [
+        { 'id': i, 'name': f'User number {i}', 'email': f'user.number{i}@acme-corporation.com', 'team_id': 1 + i % 40 }
+        for i in range(offset, offset + MAX_SEARCH_LIMIT)
+    ]
+    return { 'users': users, 'count': len(users), 'limit': MAX_SEARCH_LIMIT, 'offset': offset }
+
+
+def userRightsPage(offset: int) -> Dict[str, Any]:
+    """A full page of user-rights, as returned by GET /user-rights"""
+    items = [
+        { 'id': i, 'user_id': 1 + i // 4, 'right_id': 1 + i % 25 }
+        for i in range(offset, offset + MAX_SEARCH_LIMIT)
+    ]
+    return { 'user-rights': items, 'count': len(items), 'limit': MAX_SEARCH_LIMIT, 'offset': offset }
+
+
+def measure(fn, number: int) -> float:
+    """Return the best time in milliseconds"""
+    return min(timeit.Timer(fn).repeat(repeat=5, number=number)) * 1e3
+
+
+#----- Main
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    encoder = getCodec('json')
+    payloads = {
+        'users': ([encoder.encode(usersPage(1 + i * MAX_SEARCH_LIMIT)) for i in range(count)], User),
+        'user-rights': ([encoder.encode(userRightsPage(1 + i * MAX_SEARCH_LIMIT)) for i in range(count)], UserRight),
+    }
+
+    print(f"{count} pages of {MAX_SEARCH_LIMIT} records, best of 5 (ms)")
+    print(f"{'codec':<10}{'endpoint':<14}{'dicts':>10}{'models':>10}{'encode':>10}")
+
+    for name in CODECS:
+        codec = getCodec(name)
+        for key, (pages, model) in payloads.items():
+            objects: List[Any] = [codec.decode(page) for page in pages]
+
+            decode = measure(lambda: [codec.decode(page) for page in pages], 1)
+            models = measure(lambda: [codec.decodePage(page, key, model) for page in pages], 1)
+            encode = measure(lambda: [codec.encode(obj) for obj in objects], 1)
+
+            print(f"{name:<10}{key:<14}{decode:>10.2f}{models:>10.2f}{encode:>10.2f}")
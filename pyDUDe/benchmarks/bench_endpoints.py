@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+
+#
+# Benchmark of the endpoints against the local stub of the DUDe server:
+# latency (p50/p95/p99) of validate, getSingleUser and createUser, and
+# throughput of the full scans of getAllUsers and getAllUserRights, for each
+# transport (plain, pooled, async) and concurrency level.
+#
+# The results are written as JSON, to compare them from one release to another.
+#
+# usage: PYTHONPATH=. python benchmarks/bench_endpoints.py [--calls N] [--concurrency 1,4,16]
+#                                                         [--transports plain,pooled,async]
+#                                                         [--users N] [--scans N] [--latency S]
+#                                                         [--output FILE]
+#
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import requests
+
+import pyDUDe
+
+from pyDUDe.stub import StubServer
+
+
+#----- Globals
+TRANSPORTS = ('plain', 'pooled', 'async')
+CALLS = ('validate', 'getSingleUser', 'createUser')
+SCANS = ('getAllUsers', 'getAllUserRights')
+
+APPNAME = 'Software 1.1'
+RIGHTS = 3
+
+
+#----- Classes
+class PlainClient(pyDUDe.Client):
+    """Client opening a new connection for each request (no connection pool)"""
+
+    def _getSession(self) -> Any:
+        return requests
+
+
+class Workload:
+    """The arguments of the calls of the benchmark, the n-th call using the n-th arguments"""
+
+    def __init__(self, server: StubServer, token: str) -> None:
+        directory = server.directory
+        self.token = token
+        self.emails = [user['email'] for user in directory.tables['users'].values()]
+        self.user_ids = list(directory.tables['users'])
+        self.team_id = next(iter(directory.tables['teams']))
+
+    def validate(self, n: int) -> Dict[str, Any]:
+        # one decision out of four is a denial (unknown right)
+        right = f'right{n % (RIGHTS + 1) + 1}'
+        return { 'email': self.emails[n % len(self.emails)], 'right': right, 'token': self.token }
+
+    def getSingleUser(self, n: int) -> Dict[str, Any]:
+        return { 'user_id': self.user_ids[n % len(self.user_ids)] }
+
+    def createUser(self, n: int) -> Dict[str, Any]:
+        return { 'team_id': self.team_id, 'name': f'Bench {n}', 'email': f'bench.{n}@benchmark.com' }
+
+
+#----- Functions
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """Return the mean and the p50/p95/p99 latencies in milliseconds"""
+    if len(latencies) < 2:
+        latencies = latencies * 2
+
+    q = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'mean_ms': statistics.fmean(latencies) * 1e3,
+        'p50_ms': q[49] * 1e3,
+        'p95_ms': q[94] * 1e3,
+        'p99_ms': q[98] * 1e3
+    }
+
+
+def callResult(transport: str, endpoint: str, concurrency: int, latencies: List[float],
+               errors: int, elapsed: float) -> Dict[str, Any]:
+    """Build the result of a latency measure"""
+    return {
+        'transport': transport,
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'calls': len(latencies),
+        'errors': errors,
+        'seconds': elapsed,
+        'calls_per_s': len(latencies) / elapsed,
+        **percentiles(latencies)
+    }
+
+
+def scanResult(transport: str, endpoint: str, scans: int, records: int, elapsed: float) -> Dict[str, Any]:
+    """Build the result of a throughput measure"""
+    return {
+        'transport': transport,
+        'endpoint': endpoint,
+        'scans': scans,
+        'records': records,
+        'seconds': elapsed,
+        'records_per_s': records / elapsed
+    }
+
+
+def runCalls(fn: Callable[[int], Any], calls: int, concurrency: int) -> Dict[str, Any]:
+    """Run the calls from several threads, each call with its own index
+
+    Returns:
+        The latencies (seconds) of the calls, the number of errors and the elapsed time
+    """
+    counter = itertools.count()
+
+    # each worker keeps its own latencies and errors, summed after the join
+    def worker() -> Tuple[List[float], int]:
+        latencies: List[float] = []
+        errors = 0
+        for n in iter(counter.__next__, None):
+            if n >= calls:
+                break
+
+            start = time.perf_counter()
+            try:
+                fn(n)
+            except Exception:
+                errors += 1
+
+            latencies.append(time.perf_counter() - start)
+
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        runs = [future.result() for future in [executor.submit(worker) for _ in range(concurrency)]]
+
+    return { 'latencies': [latency for latencies, _ in runs for latency in latencies],
+             'errors': sum(errors for _, errors in runs), 'elapsed': time.perf_counter() - start }
+
+
+async def runCallsAsync(fn: Callable[[int], Any], calls: int, concurrency: int) -> Dict[str, Any]:
+    """Run the calls from several tasks, each call with its own index
+
+    Returns:
+        The latencies (seconds) of the calls, the number of errors and the elapsed time
+    """
+    counter = itertools.count()
+
+    async def worker() -> Tuple[List[float], int]:
+        latencies: List[float] = []
+        errors = 0
+        for n in iter(counter.__next__, None):
+            if n >= calls:
+                break
+
+            start = time.perf_counter()
+            try:
+                await fn(n)
+            except Exception:
+                errors += 1
+
+            latencies.append(time.perf_counter() - start)
+
+        return latencies, errors
+
+    start = time.perf_counter()
+    runs = await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+    return { 'latencies': [latency for latencies, _ in runs for latency in latencies],
+             'errors': sum(errors for _, errors in runs), 'elapsed': time.perf_counter() - start }
+
+
+def benchSync(transport: str, client: pyDUDe.Client, workload: Workload, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Measure the endpoints with a synchronous client"""
+    results = []
+
+    for endpoint in SCANS:
+        scan = getattr(client, endpoint)
+        sum(1 for _ in scan())
+        start = time.perf_counter()
+        records = sum(sum(1 for _ in scan()) for _ in range(args.scans))
+        results.append(scanResult(transport, endpoint, args.scans, records, time.perf_counter() - start))
+
+    for endpoint in CALLS:
+        call = getattr(client, endpoint)
+        arguments = getattr(workload, endpoint)
+        for concurrency in args.concurrency:
+            # distinct indexes for each run (createUser needs unique emails)
+            offset = len(results) * (args.calls + args.warmup)
+            runCalls(lambda n: call(**arguments(offset + n)), args.warmup, concurrency)
+            run = runCalls(lambda n: call(**arguments(offset + args.warmup + n)), args.calls, concurrency)
+            results.append(callResult(transport, endpoint, concurrency, run['latencies'], run['errors'], run['elapsed']))
+
+    return results
+
+
+async def benchAsync(config: pyDUDe.DUDeConfig, workload: Workload, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Measure the endpoints with the asyncio client"""
+    results = []
+
+    async def count(iterator) -> int:
+        return sum([1 async for _ in iterator])
+
+    async with pyDUDe.AsyncClient(config) as client:
+        for endpoint in SCANS:
+            scan = getattr(client, endpoint)
+            await count(scan())
+            start = time.perf_counter()
+            records = 0
+            for _ in range(args.scans):
+                records += await count(scan())
+            results.append(scanResult('async', endpoint, args.scans, records, time.perf_counter() - start))
+
+        for endpoint in CALLS:
+            call = getattr(client, endpoint)
+            arguments = getattr(workload, endpoint)
+            for concurrency in args.concurrency:
+                offset = len(results) * (args.calls + args.warmup)
+                await runCallsAsync(lambda n: call(**arguments(offset + n)), args.warmup, concurrency)
+                run = await runCallsAsync(lambda n: call(**arguments(offset + args.warmup + n)), args.calls, concurrency)
+                results.append(callResult('async', endpoint, concurrency, run['latencies'], run['errors'], run['elapsed']))
+
+    return results
+
+
+def prepare(server: StubServer, args: argparse.Namespace) -> Workload:
+    """Fill the stub server and request the token used by validate"""
+    server.reset()
+    server.populate(companies=1, units=2, teams=5, users=args.users, rights=RIGHTS)
+
+    with pyDUDe.Client(server.config()) as client:
+        token = client.authenticate(appname=APPNAME, apikey='key')
+
+    server.inject(latency=args.latency)
+    return Workload(server, token)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the benchmark for all the transports"""
+    results: List[Dict[str, Any]] = []
+
+    with StubServer() as server:
+        # the retries and the circuit breaker would hide the errors, and the
+        # pool must keep a connection for each thread
+        config = server.config(
+            retry_attempts=1,
+            circuit_breaker=False,
+            pool_maxsize=max(args.concurrency)
+        )
+
+        for transport in args.transports:
+            workload = prepare(server, args)
+            print(f"{transport}...", file=sys.stderr)
+
+            if transport == 'async':
+                results += asyncio.run(benchAsync(config, workload, args))
+
+            else:
+                factory = PlainClient if transport == 'plain' else pyDUDe.Client
+                with factory(config) as client:
+                    results += benchSync(transport, client, workload, args)
+
+    return {
+        'version': pyDUDe.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'parameters': {
+            'calls': args.calls,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'users': args.users * 10,
+            'scans': args.scans,
+            'latency': args.latency
+        },
+        'results': results
+    }
+
+
+def summary(report: Dict[str, Any]) -> None:
+    """Print the results as a table"""
+    print(f"{'transport':<10}{'endpoint':<18}{'conc.':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'calls/s':>10}{'errors':>8}",
+          file=sys.stderr)
+
+    for result in report['results']:
+        if 'records' in result:
+            print(f"{result['transport']:<10}{result['endpoint']:<18}{'':>6}"
+                  f"{result['records_per_s']:>30.0f} records/s", file=sys.stderr)
+        else:
+            print(f"{result['transport']:<10}{result['endpoint']:<18}{result['concurrency']:>6}"
+                  f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                  f"{result['calls_per_s']:>10.0f}{result['errors']:>8}", file=sys.stderr)
+
+
+#----- Main
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the endpoints against the stub server")
+    parser.add_argument('--calls', type=int, default=1000, help="measured calls per endpoint and concurrency level")
+    parser.add_argument('--warmup', type=int, default=50, help="calls before the measure")
+    parser.add_argument('--concurrency', type=lambda value: [int(v) for v in value.split(',')], default=[1, 4, 16],
+                        help="comma-separated concurrency levels")
+    parser.add_argument('--transports', type=lambda value: value.split(','), default=list(TRANSPORTS),
+                        help="comma-separated transports: plain, pooled, async")
+    parser.add_argument('--users', type=int, default=100, help="users per team (10 teams)")
+    parser.add_argument('--scans', type=int, default=3, help="measured full scans per paginated endpoint")
+    parser.add_argument('--latency', type=float, default=0.0, help="latency (seconds) added by the server")
+    parser.add_argument('--output', default='-', help="JSON file of the results (- for stdout)")
+    args = parser.parse_args()
+
+    unknown = set(args.transports) - set(TRANSPORTS)
+    if unknown:
+        parser.error(f"unknown transports: {', '.join(sorted(unknown))}")
+
+    report = run(args)
+    summary(report)
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
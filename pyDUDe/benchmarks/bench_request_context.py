@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+#
+# Micro-benchmark of the per-call overhead of the request preparation
+# (URL, headers, root CA and client certificate) on the validate() path.
+#
+# usage: PYTHONPATH=. python benchmarks/bench_request_context.py [iterations]
+#
+
+import sys
+import timeit
+
+from typing import Any, Dict, Optional, Tuple
+
+import pyDUDe
+
+
+#----- Classes
+class LegacyClient:
+    """The request preparation as done before the request context"""
+
+    def __init__(self, config: pyDUDe.DUDeConfig) -> None:
+        self._config = config
+
+    def _url(self, endpoint: str, *, path: str = "") -> str:
+        value = f"{self._config.scheme}://{self._config.hostname}:{self._config.port}/{endpoint}"
+        if len(path) > 0:
+            value = f"{value}/{path}"
+
+        return value
+
+    def _verify(self) -> Optional[str]:
+        if self._config.root_ca != '':
+            return self._config.root_ca
+        else:
+            return None
+
+    def _cert(self) -> Optional[Tuple[str, str]]:
+        if (self._config.certfile != '') and (self._config.keyfile != ''):
+            return (self._config.certfile, self._config.keyfile)
+        else:
+            return None
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {}
+        if self._config.x_api_token != '':
+            headers['X-API-Token'] = self._config.x_api_token
+
+        return headers
+
+    def prepare(self) -> Tuple[str, Dict[str, Any]]:
+        url = self._url('validate')
+        kwargs = {
+            'headers': self._headers(),
+            'verify': self._verify(),
+            'cert': self._cert()
+        }
+
+        return url, kwargs
+
+
+#----- Functions
+def prepare(client: pyDUDe.Client) -> Tuple[str, Dict[str, Any]]:
+    """The request preparation with the request context (as in validate and Client._request)"""
+    url = client._url('validate')
+    kwargs = client._context().kwargs
+
+    return url, kwargs
+
+
+def measure(fn, iterations: int) -> float:
+    """Return the best time per call in nanoseconds"""
+    timer = timeit.Timer(fn)
+    return min(timer.repeat(repeat=7, number=iterations)) / iterations * 1e9
+
+
+#----- Main
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    client = pyDUDe.Client()
+    client.config = pyDUDe.DUDeConfig(
+        x_api_token='7d9b4c4e-0d3c-4c43-9d2f-6d1f0c1a2b3c',
+        hostname='dude.acme.com',
+        certfile='/etc/ssl/client.pem',
+        keyfile='/etc/ssl/client.key',
+        root_ca='/etc/ssl/root_ca.pem'
+    )
+    legacy = LegacyClient(client.config)
+
+    # both must prepare the same request
+    assert legacy.prepare() == prepare(client)
+
+    before = measure(legacy.prepare, iterations)
+    after = measure(lambda: prepare(client), iterations)
+
+    print(f"before : {before:8.1f} ns/call")
+    print(f"after  : {after:8.1f} ns/call")
+    print(f"gain   : {before - after:8.1f} ns/call ({(1 - after / before) * 100:.0f}%)")
@@ -13,10 +13,15 @@
 
 #----- Imports
 from .core import Client
+from .aio import AsyncClient
 from .config import DUDeConfig
+from .replica import DirectoryReplica
+from .evaluator import LocalEvaluator
+from .auth import TokenManager
 
 from . import exceptions
 from . import endpoints
+from . import models
 
 
 #----- Globals
@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	The asyncio client for the DUDe python library
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import asyncio
+import ssl
+import time
+
+from .config import DUDeConfig
+from .balancer import Server
+from .core import BaseClient, T_Expect
+from .deadline import remaining
+from .flight import AsyncSingleFlight
+from .metrics import Measure, currentEndpoint
+from .paginator import AsyncPaginator
+from .scan import AsyncScanner
+from . import exceptions
+
+try:
+    import aiohttp
+except ImportError:     # pragma: no cover
+    aiohttp = None
+
+
+#----- Class
+class AsyncClient(BaseClient):
+    """Asyncio client to access the DUDe server
+
+    All the endpoints available on Client are available on this client as coroutines,
+    while the paginated endpoints return asynchronous iterators.
+
+        async with AsyncClient(config) as client:
+            if await client.validate(email=email, right='read', token=token):
+                ...
+
+            async for user in client.getAllUsers():
+                ...
+    """
+
+    # the errors of the transport for an expired timeout
+    _timeout_errors = (TimeoutError, asyncio.TimeoutError)
+
+    def __init__(self, config: Optional[DUDeConfig] = None) -> None:
+        if aiohttp is None:
+            raise ImportError("Error: the AsyncClient requires the aiohttp package.")
+
+        self._setupBase(config or DUDeConfig())
+        self._flights = AsyncSingleFlight(self._timedOut)
+
+        # pooled HTTP session (created on first request)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._stale: List[aiohttp.ClientSession] = []
+        self._inflight: Dict[aiohttp.ClientSession, int] = {}
+        self._stats: Dict[str, int] = { 'created': 0, 'reused': 0 }
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def _configChanged(self) -> None:
+        """Retire the current session when a new configuration is set
+
+        The retired session is closed once the requests started on it are done.
+        """
+        if self._session is not None:
+            self._stale.append(self._session)
+            self._session = None
+
+    def _sslContext(self) -> Union[bool, ssl.SSLContext]:
+        """Create the SSL context from the certificates of the configuration
+
+        Returns:
+            True to use the default verification, a SSLContext otherwise
+        """
+        cafile = self._verify()
+        cert = self._cert()
+        if (cafile is None) and (cert is None):
+            return True
+
+        context = ssl.create_default_context(cafile=cafile)
+        if cert is not None:
+            context.load_cert_chain(*cert)
+
+        return context
+
+    def _newSession(self) -> aiohttp.ClientSession:
+        """Create a new HTTP session with a connection pool sized from the configuration
+
+        Returns:
+            An aiohttp ClientSession object
+        """
+        # without pool_block, the number of connections is not capped (like requests)
+        limit = self._config.pool_maxsize if self._config.pool_block else 0
+
+        connector = aiohttp.TCPConnector(
+            limit=0,
+            limit_per_host=limit,
+            keepalive_timeout=self._config.pool_keepalive,
+            ssl=self._sslContext()
+        )
+
+        # keep track of the connections
+        async def on_create(session, context, params):
+            self._stats['created'] += 1
+
+        async def on_reuse(session, context, params):
+            self._stats['reused'] += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+
+    async def _closeIdle(self) -> None:
+        """Close the retired sessions without requests in progress"""
+        for session in [session for session in self._stale if not self._inflight.get(session)]:
+            self._stale.remove(session)
+            await session.close()
+
+    async def _getSession(self) -> aiohttp.ClientSession:
+        """Return the pooled session, closing the idle retired ones if any"""
+        if self._stale:
+            await self._closeIdle()
+
+        if self._session is None:
+            self._session = self._newSession()
+
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled session and all its connections"""
+        self._configChanged()
+        while self._stale:
+            await self._stale.pop().close()
+
+    def poolStats(self) -> Dict[str, int]:
+        """Return the statistics of the connection pool
+
+        Returns:
+            A dictionary with the number of connections created, the number of requests
+            that reused an existing connection and the number of idle connections
+        """
+        stats = dict(self._stats)
+        stats['idle'] = 0
+
+        if self._session is not None:
+            conns = getattr(self._session.connector, '_conns', {})
+            stats['idle'] = sum(len(value) for value in conns.values())
+
+        return stats
+
+    async def _request(self, *, request: str = "", url: str = "", params: Optional[Dict[str, Any]] = None,
+                       body: Dict[str, Any] = {}) -> Tuple[aiohttp.ClientResponse, bytes]:
+        """Execute a request and return the response with its body
+
+        Args:
+            request: the type of the request (POST, GET, PUT, DELETE)
+            url: the URL for the request
+            params: parameters for the request if any
+            body: body data for the request if any
+        """
+        if request not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Error: unknown method [{request}] called.")
+
+        # extra arguments for aiohttp
+        ctx = self._context()
+        connect, read = self._timeouts()
+        kwargs: Dict[str, Any] = {
+            'headers': ctx.headers,
+            'timeout': aiohttp.ClientTimeout(total=remaining(), sock_connect=connect, sock_read=read)
+        }
+
+        if request == "GET":
+            kwargs['params'] = params
+        elif request in ("POST", "PUT"):
+            kwargs['headers'] = ctx.body_kwargs['headers']
+            kwargs['data'] = self._encode(ctx, body)
+
+        session = await self._getSession()
+        self._inflight[session] = self._inflight.get(session, 0) + 1
+        try:
+            async with session.request(request, url, **kwargs) as response:
+                content = await response.read()
+
+        finally:
+            count = self._inflight.pop(session, 1) - 1
+            if count > 0:
+                self._inflight[session] = count
+            elif session in self._stale:
+                await self._closeIdle()
+
+        return response, content
+
+    @staticmethod
+    def _transient(error: Exception) -> Tuple[bool, bool]:
+        """Classify an error raised while sending a request
+
+        Returns:
+            (the error is transient, the request may have reached the server)
+        """
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True, False
+
+        return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)), True
+
+    async def _send(self, request: str, url: str, params: Optional[Dict[str, Any]], body: Dict[str, Any], *,
+                    idempotent: bool) -> Tuple[aiohttp.ClientResponse, bytes]:
+        """Execute a request, retrying the transient failures according to the retry policy
+
+        With several servers, each attempt is sent to a server chosen by the balancer
+        among the ones that have not failed yet for this request.
+
+        Args:
+            request: the type of the request (POST, GET, PUT, DELETE)
+            url: the URL for the request
+            params: parameters for the request if any
+            body: body data for the request if any
+            idempotent: the request can be repeated safely
+
+        Raises:
+            ConnectionError
+
+        Returns:
+            The last response received with its body
+        """
+        ctx = self._context()
+        policy, balancer = ctx.retry, ctx.balancer
+        policy.budget.deposit()
+
+        tried: List[Server] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            server = balancer.pick(tried) if balancer is not None else None
+            start = time.perf_counter()
+            try:
+                response, content = await self._request(request=request, url=self._serverUrl(url, server),
+                                                        params=params, body=body)
+
+            except (exceptions.DeadlineExceeded, asyncio.CancelledError):
+                if server is not None:
+                    balancer.release(server)
+                raise
+
+            except Exception as e:
+                if server is not None:
+                    balancer.done(server, time.perf_counter() - start, True)
+                    tried.append(server)
+
+                transient, sent = self._transient(e)
+                delay = policy.retry(attempt, idempotent=idempotent, sent=sent) if transient else None
+                if not self._canWait(delay):
+                    raise self._failure(e)
+
+                self._retried()
+                await asyncio.sleep(delay)
+                continue
+
+            if server is not None:
+                balancer.done(server, time.perf_counter() - start, response.status >= 500)
+
+            if response.status not in policy.statuses:
+                return response, content
+
+            delay = policy.retry(attempt, idempotent=idempotent, status=response.status)
+            if not self._canWait(delay):
+                return response, content
+
+            if server is not None:
+                tried.append(server)
+
+            self._retried()
+            await asyncio.sleep(delay)
+
+    async def _call(self, request: str, url: str, *, params: Optional[Dict[str, Any]] = None,
+                    body: Dict[str, Any] = {}, expect: T_Expect, cache: Any = None, key: Any = None,
+                    decode: Optional[Callable[[bytes], Any]] = None, coalesce: bool = False) -> Any:
+        """Execute a request and convert its response
+
+        Args:
+            request: the type of the request (POST, GET, PUT, DELETE)
+            url: the URL for the request
+            params: parameters for the request if any
+            body: body data for the request if any
+            expect: the functions converting the data for each expected status code
+            cache: a cache (with get/put methods) for the value, if any
+            key: the key of the value in the cache
+            decode: the function decoding the body, the codec decode() if None
+            coalesce: share the result of the identical requests in flight (always done for GET)
+
+        Raises:
+            ConnectionError, or the exception corresponding to the HTTP status
+
+        Returns:
+            The value computed from the response
+        """
+        registry = self.metrics
+        if cache is not None:
+            value = cache.get(key)
+            if value is not None:
+                if registry is not None:
+                    registry.hit(currentEndpoint())
+                return value
+
+        async def send(measure: Optional[Measure] = None) -> Any:
+            breaker = self._breaker(url)
+            if (breaker is not None) and (not breaker.allow()):
+                raise exceptions.CircuitOpen(f"Error: the circuit of [{url}] is open.")
+
+            token = self._pin()
+            failed = None
+            try:
+                response, content = await self._send(request, url, params, body, idempotent=coalesce or (request != "POST"))
+                failed = response.status >= 500
+
+            except Exception as e:
+                failed = True if self._serverFailed(e) else None
+                raise
+
+            finally:
+                self._unpin(token)
+                if breaker is not None:
+                    if failed is None:
+                        breaker.release()
+                    else:
+                        breaker.record(failed)
+
+            if measure is not None:
+                measure.response(response.status, len(content))
+
+            try:
+                data = (decode or self._context().codec.decode)(content) if content else None
+
+            except Exception as e:
+                raise exceptions.ConnectionError(e)
+
+            if measure is not None:
+                measure.decoded()
+
+            value = self._result(response.status, data, expect)
+            if cache is not None:
+                cache.put(key, value)
+
+            return value
+
+        endpoint = currentEndpoint()
+
+        async def timed() -> Any:
+            with registry.measure(endpoint, request, url) as measure:
+                return await send(measure)
+
+        task = timed if registry is not None else send
+
+        flight = self._flightKey(request, url, params, body, decode) if (request == "GET") or coalesce else None
+        if flight is None:
+            return await task()
+
+        return await self._flights.do(flight, task)
+
+    async def _paginate(self, url: str, key: str, *, limit: int) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over all the records of a paginated endpoint
+
+        Args:
+            url: the URL of the endpoint
+            key: the name of the list of records in the response
+            limit: the number of records per page
+
+        Raises:
+            ConnectionError, or the exception corresponding to the HTTP status
+
+        Returns:
+            An asynchronous iterator over the records (entity models with the models option)
+        """
+        decode = self._pageDecoder(key)
+        pages = AsyncPaginator(lambda offset, limit: self._page(url, offset, limit, decode),
+                               limit=self._pageLimit(limit), window=self._config.prefetch_pages)
+
+        async for data in pages:
+            for item in data[key]:
+                yield item
+
+    async def _bulk(self, name: str, items: List[Dict[str, Any]], *, window: int, stop_on_error: bool) -> List[Any]:
+        """Call an endpoint for several items with a bounded number of concurrent requests
+
+        Args:
+            name: the name of the endpoint function
+            items: the keyword arguments of the endpoint for each call
+            window: the maximum number of requests in flight
+            stop_on_error: do not start new calls after the first failure
+
+        Returns:
+            The result (or the exception raised) of each call, in the order of the items.
+            The items not processed after a failure have None as result.
+        """
+        fn = self._endpoints[name]
+        results: List[Any] = [None] * len(items)
+        semaphore = asyncio.Semaphore(max(1, window))
+        stopped = False
+
+        async def run(index: int, item: Dict[str, Any]) -> None:
+            nonlocal stopped
+            async with semaphore:
+                if stopped:
+                    return
+
+                try:
+                    results[index] = await fn(self, **item)
+                except Exception as e:
+                    results[index] = e
+                    stopped = stopped or stop_on_error
+
+        await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
+        return results
+
+    async def _many(self, name: str, arg: str, ids: Iterable[int], *, window: int) -> Dict[int, Any]:
+        """Call a single-id endpoint for several ids with a bounded number of concurrent requests
+
+        Args:
+            name: the name of the endpoint function
+            arg: the name of the id argument of the endpoint
+            ids: the ids, requested once each
+            window: the maximum number of requests in flight
+
+        Returns:
+            A dictionary id -> result of the call, or the exception it raised
+        """
+        unique = list(dict.fromkeys(ids))
+        results = await self._bulk(name, [{ arg: value } for value in unique], window=window, stop_on_error=False)
+
+        return dict(zip(unique, results))
+
+    def scan(self, endpoint: str, *, workers: int = 4, total: Optional[int] = None,
+             ordered: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Retrieve all the records of a paginated endpoint with concurrent requests
+
+        The offset space of the endpoint is split in disjoint ranges read by asyncio tasks.
+
+        Args:
+            endpoint: the paginated endpoint (e.g. 'users', 'user-rights', 'teams/3/users')
+            workers: the number of tasks
+            total: the number of records if known, probed from the server otherwise
+            ordered: deliver the records in order, or as soon as they are received
+
+        Raises:
+            ConnectionError, BadRequest, NotFound, InternalServerError
+
+        Returns:
+            An asynchronous iterator over the records (entity models with the models option)
+        """
+        url = self._url(endpoint)
+        key = endpoint.split('/')[-1]
+        decode = self._pageDecoder(key)
+
+        return AsyncScanner(lambda offset, limit: self._page(url, offset, limit, decode), key,
+                            workers=workers, total=total, ordered=ordered).__aiter__()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Cache and proactive refresh of the JSON Web Token of an application
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Dict, Optional
+
+import random
+import threading
+import time
+
+from .aio import AsyncClient
+from .core import BaseClient, Client
+from .tokens import jwtClaims
+
+
+#----- Class
+class TokenManager:
+    """Keep a valid JSON Web Token for an application
+
+    The token returned by authenticate() is cached, and a new one is requested
+    when `refresh_ratio` of its lifetime (read from its 'iat' and 'exp' claims)
+    has elapsed, minus a random jitter of up to `jitter` of its lifetime, so the
+    instances of a service do not all refresh their tokens at the same time.
+
+    With start(), the token is refreshed by a background thread and token()
+    never waits for the server. Otherwise, the first call to token() after the
+    refresh time requests the new token, while the other threads keep using the
+    current one until it expires. The concurrent refreshes are merged into one
+    request.
+
+    Once attached to a client, the token is given to validate() when the token
+    argument is omitted. The manager works with the synchronous Client only:
+
+        manager = TokenManager(client, appname='StoryBuilder', apikey=apikey).start()
+        if client.validate(email='john@acme.com', right='read'):
+            ...
+    """
+
+    def __init__(self, client: Optional[Client] = None, *, appname: str, apikey: str,
+                 refresh_ratio: float = 0.8, jitter: float = 0.1, retry_delay: float = 5.0,
+                 attach: bool = True) -> None:
+        """
+        Args:
+            client: the client sending the auth requests, the shared Client if None
+            appname: the application name
+            apikey: the application API-KEY
+            refresh_ratio: the part of the lifetime of a token after which it is refreshed
+            jitter: the maximum part of the lifetime by which the refresh is advanced
+            retry_delay: the time (seconds) before a failed background refresh is retried
+            attach: feed the token to the validate() of the client
+
+        Raises:
+            TypeError: the client is an AsyncClient
+        """
+        self._check(client)
+        self.client = client if client is not None else Client()
+        self.appname = appname
+        self.apikey = apikey
+        self.refresh_ratio = refresh_ratio
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires: Optional[float] = None       # time.time() of the expiration, None if none
+        self._refresh_at: Optional[float] = None    # time.time() of the next refresh, None if none
+
+        self._timer: Optional[threading.Timer] = None
+        self._running = False
+
+        self._refreshes = 0
+        self._failures = 0
+
+        if attach:
+            self.attach(self.client)
+
+    def __enter__(self) -> TokenManager:
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @staticmethod
+    def _check(client: Optional[BaseClient]) -> None:
+        """Refuse the clients whose endpoints are coroutines"""
+        if isinstance(client, AsyncClient):
+            raise TypeError("Error: the TokenManager requires a synchronous Client, not an AsyncClient.")
+
+    def attach(self, client: BaseClient) -> None:
+        """Give the token to the validate() of a client when its token argument is omitted
+
+        Raises:
+            TypeError: the client is an AsyncClient
+        """
+        self._check(client)
+        client.tokens = self
+
+    def _valid(self, now: float) -> bool:
+        """Check if the current token can still be used"""
+        return (self._token is not None) and ((self._expires is None) or (now < self._expires))
+
+    def _store(self, token: str, now: float) -> None:
+        """Keep a new token and compute its refresh time"""
+        claims = jwtClaims(token)
+        expires = claims.get('exp')
+        issued = claims.get('iat')
+        if not isinstance(issued, (int, float)):
+            issued = now
+
+        self._token = token
+        self._expires = None
+        self._refresh_at = None
+
+        if isinstance(expires, (int, float)):
+            lifetime = max(expires - issued, 0.0)
+            self._expires = float(expires)
+            self._refresh_at = issued + lifetime * (self.refresh_ratio - random.uniform(0, self.jitter))
+
+    def _refresh(self, stale: Optional[str]) -> str:
+        """Request a new token, unless another thread already replaced the stale one
+
+        Args:
+            stale: the token to replace
+
+        Returns:
+            The new token
+        """
+        with self._lock:
+            if (self._token is not stale) and self._valid(time.time()):
+                return self._token
+
+            try:
+                token = self.client.authenticate(appname=self.appname, apikey=self.apikey)
+
+            except Exception:
+                self._failures += 1
+                raise
+
+            self._store(token, time.time())
+            self._refreshes += 1
+            return token
+
+    def token(self) -> str:
+        """Return a valid token, requesting a new one if needed
+
+        Raises:
+            ConnectionError, BadRequest, NotFound, InternalServerError
+
+        Returns:
+            The JSON Web Token
+        """
+        token = self._token
+        now = time.time()
+        if (token is not None) and ((self._refresh_at is None) or (now < self._refresh_at)):
+            return token
+
+        if not self._valid(now):
+            return self._refresh(token)
+
+        # time to refresh: one thread does it while the others use the current token
+        if self._running or self._lock.locked():
+            return token
+
+        try:
+            return self._refresh(token)
+
+        except Exception:
+            return token
+
+    def invalidate(self) -> None:
+        """Forget the current token (e.g. after an Unauthenticated error)"""
+        with self._lock:
+            self._token = None
+            self._expires = None
+            self._refresh_at = None
+
+    def _schedule(self, delay: float) -> None:
+        """Start the timer of the next background refresh"""
+        with self._lock:
+            if not self._running:
+                return
+
+            self._timer = threading.Timer(max(delay, 0.0), self._background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _background(self) -> None:
+        """Refresh the token in the background thread"""
+        try:
+            self._refresh(self._token)
+
+        except Exception:
+            self._schedule(self.retry_delay)
+            return
+
+        if self._refresh_at is not None:
+            self._schedule(self._refresh_at - time.time())
+
+    def start(self) -> TokenManager:
+        """Request a token and refresh it in a background thread before it expires
+
+        Raises:
+            ConnectionError, BadRequest, NotFound, InternalServerError
+        """
+        self.token()
+        self._running = True
+        if self._refresh_at is not None:
+            self._schedule(self._refresh_at - time.time())
+
+        return self
+
+    def stop(self) -> None:
+        """Stop the background refresh"""
+        with self._lock:
+            self._running = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of tokens requested, of failed requests and the time left before expiration"""
+        expires = self._expires
+        return {
+            'refreshes': self._refreshes,
+            'failures': self._failures,
+            'expires_in': (expires - time.time()) if expires is not None else None
+        }
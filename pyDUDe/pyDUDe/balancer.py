@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Load balancing of the requests between several DUDe servers
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Collection, Dict, List, Tuple
+
+import math
+import threading
+import time
+
+
+#----- Globals
+STRATEGIES: Tuple[str, ...] = ('round-robin', 'least-outstanding', 'ewma')
+
+
+#----- Classes
+class Server:
+    """A DUDe server and what the balancer knows about it"""
+
+    __slots__ = ('base', 'outstanding', 'latency', 'updated', 'failures', 'down_until', 'requests', 'errors')
+
+    def __init__(self, base: str) -> None:
+        self.base = base                # scheme://hostname:port
+        self.outstanding = 0            # requests in flight
+        self.latency = 0.0              # moving average of the response time (seconds)
+        self.updated = 0.0              # time of the last update of the latency
+        self.failures = 0               # consecutive failures
+        self.down_until = 0.0           # the server is ejected until this time
+        self.requests = 0
+        self.errors = 0
+
+
+class Balancer:
+    """Spread the requests between several servers
+
+    The strategies are:
+        round-robin         the servers are used one after the other
+        least-outstanding   the server with the fewest requests in flight
+        ewma                the server with the lowest moving average of the response time,
+                            weighted by its requests in flight
+
+    A server failing `eject_after` times in a row (connection errors and 5xx responses)
+    is ejected for `eject_time` seconds. When all the servers are ejected, they are all
+    used again.
+    """
+
+    def __init__(self, bases: List[str], *, strategy: str = 'round-robin', eject_after: int = 3,
+                 eject_time: float = 10.0, decay: float = 10.0) -> None:
+        """
+        Args:
+            bases: the scheme://hostname:port of the servers
+            strategy: round-robin, least-outstanding or ewma
+            eject_after: the consecutive failures ejecting a server
+            eject_time: the time (seconds) a server is ejected
+            decay: the time (seconds) for the moving average to forget a response time
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Error: unknown balancing strategy [{strategy}].")
+
+        self.servers = [Server(base) for base in bases]
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_time = eject_time
+        self.decay = decay
+
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def pick(self, exclude: Collection[Server] = ()) -> Server:
+        """Choose the server of the next request and count it as outstanding
+
+        Args:
+            exclude: the servers that already failed for this request
+
+        Returns:
+            The server
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [server for server in self.servers if server.down_until <= now and server not in exclude]
+            if not candidates:
+                candidates = [server for server in self.servers if server not in exclude] or self.servers
+
+            if self.strategy == 'round-robin':
+                server = candidates[self._next % len(candidates)]
+                self._next += 1
+
+            elif self.strategy == 'least-outstanding':
+                server = min(candidates, key=lambda server: server.outstanding)
+
+            else:
+                server = min(candidates, key=lambda server: server.latency * (server.outstanding + 1))
+
+            server.outstanding += 1
+            server.requests += 1
+            return server
+
+    def release(self, server: Server) -> None:
+        """Record the end of a request that has not been sent"""
+        with self._lock:
+            server.outstanding -= 1
+
+    def done(self, server: Server, latency: float, failed: bool) -> None:
+        """Record the end of a request
+
+        Args:
+            server: the server returned by pick()
+            latency: the response time of the request (seconds)
+            failed: the request failed (connection error or server error)
+        """
+        now = time.monotonic()
+        with self._lock:
+            server.outstanding -= 1
+
+            # moving average with a time based decay
+            weight = math.exp(-(now - server.updated) / self.decay) if server.updated else 0.0
+            server.latency = server.latency * weight + latency * (1.0 - weight)
+            server.updated = now
+
+            if not failed:
+                server.failures = 0
+                return
+
+            server.errors += 1
+            server.failures += 1
+            if server.failures >= self.eject_after:
+                server.down_until = now + self.eject_time
+                server.failures = 0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return, for each server, its state, requests in flight, requests, errors and latency"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                server.base: {
+                    'state': 'up' if server.down_until <= now else 'down',
+                    'outstanding': server.outstanding,
+                    'requests': server.requests,
+                    'errors': server.errors,
+                    'latency': server.latency
+                }
+                for server in self.servers
+            }
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Circuit breakers of the endpoint families
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Dict, List
+
+import threading
+import time
+
+
+#----- Globals
+CLOSED: str = 'closed'          # the requests are sent
+OPEN: str = 'open'              # the requests fail immediately
+HALF_OPEN: str = 'half-open'    # a limited number of trial requests are sent
+
+_BUCKETS: int = 10              # number of buckets of the sliding window
+
+
+#----- Classes
+class CircuitBreaker:
+    """Circuit breaker of an endpoint family
+
+    The breaker counts the successes and failures over a sliding window of `window`
+    seconds. It opens when the error rate reaches `error_rate` over at least
+    `min_requests` requests, and then rejects the requests for `cooldown` seconds.
+    After that, up to `probes` trial requests are let through (half-open): the
+    breaker closes if they all succeed, and opens again at the first failure.
+    """
+
+    def __init__(self, *, error_rate: float = 0.5, min_requests: int = 20, window: float = 10.0,
+                 cooldown: float = 5.0, probes: int = 1) -> None:
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.probes = probes
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0            # trial requests sent while half-open
+        self._successes = 0         # successful trial requests
+
+        # sliding window: [bucket start, requests, failures] for each bucket
+        self._buckets: List[List[Any]] = []
+
+        self._rejected = 0
+
+    def _count(self, now: float, failed: bool) -> None:
+        """Record an outcome in the sliding window"""
+        width = self.window / _BUCKETS
+        start = now - (now % width)
+
+        if (not self._buckets) or (self._buckets[-1][0] != start):
+            self._buckets.append([start, 0, 0])
+
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2] += int(failed)
+
+        # drop the buckets out of the window
+        while self._buckets[0][0] <= now - self.window:
+            self._buckets.pop(0)
+
+    def _tripped(self) -> bool:
+        """Check if the error rate of the window must open the breaker"""
+        requests = sum(bucket[1] for bucket in self._buckets)
+        failures = sum(bucket[2] for bucket in self._buckets)
+        return (requests >= self.min_requests) and (failures >= self.error_rate * requests)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._buckets.clear()
+
+    @property
+    def state(self) -> str:
+        """Return the current state of the breaker (closed, open or half-open)"""
+        with self._lock:
+            if (self._state == OPEN) and (time.monotonic() - self._opened_at >= self.cooldown):
+                return HALF_OPEN
+
+            return self._state
+
+    def allow(self) -> bool:
+        """Check if a request can be sent
+
+        Returns:
+            True if the request can be sent, False if it must fail immediately
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self._rejected += 1
+                    return False
+
+                self._state = HALF_OPEN
+                self._trials = 0
+                self._successes = 0
+
+            if self._trials < self.probes:
+                self._trials += 1
+                return True
+
+            self._rejected += 1
+            return False
+
+    def record(self, failed: bool) -> None:
+        """Record the outcome of a request
+
+        Args:
+            failed: the request failed (connection error or server error)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open(now)
+                    return
+
+                self._successes += 1
+                if self._successes >= self.probes:
+                    self._state = CLOSED
+                return
+
+            if self._state == OPEN:
+                return
+
+            self._count(now, failed)
+            if failed and self._tripped():
+                self._open(now)
+
+    def release(self) -> None:
+        """Forget a request allowed whose outcome says nothing about the server
+
+        The trial request of a half-open breaker can be sent again by another caller.
+        """
+        with self._lock:
+            if (self._state == HALF_OPEN) and (self._trials > 0):
+                self._trials -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state, the requests and failures in the window, and the requests rejected"""
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'requests': sum(bucket[1] for bucket in self._buckets),
+                'failures': sum(bucket[2] for bucket in self._buckets),
+                'rejected': self._rejected
+            }
+
+
+class CircuitBreakers:
+    """The circuit breakers of a client, one per endpoint family"""
+
+    def __init__(self, **settings: Any) -> None:
+        """
+        Args:
+            settings: the arguments of the CircuitBreaker created for each family
+        """
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, family: str) -> CircuitBreaker:
+        """Return the breaker of an endpoint family, created on first use"""
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(family, CircuitBreaker(**self.settings))
+
+        return breaker
+
+    def states(self) -> Dict[str, str]:
+        """Return the state of each endpoint family"""
+        return { family: breaker.state for family, breaker in list(self._breakers.items()) }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the statistics of each endpoint family"""
+        return { family: breaker.stats() for family, breaker in list(self._breakers.items()) }
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	The decision cache for the validate endpoint
+
+#----- Imports
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+
+import threading
+import time
+
+from collections import OrderedDict
+
+from .tokens import jwtExpiry
+
+
+#----- Types
+T_Decision = Tuple[str, str, str]       # (email, right, token)
+
+
+#----- Class
+class DecisionCache:
+    """Bounded LRU cache of the validate() decisions
+
+    Each entry expires after allow_ttl or deny_ttl seconds depending on the decision,
+    and never outlives the 'exp' claim of the token used for the validation.
+    """
+
+    def __init__(self, *, maxsize: int = 10000, allow_ttl: float = 30.0, deny_ttl: float = 5.0) -> None:
+        self.maxsize = maxsize
+        self.allow_ttl = allow_ttl
+        self.deny_ttl = deny_ttl
+
+        # key -> (decision, expiration time)
+        self._entries: OrderedDict[T_Decision, Tuple[bool, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: T_Decision) -> Optional[bool]:
+        """Retrieve a decision from the cache
+
+        Args:
+            key: the (email, right, token) triple
+
+        Returns:
+            The cached decision, None if it is not in the cache or has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: T_Decision, value: bool) -> bool:
+        """Store a decision in the cache
+
+        Args:
+            key: the (email, right, token) triple
+            value: the decision returned by the server
+
+        Returns:
+            The decision
+        """
+        ttl = self.allow_ttl if value else self.deny_ttl
+
+        # the decision cannot outlive the token
+        expiry = jwtExpiry(key[-1])
+        if expiry is not None:
+            ttl = min(ttl, expiry - time.time())
+
+        if ttl <= 0:
+            return value
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return value
+
+    def clear(self) -> None:
+        """Remove all the decisions from the cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the statistics of the cache
+
+        Returns:
+            A dictionary with the hits, misses, evictions, expirations and current size
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'size': len(self._entries)
+            }
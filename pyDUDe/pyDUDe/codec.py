@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	JSON codecs used to encode the requests and decode the responses
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Type
+
+import json
+
+from .models import Entity
+from .paginator import T_Page
+
+try:
+    import orjson
+except ImportError:     # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:     # pragma: no cover
+    msgspec = None
+
+
+#----- Classes
+class JsonCodec:
+    """JSON codec based on the json module of the standard library"""
+
+    name: str = 'json'
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize a value to JSON"""
+        return json.dumps(value).encode()
+
+    def decode(self, content: bytes) -> Any:
+        """Deserialize a JSON document"""
+        return json.loads(content)
+
+    def decodePage(self, content: bytes, key: str, model: Type[Entity]) -> T_Page:
+        """Deserialize a page of a paginated endpoint, its records being converted to entities
+
+        Args:
+            content: the body of the response
+            key: the name of the list of records in the page
+            model: the entity model of the records
+
+        Returns:
+            The page, with a list of entities under `key`
+        """
+        data = self.decode(content)
+        if isinstance(data, dict) and isinstance(data.get(key), list):
+            data[key] = [model.fromDict(record) for record in data[key]]
+
+        return data
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec based on orjson"""
+
+    name: str = 'orjson'
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def decode(self, content: bytes) -> Any:
+        return orjson.loads(content)
+
+
+class MsgspecCodec(JsonCodec):
+    """JSON codec based on msgspec
+
+    The pages are decoded directly into the entities with a typed decoder,
+    without building the intermediate dictionaries.
+    """
+
+    name: str = 'msgspec'
+
+    def __init__(self) -> None:
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._pages: Dict[Any, Any] = {}
+
+    def encode(self, value: Any) -> bytes:
+        return self._encoder.encode(value)
+
+    def decode(self, content: bytes) -> Any:
+        return self._decoder.decode(content)
+
+    def _pageDecoder(self, key: str, model: Type[Entity]) -> Any:
+        """Return the typed decoder of the pages of an entity type"""
+        decoder = self._pages.get((key, model))
+        if decoder is None:
+            page = msgspec.defstruct(
+                f"{model.__name__}Page",
+                [('records', List[model]), ('count', int), ('limit', int), ('offset', Optional[int], None)],
+                rename={'records': key}
+            )
+            decoder = (page, msgspec.json.Decoder(page))
+            self._pages[(key, model)] = decoder
+
+        return decoder[1]
+
+    def decodePage(self, content: bytes, key: str, model: Type[Entity]) -> T_Page:
+        try:
+            page = self._pageDecoder(key, model).decode(content)
+        except msgspec.ValidationError:
+            # not a page (e.g. an error message), use the generic decoding
+            return super().decodePage(content, key, model)
+
+        return { key: page.records, 'count': page.count, 'limit': page.limit, 'offset': page.offset }
+
+
+#----- Globals
+CODECS: Dict[str, Type[JsonCodec]] = { 'json': JsonCodec }
+
+if orjson is not None:
+    CODECS['orjson'] = OrjsonCodec
+
+if msgspec is not None:
+    CODECS['msgspec'] = MsgspecCodec
+
+
+#----- Functions
+def getCodec(name: str = 'auto') -> JsonCodec:
+    """Create a JSON codec
+
+    Args:
+        name: 'json', 'orjson', 'msgspec', or 'auto' for the fastest one installed
+
+    Raises:
+        ValueError: the codec is unknown or its package is not installed
+
+    Returns:
+        The codec
+    """
+    if name == 'auto':
+        for name in ('msgspec', 'orjson', 'json'):
+            if name in CODECS:
+                break
+
+    if name not in CODECS:
+        raise ValueError(f"Error: unknown or unavailable JSON codec [{name}].")
+
+    return CODECS[name]()
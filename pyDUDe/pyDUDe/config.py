@@ -13,11 +13,11 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 import pathlib
 
-from attrs import define
+from attrs import define, field, setters
 from dotenv import dotenv_values
 
 
@@ -26,11 +26,21 @@ MAX_SEARCH_LIMIT: int = 20      # value maximum for search operation
 DEFAULT_SEARCH_LIMIT: int = 10  # default value for search operation
 
 
+#----- Functions
+def _changed(instance: DUDeConfig, attribute: Any, value: Any) -> Any:
+    """Count the modifications of the configuration, so the clients can refresh their state"""
+    object.__setattr__(instance, '_generation', instance._generation + 1)
+    return value
+
+
 #----- Class
-@define(kw_only=True)
+@define(kw_only=True, on_setattr=setters.pipe(setters.convert, setters.validate, _changed))
 class DUDeConfig:
     """This class encapsulates the whole configuration for the library."""
 
+    # incremented each time a variable is modified
+    _generation: int = field(default=0, init=False, eq=False, repr=False)
+
     # only keyword is supported for the initialization
     x_api_token: str = ''           # the API token for admin endpoints
 
@@ -38,10 +48,58 @@ class DUDeConfig:
     hostname: str = ''              # API server hostname
     port: int = 5000                # API server port
 
+    servers: List[str] = field(factory=list)    # several servers ("hostname:port"), replaces hostname/port
+    balancer: str = 'round-robin'   # spreading of the requests: round-robin, least-outstanding, ewma
+    balancer_eject_after: int = 3   # consecutive failures ejecting a server
+    balancer_eject_time: float = 10.0   # time (seconds) a failing server is ejected
+
     certfile: str = ''              # client certificate for SSL
     keyfile: str = ''               # key certificate for SSL
     root_ca: str = ''               # root_ca certificate to validate server SSL cert.
 
+    pool_connections: int = 10      # number of host pools kept by the HTTP session
+    pool_maxsize: int = 10          # maximum connections kept alive per host
+    pool_block: bool = False        # wait for a free connection when the pool is exhausted
+    pool_keepalive: float = 60.0    # idle time (seconds) after which a pooled connection is replaced
+
+    connect_timeout: float = 5.0    # time (seconds) to establish a connection (0 for no limit)
+    read_timeout: float = 30.0      # time (seconds) to wait for the server data (0 for no limit)
+
+    max_workers: int = 8            # threads used for the concurrent requests
+    prefetch_pages: int = 0         # pages requested ahead of the consumer in paginated endpoints
+
+    validate_cache: bool = False            # cache the decisions of validate()
+    validate_cache_size: int = 10000        # maximum number of cached decisions
+    validate_cache_allow_ttl: float = 30.0  # lifetime (seconds) of a cached authorization
+    validate_cache_deny_ttl: float = 5.0    # lifetime (seconds) of a cached denial
+
+    jwt_secret: str = ''            # key used by the server to sign the JWT (local validation)
+
+    codec: str = 'auto'             # JSON codec: json, orjson, msgspec or auto (fastest installed)
+    models: bool = False            # return entity models instead of dictionaries from the paginated functions
+
+    coalesce_requests: bool = True  # share the result of identical idempotent requests in flight
+
+    retry_attempts: int = 3         # maximum attempts of a request (1 disables the retries)
+    retry_backoff: float = 0.1      # base delay (seconds) of the exponential backoff
+    retry_backoff_max: float = 2.0  # maximum delay (seconds) between two attempts
+    retry_budget_ratio: float = 0.1 # retries credited to the budget by each request
+    retry_budget_burst: int = 10    # maximum retries available in the budget
+
+    circuit_breaker: bool = True        # fail fast when an endpoint family is failing
+    circuit_error_rate: float = 0.5     # error rate opening the circuit
+    circuit_min_requests: int = 20      # minimum requests in the window to open the circuit
+    circuit_window: float = 10.0        # sliding window (seconds) of the error rate
+    circuit_cooldown: float = 5.0       # time (seconds) before the trial requests
+    circuit_probes: int = 1             # trial requests needed to close the circuit
+
+    metrics: bool = False           # record the metrics of the requests (see Client.metrics)
+
+
+    @property
+    def generation(self) -> int:
+        """Return the number of modifications of the configuration"""
+        return self._generation
 
     def readFile(self, filename: str = '.env') -> bool:
         """Read the configuration from a .env file"""
@@ -57,8 +115,40 @@ class DUDeConfig:
         self.scheme = envcfg.get('SCHEME', 'https')
         self.hostname = envcfg.get('HOSTNAME', '')
         self.port = int(envcfg.get('PORT', '5000'))
+        self.servers = [server.strip() for server in envcfg.get('SERVERS', '').split(',') if server.strip()]
+        self.balancer = envcfg.get('BALANCER', 'round-robin')
+        self.balancer_eject_after = int(envcfg.get('BALANCER_EJECT_AFTER', '3'))
+        self.balancer_eject_time = float(envcfg.get('BALANCER_EJECT_TIME', '10'))
         self.certfile = envcfg.get('CERTFILE', '')
         self.keyfile = envcfg.get('KEYFILE', '')
         self.root_ca = envcfg.get('ROOT_CA', '')
+        self.pool_connections = int(envcfg.get('POOL_CONNECTIONS', '10'))
+        self.pool_maxsize = int(envcfg.get('POOL_MAXSIZE', '10'))
+        self.pool_block = envcfg.get('POOL_BLOCK', 'false').lower() in ('1', 'true', 'yes')
+        self.pool_keepalive = float(envcfg.get('POOL_KEEPALIVE', '60'))
+        self.connect_timeout = float(envcfg.get('CONNECT_TIMEOUT', '5'))
+        self.read_timeout = float(envcfg.get('READ_TIMEOUT', '30'))
+        self.max_workers = int(envcfg.get('MAX_WORKERS', '8'))
+        self.prefetch_pages = int(envcfg.get('PREFETCH_PAGES', '0'))
+        self.validate_cache = envcfg.get('VALIDATE_CACHE', 'false').lower() in ('1', 'true', 'yes')
+        self.validate_cache_size = int(envcfg.get('VALIDATE_CACHE_SIZE', '10000'))
+        self.validate_cache_allow_ttl = float(envcfg.get('VALIDATE_CACHE_ALLOW_TTL', '30'))
+        self.validate_cache_deny_ttl = float(envcfg.get('VALIDATE_CACHE_DENY_TTL', '5'))
+        self.jwt_secret = envcfg.get('JWT_SECRET', '')
+        self.codec = envcfg.get('CODEC', 'auto')
+        self.models = envcfg.get('MODELS', 'false').lower() in ('1', 'true', 'yes')
+        self.coalesce_requests = envcfg.get('COALESCE_REQUESTS', 'true').lower() in ('1', 'true', 'yes')
+        self.retry_attempts = int(envcfg.get('RETRY_ATTEMPTS', '3'))
+        self.retry_backoff = float(envcfg.get('RETRY_BACKOFF', '0.1'))
+        self.retry_backoff_max = float(envcfg.get('RETRY_BACKOFF_MAX', '2'))
+        self.retry_budget_ratio = float(envcfg.get('RETRY_BUDGET_RATIO', '0.1'))
+        self.retry_budget_burst = int(envcfg.get('RETRY_BUDGET_BURST', '10'))
+        self.circuit_breaker = envcfg.get('CIRCUIT_BREAKER', 'true').lower() in ('1', 'true', 'yes')
+        self.circuit_error_rate = float(envcfg.get('CIRCUIT_ERROR_RATE', '0.5'))
+        self.circuit_min_requests = int(envcfg.get('CIRCUIT_MIN_REQUESTS', '20'))
+        self.circuit_window = float(envcfg.get('CIRCUIT_WINDOW', '10'))
+        self.circuit_cooldown = float(envcfg.get('CIRCUIT_COOLDOWN', '5'))
+        self.circuit_probes = int(envcfg.get('CIRCUIT_PROBES', '1'))
+        self.metrics = envcfg.get('METRICS', 'false').lower() in ('1', 'true', 'yes')
 
         return True
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	The precomputed request context of the clients
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+
+from attrs import frozen
+
+from .balancer import Balancer
+from .breaker import CircuitBreakers
+from .codec import JsonCodec, getCodec
+from .config import DUDeConfig
+from .retry import RetryBudget, RetryPolicy
+
+
+#----- Globals
+ENDPOINT_FAMILIES: Tuple[str, ...] = (
+    'auth', 'validate', 'version',
+    'companies', 'units', 'teams', 'users', 'rights', 'software', 'user-rights'
+)
+
+
+#----- Class
+@frozen
+class RequestContext:
+    """Everything the clients derive from the configuration to send a request
+
+    The context is built once per configuration state, and rebuilt only when the
+    configuration object is replaced or modified. The stateful objects (balancer,
+    retry budget and circuit breakers) are taken from the previous context of the
+    client unless their own settings have changed.
+    """
+
+    config: DUDeConfig                  # the configuration used to build the context
+    generation: int                     # the generation of the configuration
+
+    base: str                           # scheme://hostname:port of the (first) server
+    balancer: Optional[Balancer]        # balancer of the servers, None with a single server
+    urls: Dict[str, str]                # base URL for each endpoint family
+    headers: Dict[str, str]             # headers sent with each request
+    verify: Optional[str]               # root CA to validate the server certificate
+    cert: Optional[Tuple[str, str]]     # client certificate and key
+    transport: Tuple[Any, ...]          # settings requiring a new session when modified
+    timeout: Tuple[Optional[float], Optional[float]]   # connect and read timeouts
+    kwargs: Dict[str, Any]              # headers/verify/cert arguments for requests
+    body_kwargs: Dict[str, Any]         # same, with the Content-Type of the JSON bodies
+    codec: JsonCodec                    # JSON codec for the bodies and the responses
+    retry: RetryPolicy                  # retry policy, with its budget
+    breakers: Optional[CircuitBreakers] # circuit breakers of the endpoint families, None if disabled
+    stateful: Dict[str, Tuple[Any, ...]]   # settings of the balancer, retry budget and circuit breakers
+
+    @staticmethod
+    def _base(config: DUDeConfig, server: str) -> str:
+        """Return the scheme://hostname:port of a server of the list"""
+        if '://' in server:
+            return server.rstrip('/')
+
+        if ':' not in server:
+            server = f"{server}:{config.port}"
+
+        return f"{config.scheme}://{server}"
+
+    @classmethod
+    def build(cls, config: DUDeConfig, previous: Optional[RequestContext] = None) -> RequestContext:
+        """Compute the context for a configuration
+
+        Args:
+            config: the DUDeConfig object
+            previous: the context replaced by this one, if any
+
+        Returns:
+            The new RequestContext
+        """
+        # read first: a modification made while the context is built makes it stale
+        generation = config.generation
+
+        bases = [cls._base(config, server) for server in config.servers]
+        if not bases:
+            bases = [f"{config.scheme}://{config.hostname}:{config.port}"]
+
+        base = bases[0]
+        stateful = {
+            'balancer': (tuple(bases), config.balancer, config.balancer_eject_after, config.balancer_eject_time),
+            'budget': (config.retry_budget_ratio, config.retry_budget_burst),
+            'breakers': (config.circuit_breaker, config.circuit_error_rate, config.circuit_min_requests,
+                         config.circuit_window, config.circuit_cooldown, config.circuit_probes),
+        }
+
+        # keep the state of the objects whose settings have not changed
+        def unchanged(name: str) -> bool:
+            return (previous is not None) and (previous.stateful[name] == stateful[name])
+
+        if unchanged('balancer'):
+            balancer = previous.balancer
+        elif len(bases) > 1:
+            balancer = Balancer(bases, strategy=config.balancer, eject_after=config.balancer_eject_after,
+                                eject_time=config.balancer_eject_time)
+        else:
+            balancer = None
+
+        if unchanged('budget'):
+            budget = previous.retry.budget
+        else:
+            budget = RetryBudget(ratio=config.retry_budget_ratio, burst=config.retry_budget_burst)
+
+        if unchanged('breakers'):
+            breakers = previous.breakers
+        elif config.circuit_breaker:
+            breakers = CircuitBreakers(
+                error_rate=config.circuit_error_rate,
+                min_requests=config.circuit_min_requests,
+                window=config.circuit_window,
+                cooldown=config.circuit_cooldown,
+                probes=config.circuit_probes
+            )
+        else:
+            breakers = None
+
+        headers = {}
+        if config.x_api_token != '':
+            headers['X-API-Token'] = config.x_api_token
+
+        verify = config.root_ca if config.root_ca != '' else None
+
+        cert = None
+        if (config.certfile != '') and (config.keyfile != ''):
+            cert = (config.certfile, config.keyfile)
+
+        transport = (
+            config.pool_connections, config.pool_maxsize, config.pool_block, config.pool_keepalive,
+            verify, cert
+        )
+
+        return cls(
+            config=config,
+            generation=generation,
+            base=base,
+            balancer=balancer,
+            urls={ family: f"{base}/{family}" for family in ENDPOINT_FAMILIES },
+            headers=headers,
+            verify=verify,
+            cert=cert,
+            transport=transport,
+            timeout=(config.connect_timeout or None, config.read_timeout or None),
+            kwargs={ 'headers': headers, 'verify': verify, 'cert': cert },
+            body_kwargs={ 'headers': { **headers, 'Content-Type': 'application/json' }, 'verify': verify, 'cert': cert },
+            codec=getCodec(config.codec),
+            retry=RetryPolicy(
+                attempts=config.retry_attempts,
+                backoff=config.retry_backoff,
+                backoff_max=config.retry_backoff_max,
+                budget=budget
+            ),
+            breakers=breakers,
+            stateful=stateful
+        )
@@ -13,35 +13,138 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, ClassVar, Dict, Tuple, Optional
+from typing import Any, Callable, ClassVar, Dict, Hashable, Iterable, Iterator, List, Tuple, Optional
 
+import contextvars
+import os
+import threading
+import time
 import requests
+import urllib3
 
-from functools import wraps
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar, Token
+from functools import partial, wraps
+from requests.adapters import HTTPAdapter
 
-from .config import DUDeConfig
+from .balancer import Server
+from .breaker import CircuitBreaker
+from .cache import DecisionCache
+from .config import DUDeConfig, MAX_SEARCH_LIMIT
+from .context import RequestContext
+from .deadline import callTimeout, deadline, remaining, withTimeout
+from .flight import SingleFlight
+from .metrics import Measure, Registry, currentEndpoint, currentMeasure, withEndpoint
+from .models import MODELS
+from .paginator import Paginator, T_Page
+from .scan import Scanner
 from . import exceptions
 
 
-#----- Class
-class Client:
-    """Singleton class to access the DUDe server"""
+#----- Types
+T_Expect = Dict[int, Callable[[Any], Any]]
 
-    # only one instance of this class is available
-    __instance: ClassVar[Optional[Client]] = None
 
-    def __new__(cls: Client) -> Client:
-        """Create a new instance of the class or return the current one"""
-        if cls.__instance is None:
-            cls.__instance = object.__new__(cls)
-            cls.__instance._setup()
+#----- Globals
+# (client, context) of the request in progress in the current thread or task
+_pinned: ContextVar[Optional[Tuple[BaseClient, RequestContext]]] = ContextVar('pyDUDe_pinned', default=None)
 
-        return cls.__instance
+# the current process, updated in the child processes after a fork
+_pid: int = os.getpid()
 
-    def _setup(self) -> None:
-        """Method called to initialize the instance after its creation"""
+
+#----- Functions
+def _afterFork() -> None:
+    global _pid
+    _pid = os.getpid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_afterFork)
+
+
+#----- Classes
+class _IdleConnections:
+    """Connection pool closing each connection idle for longer than keepalive"""
+
+    def __init__(self, *args: Any, keepalive: float, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.keepalive = keepalive
+
+    def _get_conn(self, timeout: Optional[float] = None):
+        conn = super()._get_conn(timeout)
+        released = getattr(conn, '_pydude_released', None)
+        if (released is not None) and (time.monotonic() - released > self.keepalive):
+            conn.close()
+            conn = self._new_conn()
+
+        return conn
+
+    def _put_conn(self, conn) -> None:
+        if conn is not None:
+            conn._pydude_released = time.monotonic()
+
+        super()._put_conn(conn)
+
+
+class _IdleHTTPConnectionPool(_IdleConnections, urllib3.HTTPConnectionPool):
+    pass
+
+
+class _IdleHTTPSConnectionPool(_IdleConnections, urllib3.HTTPSConnectionPool):
+    pass
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter dropping the pooled connections idle for longer than keepalive"""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['keepalive']
+
+    def __init__(self, *, keepalive: float, **kwargs: Any) -> None:
+        self.keepalive = keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': partial(_IdleHTTPConnectionPool, keepalive=self.keepalive),
+            'https': partial(_IdleHTTPSConnectionPool, keepalive=self.keepalive),
+        }
+
+
+class BaseClient:
+    """Transport independent part of the DUDe clients"""
+
+    # the endpoint functions registered with Client.endpoint
+    _endpoints: ClassVar[Dict[str, Callable]] = {}
+
+    # the errors of the transport for an expired timeout
+    _timeout_errors: ClassVar[Tuple[type, ...]] = (TimeoutError, requests.exceptions.Timeout)
+
+    def _setupBase(self, config: DUDeConfig) -> None:
+        """Initialize the attributes shared by all the clients
+
+        Args:
+            config: the DUDeConfig object to use
+        """
         # configuration
-        self._config = DUDeConfig()
+        self._config = config
+        self._ctx: Optional[RequestContext] = None
+
+        # protects the objects created on first use (never held while sending a request)
+        self._lock = threading.RLock()
+
+        # cache for the validate decisions (created on first use)
+        self._decisions: Optional[DecisionCache] = None
+
+        # metrics of the requests (created on first use)
+        self._metrics: Optional[Registry] = None
+
+        # identical requests in flight
+        self._flights = SingleFlight(self._timedOut)
+
+        # TokenManager giving its token to validate() (see auth.py)
+        self.tokens: Optional[Any] = None
 
         # mapping HTTP error code and exceptions
         self.error_map: Dict[int, Exception] = {
@@ -55,6 +158,22 @@ class Client:
             999: exceptions.UnknownError
         }
 
+    def __getattr__(self, name: str) -> Any:
+        """Bind the endpoint functions to this instance"""
+        fn = BaseClient._endpoints.get(name)
+        if fn is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        @wraps(fn)
+        def method(*args, timeout: Optional[float] = None, **kwargs):
+            if self._config.metrics:
+                return withEndpoint(name, withTimeout, timeout, fn, self, *args, **kwargs)
+
+            return withTimeout(timeout, fn, self, *args, **kwargs)
+
+        setattr(self, name, method)
+        return method
+
     @property
     def config(self) -> DUDeConfig:
         """Retrieve the current DUDeConfig object"""
@@ -64,6 +183,263 @@ class Client:
     def config(self, config: DUDeConfig) -> None:
         """Set the current DUDeConfig object"""
         self._config = config
+        self._decisions = None
+
+        # the pool settings may have changed
+        self._configChanged()
+
+    def _configChanged(self) -> None:
+        """Method called when a new configuration is set"""
+
+    def _context(self) -> RequestContext:
+        """Return the request context for the current configuration
+
+        The context is rebuilt only when the configuration has been replaced or modified.
+        During a request, the context of its first attempt is returned, so that a
+        configuration changed by another thread does not apply to half of the request.
+        """
+        pinned = _pinned.get()
+        if (pinned is not None) and (pinned[0] is self):
+            return pinned[1]
+
+        ctx = self._ctx
+        config = self._config
+        if (ctx is not None) and (ctx.config is config) and (ctx.generation == config._generation):
+            return ctx
+
+        with self._lock:
+            ctx = self._ctx
+            config = self._config
+            if (ctx is not None) and (ctx.config is config) and (ctx.generation == config._generation):
+                return ctx
+
+            previous, ctx = ctx, RequestContext.build(config, ctx)
+            self._ctx = ctx
+
+            # the session must be recreated if the pool or SSL settings have changed
+            if (previous is not None) and (previous.transport != ctx.transport):
+                self._configChanged()
+
+        return ctx
+
+    def _pin(self) -> Token:
+        """Pin the current request context for the request in progress
+
+        Returns:
+            The token to give to _unpin() at the end of the request
+        """
+        return _pinned.set((self, self._context()))
+
+    @staticmethod
+    def _unpin(token: Token) -> None:
+        _pinned.reset(token)
+
+    @property
+    def decisionCache(self) -> Optional[DecisionCache]:
+        """Retrieve the cache of the validate decisions, None if it is disabled"""
+        config = self._config
+        if not config.validate_cache:
+            return None
+
+        decisions = self._decisions
+        if decisions is None:
+            with self._lock:
+                if self._decisions is None:
+                    self._decisions = DecisionCache(
+                        maxsize=config.validate_cache_size,
+                        allow_ttl=config.validate_cache_allow_ttl,
+                        deny_ttl=config.validate_cache_deny_ttl
+                    )
+
+                decisions = self._decisions
+
+        return decisions
+
+    @property
+    def metrics(self) -> Optional[Registry]:
+        """Retrieve the registry of the metrics of the requests, None if they are disabled"""
+        if not self._config.metrics:
+            return None
+
+        registry = self._metrics
+        if registry is None:
+            with self._lock:
+                if self._metrics is None:
+                    self._metrics = Registry()
+
+                registry = self._metrics
+
+        return registry
+
+    @metrics.setter
+    def metrics(self, registry: Registry) -> None:
+        """Record the metrics in another registry (e.g. shared by several clients)"""
+        self._metrics = registry
+
+    def coalescingStats(self) -> Dict[str, int]:
+        """Return the statistics of the coalescing of the identical requests
+
+        Returns:
+            A dictionary with the number of requests sent (leaders), the number of calls
+            that waited for an identical request in flight (coalesced) and the requests in flight
+        """
+        return self._flights.stats()
+
+    def _flightKey(self, request: str, url: str, params: Optional[Dict[str, Any]], body: Dict[str, Any],
+                   decode: Any) -> Optional[Hashable]:
+        """Return the identity of a request for the coalescing, None if it cannot be coalesced
+
+        The timeout of the call is part of the identity: the calls with different
+        timeouts are not coalesced.
+        """
+        if not self._config.coalesce_requests:
+            return None
+
+        try:
+            key = (request, url, tuple(sorted((params or {}).items())), tuple(sorted(body.items())), decode,
+                   callTimeout())
+            hash(key)
+
+        except TypeError:
+            return None
+
+        return key
+
+    def retryStats(self) -> Dict[str, float]:
+        """Return the statistics of the retries
+
+        Returns:
+            A dictionary with the number of retries, the number of retries denied by
+            the budget and the tokens left in the budget
+        """
+        return self._context().retry.budget.stats()
+
+    def deadline(self, seconds: float):
+        """Limit the total time of the calls made in a block (see pyDUDe.deadline.deadline)
+
+            with client.deadline(0.050):
+                client.validate(email=email, right='read', token=token)
+
+        Args:
+            seconds: the time allowed to the block
+        """
+        return deadline(seconds)
+
+    def _timeouts(self) -> Tuple[Optional[float], Optional[float]]:
+        """Return the connect and read timeouts of the next request
+
+        The configured timeouts are replaced by the timeout of the call if any, and
+        are shortened to the time left before the deadline.
+
+        Raises:
+            DeadlineExceeded
+
+        Returns:
+            The (connect, read) timeouts, None for no limit
+        """
+        connect, read = self._context().timeout
+
+        override = callTimeout()
+        if override is not None:
+            connect = read = override
+
+        left = remaining()
+        if left is not None:
+            if left <= 0:
+                raise exceptions.DeadlineExceeded("Error: the deadline of the call has expired.")
+
+            connect = left if connect is None else min(connect, left)
+            read = left if read is None else min(read, left)
+
+        return connect, read
+
+    def circuitStates(self) -> Dict[str, str]:
+        """Return the state (closed, open or half-open) of the circuit breaker of each endpoint family"""
+        breakers = self._context().breakers
+        return breakers.states() if breakers is not None else {}
+
+    def circuitStats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the state, the requests and failures in the window and the rejected requests
+        of the circuit breaker of each endpoint family"""
+        breakers = self._context().breakers
+        return breakers.stats() if breakers is not None else {}
+
+    def _breaker(self, url: str) -> Optional[CircuitBreaker]:
+        """Return the circuit breaker of the endpoint family of a URL, None if disabled"""
+        ctx = self._context()
+        if ctx.breakers is None:
+            return None
+
+        return ctx.breakers.get(url[len(ctx.base) + 1:].split('/', 1)[0])
+
+    def _serverUrl(self, url: str, server: Optional[Server]) -> str:
+        """Return the URL of a request for the server chosen by the balancer"""
+        base = self._context().base
+        if (server is None) or (not url.startswith(base)):
+            return url
+
+        return server.base + url[len(base):]
+
+    def serverStats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the state, requests in flight, requests, errors and latency of each server
+        (empty with a single server)"""
+        balancer = self._context().balancer
+        return balancer.stats() if balancer is not None else {}
+
+    @staticmethod
+    def _canWait(delay: Optional[float]) -> bool:
+        """Check if a retry is possible after a delay, without exceeding the deadline"""
+        if delay is None:
+            return False
+
+        left = remaining()
+        return (left is None) or (delay < left)
+
+    @staticmethod
+    def _failure(error: Exception) -> Exception:
+        """Return the exception raised for a request that could not be executed"""
+        left = remaining()
+        if (left is not None) and (left <= 0):
+            return exceptions.DeadlineExceeded(error)
+
+        return exceptions.ConnectionError(error)
+
+    @classmethod
+    def _timedOut(cls, error: BaseException) -> bool:
+        """Check if a request failed because of the deadline or the timeout of its caller"""
+        if isinstance(error, exceptions.DeadlineExceeded):
+            return True
+
+        cause = error.args[0] if isinstance(error, exceptions.ConnectionError) and error.args else None
+        return isinstance(cause, cls._timeout_errors)
+
+    def _serverFailed(self, error: Exception) -> bool:
+        """Check if an error raised while sending a request is a failure of the server
+
+        The connection errors and the timeouts are, but not the expiration of the
+        deadline or of the timeout given by the caller.
+        """
+        if isinstance(error, exceptions.DeadlineExceeded) or not isinstance(error, exceptions.ConnectionError):
+            return False
+
+        return (callTimeout() is None) or not self._timedOut(error)
+
+    @staticmethod
+    def _retried() -> None:
+        """Count a new attempt of the request in progress in its metrics"""
+        measure = currentMeasure()
+        if measure is not None:
+            measure.retries += 1
+
+    @staticmethod
+    def _encode(ctx: RequestContext, body: Dict[str, Any]) -> bytes:
+        """Encode the body of a request, counting its size in the metrics of the request"""
+        data = ctx.codec.encode(body)
+        measure = currentMeasure()
+        if measure is not None:
+            measure.sent += len(data)
+
+        return data
 
     def _exception(self, value) -> Exception:
         """Retrieve the proper exception corresponding to the HTTP error
@@ -74,7 +450,7 @@ class Client:
         Returns:
             An exception
         """
-        return self.error_map.get(value, 999)
+        return self.error_map.get(value, self.error_map[999])
 
 
     def _url(self, endpoint: str, *, path: str = "") -> str:
@@ -82,12 +458,15 @@ class Client:
 
         Args:
             endpoint: the endpoint to connect to
+            path: the path below the endpoint if any
 
         Returns:
             the complete URL to use to connect to the endpoint
         """
-        value = f"{self._config.scheme}://{self._config.hostname}:{self._config.port}/{endpoint}"
-        if len(path) > 0:
+        ctx = self._context()
+
+        value = ctx.urls.get(endpoint) or f"{ctx.base}/{endpoint}"
+        if path:
             value = f"{value}/{path}"
 
         return value
@@ -98,10 +477,7 @@ class Client:
         Returns:
             None if we are not using SSL, the /path/to/certificate otherwise
         """
-        if self._config.root_ca != '':
-            return self._config.root_ca
-        else:
-            return None
+        return self._context().verify
 
     def _cert(self) -> Optional[Tuple[str, str]]:
         """Check if a client SSL certificate should be used
@@ -109,10 +485,7 @@ class Client:
         Returns:
             A Tuple with the certificate and the key for this client, None otherwise
         """
-        if (self._config.certfile != '') and (self._config.keyfile != ''):
-            return (self._config.certfile, self._config.keyfile)
-        else:
-            return None
+        return self._context().cert
 
     def _headers(self) -> Dict[str, str]:
         """Add necessary headers
@@ -120,13 +493,250 @@ class Client:
         Returns:
             A dictionary that can be used as a headers in requests
         """
-        headers = {}
-        if self._config.x_api_token != '':
-            headers['X-API-Token'] = self._config.x_api_token
+        return self._context().headers
+
+    def _result(self, status_code: int, data: Any, expect: T_Expect) -> Any:
+        """Convert the response of the server to the value returned by an endpoint
+
+        Args:
+            status_code: the HTTP status code of the response
+            data: the decoded body of the response
+            expect: the functions converting the data for each expected status code
+
+        Raises:
+            The exception corresponding to the status code if it was not expected
+
+        Returns:
+            The value computed from the data
+        """
+        if status_code in expect:
+            return expect[status_code](data)
+
+        # raise the proper exception depending on the status code
+        exception = self._exception(status_code)
+        try:
+            message = data['error']['message']
+        except (KeyError, TypeError):
+            message = f"Error: unexpected HTTP status {status_code}"
+
+        raise exception(message)
+
+    def _pageLimit(self, limit: int) -> int:
+        """Clamp the number of records requested for a page"""
+        if limit > MAX_SEARCH_LIMIT:
+            limit = MAX_SEARCH_LIMIT
+
+        return limit
+
+    def _pageDecoder(self, key: str) -> Optional[Callable[[bytes], T_Page]]:
+        """Return the function decoding the pages into entities, None to keep the dictionaries
+
+        Args:
+            key: the name of the list of records in the pages
+        """
+        model = MODELS.get(key)
+        if (not self._config.models) or (model is None):
+            return None
+
+        codec = self._context().codec
+        return lambda content: codec.decodePage(content, key, model)
+
+    def _page(self, url: str, offset: int, limit: int,
+              decode: Optional[Callable[[bytes], T_Page]] = None) -> T_Page:
+        """Retrieve a single page of a paginated endpoint
+
+        Args:
+            url: the URL of the endpoint
+            offset: the offset of the first record (starting at 1)
+            limit: the number of records in the page
+            decode: the function decoding the page, the codec decode() if None
+
+        Returns:
+            The page as returned by the server
+        """
+        params = {
+            'offset': offset,
+            'limit': limit
+        }
+
+        return self._call("GET", url, params=params, expect={200: lambda data: data}, decode=decode)
+
+
+class Client(BaseClient):
+    """Class to access the DUDe server
+
+    Client() returns the shared instance used by the functions of pyDUDe.endpoints.
+    Client(config) creates an independent instance, with its own configuration,
+    connection pool, threads and caches (e.g. one per tenant):
+
+        with Client(DUDeConfig(hostname='dude.tenant1.com')) as client:
+            users = list(client.getAllUsers())
+    """
+
+    # shared instance of this class
+    __instance: ClassVar[Optional[Client]] = None
+
+    def __new__(cls: Client, config: Optional[DUDeConfig] = None) -> Client:
+        """Return the shared instance of the class, or a new instance for a configuration
+
+        Args:
+            config: the DUDeConfig object of a new independent instance
+        """
+        if config is not None:
+            instance = object.__new__(cls)
+            instance._setup(config)
+            return instance
+
+        if cls.__instance is None:
+            cls.__instance = object.__new__(cls)
+            cls.__instance._setup(DUDeConfig())
+
+        return cls.__instance
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _setup(self, config: DUDeConfig) -> None:
+        """Method called to initialize the instance after its creation"""
+        self._setupBase(config)
+        self._pid = _pid
+
+        # pooled HTTP session (created on first request)
+        self._session: Optional[requests.Session] = None
+        self._retired: Dict[str, int] = { 'created': 0, 'reused': 0 }
+
+        # threads for the concurrent requests (created on first use)
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _configChanged(self) -> None:
+        """Close the current pool when a new configuration is set"""
+        self._closeSession()
+
+    def _forked(self) -> None:
+        """Forget the connections, threads and locks inherited from the parent process after a fork"""
+        if self._pid != _pid:
+            self._pid = _pid
+            self._lock = threading.RLock()
+            self._session = None
+            self._pool = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        """Return the executor used for the concurrent requests"""
+        self._forked()
+        pool = self._pool
+        if pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self._config.max_workers,
+                                                    thread_name_prefix='pyDUDe')
+
+                pool = self._pool
+
+        return pool
+
+    def _newSession(self) -> requests.Session:
+        """Create a new HTTP session with a connection pool sized from the configuration
+
+        Returns:
+            A requests Session object
+        """
+        adapter = _KeepAliveAdapter(
+            pool_connections=self._config.pool_connections,
+            pool_maxsize=self._config.pool_maxsize,
+            pool_block=self._config.pool_block,
+            keepalive=self._config.pool_keepalive
+        )
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        return session
+
+    def _pools(self):
+        """Iterate over the urllib3 connection pools of the current session"""
+        if self._session is None:
+            return
+
+        for adapter in set(self._session.adapters.values()):
+            manager = adapter.poolmanager
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is not None:
+                    yield pool
 
-        return headers
+    def _retire(self) -> None:
+        """Keep the statistics of the pools before they are dropped"""
+        for pool in self._pools():
+            self._retired['created'] += pool.num_connections
+            self._retired['reused'] += max(pool.num_requests - pool.num_connections, 0)
 
-    def _request(self, *, request: str = "", url: str = "", params: Optional[Dict[str, Any]] = None, body: Dict[str, Any] = {}) -> requests.Response:
+    def _getSession(self) -> requests.Session:
+        """Return the pooled session
+
+        The connections idle for longer than pool_keepalive are replaced by the
+        pools when they are taken for a new request.
+
+        Returns:
+            A requests Session object
+        """
+        self._forked()
+        session = self._session
+        if session is not None:
+            return session
+
+        with self._lock:
+            if self._session is None:
+                self._session = self._newSession()
+
+            return self._session
+
+    def _closeSession(self) -> None:
+        """Close the pooled session and all its connections
+
+        The requests in progress with this session are not interrupted.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._retire()
+                self._session.close()
+                self._session = None
+
+    def close(self) -> None:
+        """Close the pooled session and stop the threads of the client"""
+        self._closeSession()
+
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def poolStats(self) -> Dict[str, int]:
+        """Return the statistics of the connection pool
+
+        Returns:
+            A dictionary with the number of connections created, the number of requests
+            that reused an existing connection and the number of idle connections
+        """
+        stats = {
+            'created': self._retired['created'],
+            'reused': self._retired['reused'],
+            'idle': 0
+        }
+
+        for pool in self._pools():
+            stats['created'] += pool.num_connections
+            stats['reused'] += max(pool.num_requests - pool.num_connections, 0)
+            if pool.pool is not None:
+                stats['idle'] += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+        return stats
+
+    def _request(self, *, request: str = "", url: str = "", params: Optional[Dict[str, Any]] = None, body: Dict[str, Any] = {},
+                 headers: Optional[Dict[str, str]] = None) -> requests.Response:
         """Execute a request and return the data
 
         Args:
@@ -134,25 +744,28 @@ class Client:
             url: the URL for the request
             params: parameters for the request if any
             body: body data for the request if any
+            headers: extra headers for the request if any
         """
         # extra arguments for requests
-        kwargs = {
-            'headers': self._headers(),
-            'verify': self._verify(),
-            'cert': self._cert()
-        }
+        ctx = self._context()
+        kwargs = ctx.body_kwargs if request in ("POST", "PUT") else ctx.kwargs
+        if headers:
+            kwargs = { **kwargs, 'headers': { **kwargs['headers'], **headers } }
+
+        timeout = self._timeouts()
+        session = self._getSession()
 
         if request == "GET":
-            response = requests.get(url, params, **kwargs)
+            response = session.get(url, params=params, timeout=timeout, **kwargs)
 
         elif request == "POST":
-            response = requests.post(url, json=body, **kwargs)
+            response = session.post(url, data=self._encode(ctx, body), timeout=timeout, **kwargs)
 
         elif request == "PUT":
-            response = requests.put(url, json=body, **kwargs)
+            response = session.put(url, data=self._encode(ctx, body), timeout=timeout, **kwargs)
 
         elif request == "DELETE":
-            response = requests.delete(url, **kwargs)
+            response = session.delete(url, timeout=timeout, **kwargs)
 
         else:
             raise ValueError(f"Error: unknown method [{request}] called.")
@@ -177,13 +790,311 @@ class Client:
         return self._request(request="DELETE", url=url)
 
 
+    @staticmethod
+    def _transient(error: Exception) -> Tuple[bool, bool]:
+        """Classify an error raised while sending a request
+
+        Returns:
+            (the error is transient, the request may have reached the server)
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True, False
+
+        if isinstance(error, requests.exceptions.ConnectionError):
+            reason = getattr(error.args[0], 'reason', None) if error.args else None
+            return True, not isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+        return isinstance(error, requests.exceptions.Timeout), True
+
+    def _send(self, request: str, url: str, params: Optional[Dict[str, Any]], body: Dict[str, Any], *,
+              idempotent: bool, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Execute a request, retrying the transient failures according to the retry policy
+
+        With several servers, each attempt is sent to a server chosen by the balancer
+        among the ones that have not failed yet for this request.
+
+        Args:
+            request: the type of the request (POST, GET, PUT, DELETE)
+            url: the URL for the request
+            params: parameters for the request if any
+            body: body data for the request if any
+            idempotent: the request can be repeated safely
+            headers: extra headers for the request if any
+
+        Raises:
+            ConnectionError
+
+        Returns:
+            The last response received
+        """
+        ctx = self._context()
+        policy, balancer = ctx.retry, ctx.balancer
+        policy.budget.deposit()
+
+        tried: List[Server] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            server = balancer.pick(tried) if balancer is not None else None
+            start = time.perf_counter()
+            try:
+                response = self._request(request=request, url=self._serverUrl(url, server), params=params, body=body,
+                                         headers=headers)
+
+            except exceptions.DeadlineExceeded:
+                if server is not None:
+                    balancer.release(server)
+                raise
+
+            except Exception as e:
+                if server is not None:
+                    balancer.done(server, time.perf_counter() - start, True)
+                    tried.append(server)
+
+                transient, sent = self._transient(e)
+                delay = policy.retry(attempt, idempotent=idempotent, sent=sent) if transient else None
+                if not self._canWait(delay):
+                    raise self._failure(e)
+
+                self._retried()
+                time.sleep(delay)
+                continue
+
+            if server is not None:
+                balancer.done(server, time.perf_counter() - start, response.status_code >= 500)
+
+            if response.status_code not in policy.statuses:
+                return response
+
+            delay = policy.retry(attempt, idempotent=idempotent, status=response.status_code)
+            if not self._canWait(delay):
+                return response
+
+            if server is not None:
+                tried.append(server)
+
+            self._retried()
+            time.sleep(delay)
+
+    def _call(self, request: str, url: str, *, params: Optional[Dict[str, Any]] = None,
+              body: Dict[str, Any] = {}, expect: T_Expect, cache: Any = None, key: Any = None,
+              decode: Optional[Callable[[bytes], Any]] = None, coalesce: bool = False,
+              headers: Optional[Dict[str, str]] = None, with_headers: bool = False) -> Any:
+        """Execute a request and convert its response
+
+        Args:
+            request: the type of the request (POST, GET, PUT, DELETE)
+            url: the URL for the request
+            params: parameters for the request if any
+            body: body data for the request if any
+            expect: the functions converting the data for each expected status code
+            cache: a cache (with get/put methods) for the value, if any
+            key: the key of the value in the cache
+            decode: the function decoding the body, the codec decode() if None
+            coalesce: share the result of the identical requests in flight (always done for GET)
+            headers: extra headers for the request if any (such a request is not coalesced)
+            with_headers: return the headers of the response with the value
+
+        Raises:
+            ConnectionError, or the exception corresponding to the HTTP status
+
+        Returns:
+            The value computed from the response, or (value, headers) with with_headers
+        """
+        registry = self.metrics
+        if cache is not None:
+            value = cache.get(key)
+            if value is not None:
+                if registry is not None:
+                    registry.hit(currentEndpoint())
+                return value
+
+        def send(measure: Optional[Measure] = None) -> Any:
+            breaker = self._breaker(url)
+            if (breaker is not None) and (not breaker.allow()):
+                raise exceptions.CircuitOpen(f"Error: the circuit of [{url}] is open.")
+
+            token = self._pin()
+            failed = None
+            try:
+                response = self._send(request, url, params, body, idempotent=coalesce or (request != "POST"),
+                                      headers=headers)
+                failed = response.status_code >= 500
+
+            except Exception as e:
+                failed = True if self._serverFailed(e) else None
+                raise
+
+            finally:
+                self._unpin(token)
+                if breaker is not None:
+                    if failed is None:
+                        breaker.release()
+                    else:
+                        breaker.record(failed)
+
+            try:
+                content = response.content
+                if measure is not None:
+                    measure.response(response.status_code, len(content))
+
+                data = (decode or self._context().codec.decode)(content) if content else None
+
+            except Exception as e:
+                raise exceptions.ConnectionError(e)
+
+            if measure is not None:
+                measure.decoded()
+
+            value = self._result(response.status_code, data, expect)
+            if cache is not None:
+                cache.put(key, value)
+
+            return (value, response.headers) if with_headers else value
+
+        endpoint = currentEndpoint()
+
+        def timed() -> Any:
+            with registry.measure(endpoint, request, url) as measure:
+                return send(measure)
+
+        task = timed if registry is not None else send
+
+        flight = None
+        if ((request == "GET") or coalesce) and not headers:
+            flight = self._flightKey(request, url, params, body, decode)
+        if flight is None:
+            return task()
+
+        return self._flights.do(flight, task)
+
+    def _paginate(self, url: str, key: str, *, limit: int) -> Iterator[Dict[str, Any]]:
+        """Iterate over all the records of a paginated endpoint
+
+        Args:
+            url: the URL of the endpoint
+            key: the name of the list of records in the response
+            limit: the number of records per page
+
+        Raises:
+            ConnectionError, or the exception corresponding to the HTTP status
+
+        Returns:
+            An iterator over the records (entity models with the models option)
+        """
+        window = self._config.prefetch_pages
+        decode = self._pageDecoder(key)
+        pages = Paginator(lambda offset, limit: self._page(url, offset, limit, decode), limit=self._pageLimit(limit),
+                          window=window, executor=self._executor() if window > 0 else None)
+
+        for data in pages:
+            yield from data[key]
+
+    def _bulk(self, name: str, items: List[Dict[str, Any]], *, window: int, stop_on_error: bool) -> List[Any]:
+        """Call an endpoint for several items with a bounded number of concurrent requests
+
+        Args:
+            name: the name of the endpoint function
+            items: the keyword arguments of the endpoint for each call
+            window: the maximum number of requests in flight, capped by max_workers (the
+                    threads of the executor running the calls)
+            stop_on_error: do not start new calls after the first failure
+
+        Returns:
+            The result (or the exception raised) of each call, in the order of the items.
+            The items not processed after a failure have None as result.
+        """
+        fn = self._endpoints[name]
+        executor = self._executor()
+        results: List[Any] = [None] * len(items)
+        window = max(1, min(window, self._config.max_workers))
+
+        pending: Dict[Future, int] = {}
+        queue = iter(enumerate(items))
+        stopped = False
+
+        while True:
+            # keep the window full
+            while (not stopped) and (len(pending) < window):
+                entry = next(queue, None)
+                if entry is None:
+                    break
+
+                index, item = entry
+                pending[executor.submit(contextvars.copy_context().run, fn, self, **item)] = index
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = e
+                    stopped = stopped or stop_on_error
+
+        return results
+
+    def _many(self, name: str, arg: str, ids: Iterable[int], *, window: int) -> Dict[int, Any]:
+        """Call a single-id endpoint for several ids with a bounded number of concurrent requests
+
+        Args:
+            name: the name of the endpoint function
+            arg: the name of the id argument of the endpoint
+            ids: the ids, requested once each
+            window: the maximum number of requests in flight, capped by max_workers
+
+        Returns:
+            A dictionary id -> result of the call, or the exception it raised
+        """
+        unique = list(dict.fromkeys(ids))
+        results = self._bulk(name, [{ arg: value } for value in unique], window=window, stop_on_error=False)
+
+        return dict(zip(unique, results))
+
+    def scan(self, endpoint: str, *, workers: int = 4, total: Optional[int] = None,
+             ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """Retrieve all the records of a paginated endpoint with parallel requests
+
+        The offset space of the endpoint is split in disjoint ranges read by a pool of threads.
+
+        Args:
+            endpoint: the paginated endpoint (e.g. 'users', 'user-rights', 'teams/3/users')
+            workers: the number of threads
+            total: the number of records if known, probed from the server otherwise
+            ordered: deliver the records in order, or as soon as they are received
+
+        Raises:
+            ConnectionError, BadRequest, NotFound, InternalServerError
+
+        Returns:
+            An iterator over the records (entity models with the models option)
+        """
+        url = self._url(endpoint)
+        key = endpoint.split('/')[-1]
+        decode = self._pageDecoder(key)
+
+        return iter(Scanner(lambda offset, limit: self._page(url, offset, limit, decode), key,
+                            workers=workers, total=total, ordered=ordered))
+
     @staticmethod
     def endpoint(fn):
         """Decorator to define endpoints"""
+        name = fn.__name__
+
         @wraps(fn)
-        def wrapper(*args, **kwargs):
+        def wrapper(*args, timeout: Optional[float] = None, **kwargs):
             # add the client instance at the beginning of each functions
-            return fn(Client(), *args, **kwargs)
+            client = Client()
+            if client._config.metrics:
+                return withEndpoint(name, withTimeout, timeout, fn, client, *args, **kwargs)
+
+            return withTimeout(timeout, fn, client, *args, **kwargs)
+
+        # keep the function for the other clients
+        BaseClient._endpoints[fn.__name__] = fn
 
         # add the function to the client namespace
         setattr(Client(), fn.__name__, wrapper)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Deadlines and per-call timeouts, propagated with context variables
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+import inspect
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+#----- Globals
+_deadline: ContextVar[Optional[float]] = ContextVar('pyDUDe_deadline', default=None)
+_timeout: ContextVar[Optional[float]] = ContextVar('pyDUDe_timeout', default=None)
+
+
+#----- Functions
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """Limit the total time of the requests sent in a block
+
+    The deadline covers all the requests sent in the block (retries and pages
+    included), in the current thread or task and in the threads started by the
+    client for it. A nested deadline cannot extend the enclosing one.
+
+        with deadline(0.050):
+            client.validate(email=email, right='read', token=token)
+
+    Args:
+        seconds: the time allowed to the block
+
+    Returns:
+        The deadline, as a time.monotonic() value
+    """
+    value = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        value = min(value, current)
+
+    token = _deadline.set(value)
+    try:
+        yield value
+
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Return the time left before the current deadline, None if there is no deadline"""
+    value = _deadline.get()
+    if value is None:
+        return None
+
+    return value - time.monotonic()
+
+
+def callTimeout() -> Optional[float]:
+    """Return the timeout of the current call, None if not overridden"""
+    return _timeout.get()
+
+
+def _iterate(iterator: Iterator[Any], timeout: float) -> Iterator[Any]:
+    """Iterate over the results of a call with its timeout"""
+    while True:
+        token = _timeout.set(timeout)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _timeout.reset(token)
+
+        yield item
+
+
+async def _await(awaitable: Awaitable[Any], timeout: float) -> Any:
+    """Await the result of a call with its timeout"""
+    token = _timeout.set(timeout)
+    try:
+        return await awaitable
+    finally:
+        _timeout.reset(token)
+
+
+async def _aiterate(iterator: AsyncIterator[Any], timeout: float) -> AsyncIterator[Any]:
+    """Iterate asynchronously over the results of a call with its timeout"""
+    while True:
+        token = _timeout.set(timeout)
+        try:
+            item = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _timeout.reset(token)
+
+        yield item
+
+
+def withTimeout(timeout: Optional[float], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call an endpoint function with a specific timeout for its requests
+
+    The timeout also applies to the requests sent later by the generator, coroutine
+    or asynchronous generator returned by the function.
+
+    Args:
+        timeout: the connect and read timeout (seconds), None to keep the configured ones
+        fn: the endpoint function
+
+    Returns:
+        The value returned by the function
+    """
+    if timeout is None:
+        return fn(*args, **kwargs)
+
+    token = _timeout.set(timeout)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        _timeout.reset(token)
+
+    if inspect.isgenerator(result):
+        return _iterate(result, timeout)
+
+    if inspect.isasyncgen(result):
+        return _aiterate(result, timeout)
+
+    if inspect.isawaitable(result):
+        return _await(result, timeout)
+
+    return result
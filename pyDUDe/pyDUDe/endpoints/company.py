@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Iterator
+from typing import Any, Dict, Iterator, Iterable, Union
 
 from pyDUDe import (
-    Client, exceptions,
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -55,19 +53,8 @@ def createCompany(client: Client, *, name: str) -> int:
         'name': name
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 201:
-        return int(data['id'])
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
 
 @Client.endpoint
@@ -84,39 +71,8 @@ def getAllCompanies(client: Client, *, limit = DEFAULT_SEARCH_LIMIT) -> Iterator
     Returns:
         An iterator to a Company object
     """
-    offset = 1
     url = client._url('companies')
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['companies']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'companies', limit=limit)
 
 
 @Client.endpoint
@@ -132,19 +88,8 @@ def deleteAllCompanies(client: Client) -> bool:
     Returns:
         True if all the companies have been deleted
     """
-    try:
-        response = client._delete(client._url('companies'))
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", client._url('companies'), expect={204: lambda data: True})
 
 
 #
@@ -167,19 +112,24 @@ def getSingleCompany(client: Client, *, company_id: int) -> T_Company:
     """
     url = client._url('companies', path=f"{company_id}")
 
-    try:
-        response = client._get(url)
-        data = response.json()
+    # send the request to the server
+    return client._call("GET", url, expect={200: lambda data: data})
+
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
+@Client.endpoint
+def getManyCompanies(client: Client, *, company_ids: Iterable[int], window: int = 8) -> Dict[int, Union[T_Company, Exception]]:
+    """Retrieve details for several companies with concurrent requests
 
-    if response.status_code == 200:
-        return data
+    Args:
+        client      : the Client instance
+        company_ids : the IDs of the companies (duplicates are requested once)
+        window      : the maximum number of requests in flight (capped by max_workers with the Client)
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Returns:
+        For each ID, the details for the company or the exception raised while
+        retrieving it (e.g. NotFound)
+    """
+    return client._many('getSingleCompany', 'company_id', company_ids, window=window)
 
 
 @Client.endpoint
@@ -202,19 +152,8 @@ def updateSingleCompany(client: Client, *, name: str, company_id: int) -> bool:
         'name': name
     }
 
-    try:
-        response = client._put(url, body)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("PUT", url, body=body, expect={204: lambda data: True})
 
 
 @Client.endpoint
@@ -233,19 +172,8 @@ def deleteSingleCompany(client: Client, *, company_id: int) -> bool:
     """
     url = client._url('companies', path=f"{company_id}")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
 
 
 #
@@ -272,19 +200,8 @@ def createCompanyUnit(client: Client, *, company_id: int, name: str) -> int:
         'name': name
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 201:
-        return int(data['id'])
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
 
 @Client.endpoint
@@ -302,39 +219,8 @@ def getCompanyUnits(client: Client, *, company_id: int, limit = DEFAULT_SEARCH_L
     Returns:
         An iterator to a Unit object
     """
-    offset = 1
     url = client._url('companies', path=f"{company_id}/units")
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['units']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'units', limit=limit)
 
 
 @Client.endpoint
@@ -353,16 +239,5 @@ def deleteCompanyUnits(client: Client, *, company_id: int) -> bool:
     """
     url = client._url('companies', path=f"{company_id}/units")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
@@ -13,12 +13,10 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, Optional
-
-import requests
+from typing import Optional
 
 from pyDUDe import (
-    Client, exceptions
+    Client,
 )
 
 
@@ -39,20 +37,7 @@ def version(client: Client) -> Optional[str]:
     url = client._url('version')
 
     # send the request to the server
-    try:
-        response = client._get(url)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    # return the API version
-    if response.status_code == 200:
-        return data['version']
-
-    # raise the proper exception depending on the status code
-    exception = client.exception(response.status_code)
-    raise exception(data['error']['message'])
+    return client._call("GET", url, expect={200: lambda data: data['version']})
 
 
 @Client.endpoint
@@ -78,29 +63,21 @@ def authenticate(client: Client, *, appname: str, apikey: str) -> Optional[str]:
     }
 
     # send the request to the server
-    try:
-        response = client._post(url, body)
-        data = response.json()
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    # return the token
-    if response.status_code == 200:
-        return data['token']
-
-    # raise the proper exception depending on the status code
-    exception = client.exception(response.status_code)
-    raise exception(data['error']['message'])
+    return client._call("POST", url, body=body, expect={200: lambda data: data['token']})
 
 
 @Client.endpoint
-def validate(client: Client, *, email: str, right: str, token: str) -> bool:
+def validate(client: Client, *, email: str, right: str, token: Optional[str] = None) -> bool:
     """Validate a user for a specific right
 
+    The decision is served from the client decision cache when it is enabled
+    in the configuration (validate_cache).
+
     Args:
         email: the user's email
         right: the right for which the user should be tested
-        token: the JWT as returned by the auth endpoint
+        token: the JWT as returned by the auth endpoint, the one of the
+               TokenManager attached to the client if None
 
     Raises:
         ConnectionError, BadRequest, Unauthenticated,
@@ -109,6 +86,12 @@ def validate(client: Client, *, email: str, right: str, token: str) -> bool:
     Returns:
         True if the user is authorized, False otherwise
     """
+    if token is None:
+        if client.tokens is None:
+            raise ValueError("Error: no token given and no TokenManager attached to the client.")
+
+        token = client.tokens.token()
+
     # URL & body for the request
     url = client._url("validate")
     body = {
@@ -118,17 +101,7 @@ def validate(client: Client, *, email: str, right: str, token: str) -> bool:
     }
 
     # send the request to the server
-    try:
-        response = client._post(url, body)
-        data = response.json()
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 200:
-        return True
-    elif response.status_code == 403:
-        return False
-    else:
-        # raise the proper exception depending on the status code
-        exception = client.exception(response.status_code)
-        raise exception(data['error']['message'])
+    return client._call("POST", url, body=body, expect={
+        200: lambda data: True,
+        403: lambda data: False
+    }, cache=client.decisionCache, key=(email, right, token), coalesce=True)
@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Iterator
+from typing import Any, Dict, List, Optional, Iterator, Union, Iterable
 
 from pyDUDe import (
-    Client, exceptions
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -56,19 +54,26 @@ def createRight(client: Client, *, team_id: int, name: str) -> int:
         'team_id': team_id
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
 
-    if response.status_code == 201:
-        return int(data['id'])
+@Client.endpoint
+def createRights(client: Client, *, rights: List[Dict[str, Any]], window: int = 8,
+                 stop_on_error: bool = False) -> List[Union[int, Exception, None]]:
+    """Create several rights with concurrent requests
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Args:
+        client        : the Client instance
+        rights        : the team_id and name of each right to create
+        window        : the maximum number of requests in flight (capped by max_workers with the Client)
+        stop_on_error : do not create the remaining rights after the first failure
+
+    Returns:
+        For each right in the input order, the Id of the new right or the exception raised
+        while creating it (None if it has not been created after a failure)
+    """
+    return client._bulk('createRight', rights, window=window, stop_on_error=stop_on_error)
 
 
 @Client.endpoint
@@ -86,38 +91,7 @@ def getAllRights(client: Client, *, limit = DEFAULT_SEARCH_LIMIT) -> Iterator[T_
         An iterator to a Right object
     """
     url = client._url('rights')
-    offset = 1
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['rights']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'rights', limit=limit)
 
 
 @Client.endpoint
@@ -133,19 +107,8 @@ def deleteAllRights(client: Client) -> bool:
     Returns:
         True if all the rights have been deleted
     """
-    try:
-        response = client._delete(client._url('rights'))
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", client._url('rights'), expect={204: lambda data: True})
 
 
 #
@@ -168,19 +131,24 @@ def getSingleRight(client: Client, *, right_id: int) -> T_Right:
     """
     url = client._url('rights', path=f"{right_id}")
 
-    try:
-        response = client._get(url)
-        data = response.json()
+    # send the request to the server
+    return client._call("GET", url, expect={200: lambda data: data})
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
 
-    if response.status_code == 200:
-        return data
+@Client.endpoint
+def getManyRights(client: Client, *, right_ids: Iterable[int], window: int = 8) -> Dict[int, Union[T_Right, Exception]]:
+    """Retrieve details for several rights with concurrent requests
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Args:
+        client    : the Client instance
+        right_ids : the IDs of the rights (duplicates are requested once)
+        window    : the maximum number of requests in flight (capped by max_workers with the Client)
+
+    Returns:
+        For each ID, the details for the right or the exception raised while
+        retrieving it (e.g. NotFound)
+    """
+    return client._many('getSingleRight', 'right_id', right_ids, window=window)
 
 
 @Client.endpoint
@@ -204,19 +172,8 @@ def updateSingleRight(client: Client, *, right_id: int, name: Optional[str] = No
     if name:
         body['name'] = name
 
-    try:
-        response = client._put(url, body)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("PUT", url, body=body, expect={204: lambda data: True})
 
 
 @Client.endpoint
@@ -235,16 +192,5 @@ def deleteSingleRight(client: Client, *, right_id: int) -> bool:
     """
     url = client._url('rights', path=f"{right_id}")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
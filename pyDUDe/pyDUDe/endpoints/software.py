@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Iterator
+from typing import Any, Dict, Optional, Iterator, Iterable, Union
 
 from pyDUDe import (
-    Client, exceptions
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -56,19 +54,8 @@ def createSoftware(client: Client, *, team_id: int, name: str) -> int:
         'team_id': team_id
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 201:
-        return int(data['id'])
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
 
 @Client.endpoint
@@ -86,38 +73,7 @@ def getAllSoftware(client: Client, *, limit = DEFAULT_SEARCH_LIMIT) -> Iterator[
         An iterator to a Software object
     """
     url = client._url('software')
-    offset = 1
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['software']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'software', limit=limit)
 
 
 @Client.endpoint
@@ -133,19 +89,8 @@ def deleteAllSoftware(client: Client) -> bool:
     Returns:
         True if all the software have been deleted
     """
-    try:
-        response = client._delete(client._url('software'))
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", client._url('software'), expect={204: lambda data: True})
 
 
 #
@@ -168,19 +113,24 @@ def getSingleSoftware(client: Client, *, software_id: int) -> T_Software:
     """
     url = client._url('software', path=f"{software_id}")
 
-    try:
-        response = client._get(url)
-        data = response.json()
+    # send the request to the server
+    return client._call("GET", url, expect={200: lambda data: data})
+
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
+@Client.endpoint
+def getManySoftware(client: Client, *, software_ids: Iterable[int], window: int = 8) -> Dict[int, Union[T_Software, Exception]]:
+    """Retrieve details for several software with concurrent requests
 
-    if response.status_code == 200:
-        return data
+    Args:
+        client       : the Client instance
+        software_ids : the IDs of the software (duplicates are requested once)
+        window       : the maximum number of requests in flight (capped by max_workers with the Client)
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Returns:
+        For each ID, the details for the software or the exception raised while
+        retrieving it (e.g. NotFound)
+    """
+    return client._many('getSingleSoftware', 'software_id', software_ids, window=window)
 
 
 @Client.endpoint
@@ -209,19 +159,8 @@ def updateSingleSoftware(client: Client, *, software_id: int, name: Optional[str
     if team_id:
         body['team_id'] = team_id
 
-    try:
-        response = client._put(url, body)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("PUT", url, body=body, expect={204: lambda data: True})
 
 
 @Client.endpoint
@@ -240,16 +179,5 @@ def deleteSingleSoftware(client: Client, *, software_id: int) -> bool:
     """
     url = client._url('software', path=f"{software_id}")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
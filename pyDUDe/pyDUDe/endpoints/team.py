@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Iterator
+from typing import Any, Dict, Optional, Iterator, Iterable, Union
 
 from pyDUDe import (
-    Client, exceptions
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -56,19 +54,8 @@ def createTeam(client: Client, *, unit_id: int, name: str) -> int:
         'unit_id': unit_id
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 201:
-        return int(data['id'])
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
 
 @Client.endpoint
@@ -86,38 +73,7 @@ def getAllTeams(client: Client, *, limit = DEFAULT_SEARCH_LIMIT) -> Iterator[T_T
         An iterator to a Team object
     """
     url = client._url('teams')
-    offset = 1
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['teams']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'teams', limit=limit)
 
 
 @Client.endpoint
@@ -133,19 +89,8 @@ def deleteAllTeams(client: Client) -> bool:
     Returns:
         True if all the teams have been deleted
     """
-    try:
-        response = client._delete(client._url('teams'))
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", client._url('teams'), expect={204: lambda data: True})
 
 
 #
@@ -168,19 +113,24 @@ def getSingleTeam(client: Client, *, team_id: int) -> T_Team:
     """
     url = client._url('teams', path=f"{team_id}")
 
-    try:
-        response = client._get(url)
-        data = response.json()
+    # send the request to the server
+    return client._call("GET", url, expect={200: lambda data: data})
+
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
+@Client.endpoint
+def getManyTeams(client: Client, *, team_ids: Iterable[int], window: int = 8) -> Dict[int, Union[T_Team, Exception]]:
+    """Retrieve details for several teams with concurrent requests
 
-    if response.status_code == 200:
-        return data
+    Args:
+        client   : the Client instance
+        team_ids : the IDs of the teams (duplicates are requested once)
+        window   : the maximum number of requests in flight (capped by max_workers with the Client)
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Returns:
+        For each ID, the details for the team or the exception raised while
+        retrieving it (e.g. NotFound)
+    """
+    return client._many('getSingleTeam', 'team_id', team_ids, window=window)
 
 
 @Client.endpoint
@@ -208,19 +158,8 @@ def updateSingleTeam(client: Client, *, team_id: int, name: Optional[str] = None
     if unit_id:
         body['unit_id'] = unit_id
 
-    try:
-        response = client._put(url, body)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("PUT", url, body=body, expect={204: lambda data: True})
 
 
 @Client.endpoint
@@ -239,16 +178,5 @@ def deleteSingleTeam(client: Client, *, team_id: int) -> bool:
     """
     url = client._url('teams', path=f"{team_id}")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
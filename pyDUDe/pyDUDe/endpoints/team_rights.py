@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Iterator, Optional
+from typing import Any, Dict, Iterator
 
 from pyDUDe import (
-    Client, exceptions,
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -49,19 +47,8 @@ def createTeamRight(client: Client, *, team_id: int, name: str) -> int:
         'name': name
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 201:
-        return int(data['id'])
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
 
 @Client.endpoint
@@ -80,38 +67,7 @@ def getTeamRights(client: Client, *, team_id: int, limit = DEFAULT_SEARCH_LIMIT)
         An iterator to a Rights object
     """
     url = client._url("teams", path=f"{team_id}/rights")
-    offset = 1
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['rights']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'rights', limit=limit)
 
 
 @Client.endpoint
@@ -130,16 +86,5 @@ def deleteTeamRights(client: Client, *, team_id: int) -> bool:
     """
     url = client._url('teams', path=f"{team_id}/rights")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Iterator, Optional
+from typing import Any, Dict, Iterator, Optional, Iterable, Union
 
 from pyDUDe import (
-    Client, exceptions,
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -56,19 +54,8 @@ def createUnit(client: Client, *, company_id: int, name: str) -> int:
         'company_id': company_id
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 201:
-        return int(data['id'])
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
 
 @Client.endpoint
@@ -85,39 +72,8 @@ def getAllUnits(client: Client, *, limit = DEFAULT_SEARCH_LIMIT) -> Iterator[T_U
     Returns:
         An iterator to a Unit object
     """
-    offset = 1
     url = client._url('units')
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['units']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'units', limit=limit)
 
 
 @Client.endpoint
@@ -133,23 +89,8 @@ def deleteAllUnits(client: Client) -> bool:
     Returns:
         True if all the units have been deleted
     """
-    try:
-        response = client._delete(client._url('units'))
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
-
-#
-# Specific unit
-#
+    # send the request to the server
+    return client._call("DELETE", client._url('units'), expect={204: lambda data: True})
 
 @Client.endpoint
 def getSingleUnit(client: Client, *, unit_id: int) -> T_Unit:
@@ -167,19 +108,24 @@ def getSingleUnit(client: Client, *, unit_id: int) -> T_Unit:
     """
     url = client._url('units', path=f"{unit_id}")
 
-    try:
-        response = client._get(url)
-        data = response.json()
+    # send the request to the server
+    return client._call("GET", url, expect={200: lambda data: data})
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
 
-    if response.status_code == 200:
-        return data
+@Client.endpoint
+def getManyUnits(client: Client, *, unit_ids: Iterable[int], window: int = 8) -> Dict[int, Union[T_Unit, Exception]]:
+    """Retrieve details for several units with concurrent requests
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Args:
+        client   : the Client instance
+        unit_ids : the IDs of the units (duplicates are requested once)
+        window   : the maximum number of requests in flight (capped by max_workers with the Client)
+
+    Returns:
+        For each ID, the details for the unit or the exception raised while
+        retrieving it (e.g. NotFound)
+    """
+    return client._many('getSingleUnit', 'unit_id', unit_ids, window=window)
 
 
 @Client.endpoint
@@ -203,19 +149,8 @@ def updateSingleUnit(client: Client, *, unit_id: int, name: Optional[str] = None
     if name:
         body['name'] = name
 
-    try:
-        response = client._put(url, body)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("PUT", url, body=body, expect={204: lambda data: True})
 
 
 @Client.endpoint
@@ -234,19 +169,8 @@ def deleteSingleUnit(client: Client, *, unit_id: int) -> bool:
     """
     url = client._url('units', path=f"{unit_id}")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
 
 
 #
@@ -273,19 +197,8 @@ def createUnitTeam(client: Client, *, unit_id: int, name: str) -> int:
         'name': name
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 201:
-        return int(data['id'])
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
 
 @Client.endpoint
@@ -304,38 +217,7 @@ def getUnitTeams(client: Client, *, unit_id: int, limit = DEFAULT_SEARCH_LIMIT)
         An iterator to a Team object
     """
     url = client._url('units', path=f"{unit_id}/teams")
-    offset = 1
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['teams']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'teams', limit=limit)
 
 
 @Client.endpoint
@@ -354,16 +236,5 @@ def deleteUnitTeams(client: Client, *, unit_id: int) -> bool:
     """
     url = client._url('units', path=f"{unit_id}/teams")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Iterator
+from typing import Any, Dict, List, Optional, Iterator, Union, Iterable
 
 from pyDUDe import (
-    Client, exceptions
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -58,19 +56,26 @@ def createUser(client: Client, *, team_id: int, name: str, email: str) -> int:
         'team_id': team_id
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
 
-    if response.status_code == 201:
-        return int(data['id'])
+@Client.endpoint
+def createUsers(client: Client, *, users: List[Dict[str, Any]], window: int = 8,
+                stop_on_error: bool = False) -> List[Union[int, Exception, None]]:
+    """Create several users with concurrent requests
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Args:
+        client        : the Client instance
+        users         : the team_id, name and email of each user to create
+        window        : the maximum number of requests in flight (capped by max_workers with the Client)
+        stop_on_error : do not create the remaining users after the first failure
+
+    Returns:
+        For each user in the input order, the Id of the new user or the exception raised
+        while creating it (None if it has not been created after a failure)
+    """
+    return client._bulk('createUser', users, window=window, stop_on_error=stop_on_error)
 
 
 @Client.endpoint
@@ -88,38 +93,7 @@ def getAllUsers(client: Client, *, limit = DEFAULT_SEARCH_LIMIT) -> Iterator[T_U
         An iterator to a User object
     """
     url = client._url('users')
-    offset = 1
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['users']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'users', limit=limit)
 
 
 @Client.endpoint
@@ -135,19 +109,8 @@ def deleteAllUsers(client: Client) -> bool:
     Returns:
         True if all the users have been deleted
     """
-    try:
-        response = client._delete(client._url('users'))
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", client._url('users'), expect={204: lambda data: True})
 
 
 #
@@ -170,19 +133,24 @@ def getSingleUser(client: Client, *, user_id: int) -> T_User:
     """
     url = client._url('users', path=f"{user_id}")
 
-    try:
-        response = client._get(url)
-        data = response.json()
+    # send the request to the server
+    return client._call("GET", url, expect={200: lambda data: data})
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
 
-    if response.status_code == 200:
-        return data
+@Client.endpoint
+def getManyUsers(client: Client, *, user_ids: Iterable[int], window: int = 8) -> Dict[int, Union[T_User, Exception]]:
+    """Retrieve details for several users with concurrent requests
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Args:
+        client   : the Client instance
+        user_ids : the IDs of the users (duplicates are requested once)
+        window   : the maximum number of requests in flight (capped by max_workers with the Client)
+
+    Returns:
+        For each ID, the details for the user or the exception raised while
+        retrieving it (e.g. NotFound)
+    """
+    return client._many('getSingleUser', 'user_id', user_ids, window=window)
 
 
 @Client.endpoint
@@ -215,19 +183,8 @@ def updateSingleUser(client: Client, *, user_id: int, name: Optional[str] = None
     if team_id:
         body['team_id'] = team_id
 
-    try:
-        response = client._put(url, body)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("PUT", url, body=body, expect={204: lambda data: True})
 
 
 @Client.endpoint
@@ -246,16 +203,5 @@ def deleteSingleUser(client: Client, *, user_id: int) -> bool:
     """
     url = client._url('users', path=f"{user_id}")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
@@ -13,15 +13,13 @@
 
 #----- Imports
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Iterator
+from typing import Any, Dict, List, Optional, Iterator, Union, Iterable
 
 from pyDUDe import (
-    Client, exceptions
+    Client,
 )
 
-from pyDUDe.config import (
-    MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
-)
+from pyDUDe.config import DEFAULT_SEARCH_LIMIT
 
 
 #----- Types
@@ -56,19 +54,26 @@ def createUserRight(client: Client, *, user_id: int, right_id: int) -> int:
         'right_id': right_id
     }
 
-    try:
-        response = client._post(url, body)
-        data = response.json()
+    # send the request to the server
+    return client._call("POST", url, body=body, expect={201: lambda data: int(data['id'])})
+
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
+@Client.endpoint
+def createUserRights(client: Client, *, userrights: List[Dict[str, Any]], window: int = 8,
+                     stop_on_error: bool = False) -> List[Union[int, Exception, None]]:
+    """Create several user-right associations with concurrent requests
 
-    if response.status_code == 201:
-        return int(data['id'])
+    Args:
+        client        : the Client instance
+        userrights    : the user_id and right_id of each association to create
+        window        : the maximum number of requests in flight (capped by max_workers with the Client)
+        stop_on_error : do not create the remaining associations after the first failure
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Returns:
+        For each association in the input order, the Id of the new association or the
+        exception raised while creating it (None if it has not been created after a failure)
+    """
+    return client._bulk('createUserRight', userrights, window=window, stop_on_error=stop_on_error)
 
 
 @Client.endpoint
@@ -86,38 +91,7 @@ def getAllUserRights(client: Client, *, limit = DEFAULT_SEARCH_LIMIT) -> Iterato
         An iterator to a User object
     """
     url = client._url('user-rights')
-    offset = 1
-
-    if limit > MAX_SEARCH_LIMIT:
-        limit = MAX_SEARCH_LIMIT
-
-    while True:
-        # prepare the parameters
-        params = {
-            'offset': offset,
-            'limit': limit
-        }
-
-        try:
-            response = client._get(url, params)
-            data = response.json()
-
-        except Exception as e:
-            raise exceptions.ConnectionError(e)
-
-        if response.status_code == 200:
-            for item in data['user-rights']:
-                yield item
-
-            if int(data['count']) < int(data['limit']):
-                break
-            else:
-                offset += int(data['count'])
-
-        else:
-            # raise the proper exception depending on the status code
-            exception = client._exception(response.status_code)
-            raise exception(data['error']['message'])
+    return client._paginate(url, 'user-rights', limit=limit)
 
 
 @Client.endpoint
@@ -133,27 +107,12 @@ def deleteAllUserRights(client: Client) -> bool:
     Returns:
         True if all the user-right associations have been deleted
     """
-    try:
-        response = client._delete(client._url('user-rights'))
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
-
-#
-# Specific user-right
-#
+    # send the request to the server
+    return client._call("DELETE", client._url('user-rights'), expect={204: lambda data: True})
 
 @Client.endpoint
 def getSingleUserRight(client: Client, *, userright_id: int) -> T_UserRight:
-    """Retrieve details for a specific user/right association
+    """Retrieve details for a specific user-right association
 
     Args:
         client       : the Client instance
@@ -167,19 +126,24 @@ def getSingleUserRight(client: Client, *, userright_id: int) -> T_UserRight:
     """
     url = client._url('user-rights', path=f"{userright_id}")
 
-    try:
-        response = client._get(url)
-        data = response.json()
+    # send the request to the server
+    return client._call("GET", url, expect={200: lambda data: data})
 
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
 
-    if response.status_code == 200:
-        return data
+@Client.endpoint
+def getManyUserRights(client: Client, *, userright_ids: Iterable[int], window: int = 8) -> Dict[int, Union[T_UserRight, Exception]]:
+    """Retrieve details for several user-right associations with concurrent requests
 
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    raise exception(data['error']['message'])
+    Args:
+        client        : the Client instance
+        userright_ids : the IDs of the user-right associations (duplicates are requested once)
+        window        : the maximum number of requests in flight (capped by max_workers with the Client)
+
+    Returns:
+        For each ID, the details for the user-right association or the exception raised while
+        retrieving it (e.g. NotFound)
+    """
+    return client._many('getSingleUserRight', 'userright_id', userright_ids, window=window)
 
 
 @Client.endpoint
@@ -208,19 +172,8 @@ def updateSingleUserRight(client: Client, *, userright_id: int,
     if right_id:
         body['right_id'] = right_id
 
-    try:
-        response = client._put(url, body)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("PUT", url, body=body, expect={204: lambda data: True})
 
 
 @Client.endpoint
@@ -239,17 +192,6 @@ def deleteSingleUserRight(client: Client, *, userright_id: int) -> bool:
     """
     url = client._url('user-rights', path=f"{userright_id}")
 
-    try:
-        response = client._delete(url)
-
-    except Exception as e:
-        raise exceptions.ConnectionError(e)
-
-    if response.status_code == 204:
-        return True
-
-    # raise the proper exception depending on the status code
-    exception = client._exception(response.status_code)
-    data = response.json()
-    raise exception(data['error']['message'])
+    # send the request to the server
+    return client._call("DELETE", url, expect={204: lambda data: True})
 
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Local evaluation of the permissions from a replica of the directory
+
+#----- Imports
+from __future__ import annotations
+from typing import Dict, FrozenSet, Optional, Set
+
+import threading
+
+from .replica import DirectoryReplica
+from .tokens import jwtVerify
+from . import exceptions
+
+
+#----- Class
+class LocalEvaluator:
+    """Answer the validate() requests from a DirectoryReplica
+
+    The rights of each user are precomputed as a set of right names indexed by
+    email, and rebuilt each time the replica is loaded or refreshed. A local
+    decision requires the secret used by the server to sign the JWT (jwt_secret):
+    the signature and the validity period of the token are verified, and a token
+    that cannot be decoded or has no expiration is rejected.
+
+    The request is forwarded to the server with the client validate() when the
+    secret is not known, when the email is not in the replica, or when the
+    replica is older than max_age:
+
+        replica = DirectoryReplica(client)
+        replica.load()
+
+        evaluator = LocalEvaluator(replica, max_age=300)
+        if evaluator.validate(email='john@acme.com', right='read', token=token):
+            ...
+    """
+
+    def __init__(self, replica: DirectoryReplica, *, secret: Optional[str] = None,
+                 max_age: Optional[float] = None, fallback: bool = True, leeway: float = 0.0) -> None:
+        """
+        Args:
+            replica: the replica of the directory
+            secret: the key signing the JWT, taken from the configuration if None
+            max_age: the age (seconds) after which the replica is considered stale
+            fallback: forward the undecidable requests to the server
+            leeway: the tolerance (seconds) on the expiration of the tokens
+
+        Raises:
+            ValueError: no secret and no fallback, no request could be decided
+        """
+        self.replica = replica
+        self.secret = secret if secret is not None else replica.client.config.jwt_secret
+        if (self.secret == '') and not fallback:
+            raise ValueError("A local evaluation without fallback requires the JWT secret")
+
+        self.max_age = max_age
+        self.fallback = fallback
+        self.leeway = leeway
+
+        self._lock = threading.Lock()
+        self._rights: Dict[str, FrozenSet[str]] = {}
+        self._built_at: Optional[float] = None
+
+        self._local = 0
+        self._remote = 0
+        self._rejected = 0
+
+    def _index(self) -> Dict[str, FrozenSet[str]]:
+        """Return the email -> right names index, rebuilt if the replica was reloaded"""
+        if self._built_at == self.replica.loaded_at:
+            return self._rights
+
+        with self._lock:
+            loaded_at = self.replica.loaded_at
+            if self._built_at != loaded_at:
+                self._rights = self.build(self.replica)
+                self._built_at = loaded_at
+
+        return self._rights
+
+    @staticmethod
+    def build(replica: DirectoryReplica) -> Dict[str, FrozenSet[str]]:
+        """Compute the names of the rights granted to each user of a replica
+
+        Args:
+            replica: the replica of the directory
+
+        Returns:
+            A dictionary email -> set of right names
+        """
+        names: Dict[int, str] = { right_id: right['name'] for right_id, right in replica.rights.records.items() }
+
+        granted: Dict[int, Set[str]] = {}
+        for item in replica.userrights.records.values():
+            name = names.get(int(item['right_id']))
+            if name is not None:
+                granted.setdefault(int(item['user_id']), set()).add(name)
+
+        return {
+            user['email']: frozenset(granted.get(user_id, ()))
+            for user_id, user in replica.users.records.items()
+        }
+
+    def isStale(self) -> bool:
+        """Check if the replica is too old (or not loaded) to take decisions"""
+        age = self.replica.age()
+        if age is None:
+            return True
+
+        return (self.max_age is not None) and (age > self.max_age)
+
+    def _remoteValidate(self, email: str, right: str, token: str) -> bool:
+        """Forward the request to the server"""
+        self._remote += 1
+        return self.replica.client.validate(email=email, right=right, token=token)
+
+    def validate(self, *, email: str, right: str, token: str) -> bool:
+        """Validate a user for a specific right
+
+        Args:
+            email: the user's email
+            right: the right for which the user should be tested
+            token: the JWT as returned by the auth endpoint
+
+        Raises:
+            Unauthenticated: the token is invalid or expired
+            ConnectionError, BadRequest, NotFound, InternalServerError (remote validation)
+
+        Returns:
+            True if the user is authorized, False otherwise
+        """
+        # the token cannot be verified without the secret
+        if (self.secret == '') or (self.isStale() and self.fallback):
+            return self._remoteValidate(email, right, token)
+
+        # check the token before looking at the rights
+        if not jwtVerify(token, self.secret, leeway=self.leeway):
+            self._rejected += 1
+            raise exceptions.Unauthenticated("Invalid or expired token")
+
+        rights = self._index().get(email)
+        if rights is None:
+            if self.fallback:
+                return self._remoteValidate(email, right, token)
+
+            self._local += 1
+            return False
+
+        self._local += 1
+        return right in rights
+
+    def rightsOf(self, email: str) -> Optional[FrozenSet[str]]:
+        """Return the names of the rights of a user, None if the email is unknown"""
+        return self._index().get(email)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of local decisions, remote validations and rejected tokens"""
+        return {
+            'local': self._local,
+            'remote': self._remote,
+            'rejected': self._rejected,
+            'users': len(self._rights),
+        }
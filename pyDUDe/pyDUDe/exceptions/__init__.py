@@ -1,5 +1,5 @@
 from .generic import (
-    ConnectionError, UnknownError
+    ConnectionError, UnknownError, CircuitOpen, DeadlineExceeded
 )
 
 from .http_4xx import (
@@ -17,3 +17,9 @@ class ConnectionError(Exception):
 
 class UnknownError(Exception):
     """Exception raised for unknown/unhandled error"""
+
+class CircuitOpen(ConnectionError):
+    """Exception raised when the circuit breaker of the endpoint is open"""
+
+class DeadlineExceeded(ConnectionError):
+    """Exception raised when the deadline of the call has expired"""
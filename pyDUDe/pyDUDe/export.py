@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Streaming export of the directory to NDJSON or columnar files
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+import argparse
+import contextvars
+import json
+import os
+import struct
+import sys
+import time
+
+from array import array
+from attrs import define, field
+from concurrent.futures import ThreadPoolExecutor
+
+from .codec import JsonCodec
+from .config import DUDeConfig, MAX_SEARCH_LIMIT
+from .core import Client
+from .models import MODELS, Entity, EntityTable
+from .paginator import Paginator
+
+
+#----- Types
+T_Record = Dict[str, Any]
+
+
+#----- Globals
+# entity types exported by default
+ENTITIES = tuple(MODELS)
+
+# first bytes of the columnar files
+COLUMNAR_MAGIC = b'DUDECOL1'
+
+# the type codes of the integer columns, stored in little-endian order with their standard size
+_INT_CODES = ('b', 'h', 'i', 'q')
+
+
+#----- Functions
+def _ints(values: array) -> bytes:
+    """Encode an integer column: the type code of the narrowest type holding the values, and the values"""
+    code = 'q'
+    if len(values) > 0:
+        low, high = min(values), max(values)
+        for candidate in 'bhi':
+            bound = 1 << (struct.calcsize(f'<{candidate}') * 8 - 1)
+            if (-bound <= low) and (high < bound):
+                code = candidate
+                break
+
+    return code.encode() + struct.pack(f'<{len(values)}{code}', *values)
+
+
+def _strings(values: List[Optional[str]]) -> bytes:
+    """Encode a string column: the lengths (-1 for None) followed by the UTF-8 values"""
+    lengths = []
+    parts = []
+    for value in values:
+        if value is None:
+            lengths.append(-1)
+        else:
+            data = str(value).encode()
+            lengths.append(len(data))
+            parts.append(data)
+
+    return struct.pack(f'<{len(lengths)}i', *lengths) + b''.join(parts)
+
+
+def _read(fh: BinaryIO, size: int) -> bytes:
+    data = fh.read(size)
+    if len(data) != size:
+        raise ValueError("Error: the columnar file is truncated.")
+
+    return data
+
+
+def _unpack(code: str, rows: int, payload: bytes) -> Tuple[int, ...]:
+    """Decode the rows values of a column stored with a type code"""
+    if (code not in _INT_CODES) or (len(payload) < rows * struct.calcsize(f'<{code}')):
+        raise ValueError("Error: invalid column in the columnar file.")
+
+    return struct.unpack_from(f'<{rows}{code}', payload)
+
+
+def readColumnar(path: str) -> Iterator[EntityTable]:
+    """Read a columnar file written by the Exporter
+
+    Args:
+        path: the path of the file
+
+    Raises:
+        ValueError if the file is not a valid columnar file
+
+    Returns:
+        An iterator to the blocks of the file, one EntityTable per page exported
+    """
+    with open(path, 'rb') as fh:
+        if fh.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"Error: [{path}] is not a columnar file.")
+
+        (size,) = struct.unpack('<I', _read(fh, 4))
+        header = json.loads(_read(fh, size))
+        model = MODELS[header['entity']]
+        schema = tuple((name, kind == 'int') for name, kind in header['columns'])
+        if schema != model.schema():
+            raise ValueError(f"Error: the columns of [{path}] do not match the {model.__name__} model.")
+
+        while True:
+            head = fh.read(1)
+            if not head:
+                return
+
+            (rows,) = struct.unpack('<I', head + _read(fh, 3))
+            table = EntityTable(model)
+            for name, integer in schema:
+                (nbytes,) = struct.unpack('<Q', _read(fh, 8))
+                payload = _read(fh, nbytes)
+
+                if integer:
+                    values = array('q', _unpack(payload[:1].decode(errors='replace'), rows, payload[1:]))
+                else:
+                    lengths = _unpack('i', rows, payload)
+                    values = []
+                    position = rows * 4
+                    for length in lengths:
+                        if length < 0:
+                            values.append(None)
+                        else:
+                            values.append(sys.intern(payload[position:position + length].decode()))
+                            position += length
+
+                table.columns[name] = values
+
+            yield table
+
+
+def readNdjson(path: str) -> Iterator[T_Record]:
+    """Read a NDJSON file written by the Exporter
+
+    Args:
+        path: the path of the file
+
+    Returns:
+        An iterator to the records of the file
+    """
+    with open(path, 'rb') as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+#----- Classes
+class NdjsonWriter:
+    """Write the records as JSON objects, one per line"""
+
+    extension = '.ndjson'
+
+    def __init__(self, fh: BinaryIO, entity: str, codec: JsonCodec) -> None:
+        self.fh = fh
+        self.codec = codec
+
+    def header(self) -> None:
+        """Write the beginning of a new file"""
+
+    def write(self, records: Iterable[T_Record]) -> None:
+        """Write the records of a page"""
+        encode = self.codec.encode
+        self.fh.write(b''.join([encode(record) + b'\n' for record in records]))
+
+
+class ColumnarWriter:
+    """Write the records in a compact columnar binary format
+
+    The file starts with COLUMNAR_MAGIC and a JSON header (entity type and columns),
+    followed by one block per page: the number of rows, then each column as its size
+    and its values, in the order of the fields of the entity model. The integer columns
+    are stored as little-endian integers of the narrowest size (1, 2, 4 or 8 bytes) holding
+    the values of the block (NULL_ID for None), and the string columns as the lengths of
+    the values (4 bytes, -1 for None) followed by their UTF-8 bytes. The fields not known by the model are not exported.
+    """
+
+    extension = '.dcol'
+
+    def __init__(self, fh: BinaryIO, entity: str, codec: JsonCodec) -> None:
+        self.fh = fh
+        self.entity = entity
+        self.model: Type[Entity] = MODELS[entity]
+
+    def header(self) -> None:
+        """Write the beginning of a new file"""
+        columns = [[name, 'int' if integer else 'str'] for name, integer in self.model.schema()]
+        data = json.dumps({ 'entity': self.entity, 'columns': columns }).encode()
+        self.fh.write(COLUMNAR_MAGIC + struct.pack('<I', len(data)) + data)
+
+    def write(self, records: Iterable[T_Record]) -> None:
+        """Write the records of a page as a block"""
+        table = EntityTable.fromRecords(self.model, records)
+        chunks = [struct.pack('<I', len(table))]
+        for name, integer in self.model.schema():
+            payload = _ints(table.columns[name]) if integer else _strings(table.columns[name])
+            chunks.append(struct.pack('<Q', len(payload)))
+            chunks.append(payload)
+
+        self.fh.write(b''.join(chunks))
+
+
+# export format -> writer
+WRITERS = {
+    'ndjson':   NdjsonWriter,
+    'columnar': ColumnarWriter,
+}
+
+
+@define
+class ExportStats:
+    """Statistics of an export"""
+
+    records: int = 0                # records written by this run
+    resumed: int = 0                # records written before a resume
+    pages: int = 0                  # pages retrieved
+    size: int = 0                   # size of the files (bytes)
+    elapsed: float = 0.0            # time spent (seconds)
+    entities: Dict[str, ExportStats] = field(factory=dict, repr=False)
+
+    def add(self, entity: str, stats: ExportStats) -> None:
+        """Add the statistics of an entity type"""
+        self.entities[entity] = stats
+        self.records += stats.records
+        self.resumed += stats.resumed
+        self.pages += stats.pages
+        self.size += stats.size
+
+
+class Exporter:
+    """Stream the paginated endpoints of the directory to files
+
+    Each entity type is written to its own file in the directory (e.g. users.ndjson),
+    page by page as they are received, so at most prefetch_pages + 1 pages are held
+    in memory whatever the size of the directory. The entity types are exported
+    concurrently.
+
+        stats = Exporter(client, directory='snapshot', format='columnar').run()
+
+    Every `checkpoint_pages` pages, the file is flushed to disk and the offset of the
+    next page is saved in a checkpoint file next to it (e.g. users.ndjson.checkpoint).
+    A new export in the same directory resumes each entity type from its checkpoint,
+    and skips the ones already complete. The records created or deleted on the server
+    in the meantime may shift the pages: use restart=True for a consistent snapshot.
+    """
+
+    def __init__(self, client: Optional[Client] = None, *, directory: str, format: str = 'ndjson',
+                 entities: Iterable[str] = ENTITIES, checkpoint_pages: int = 10, restart: bool = False) -> None:
+        """
+        Args:
+            client: the client sending the requests, the shared Client if None
+            directory: the directory of the files
+            format: the format of the files (ndjson or columnar)
+            entities: the entity types to export
+            checkpoint_pages: the number of pages written between two checkpoints
+            restart: ignore the checkpoints of a previous export
+
+        Raises:
+            ValueError if the format or an entity type is unknown
+        """
+        if format not in WRITERS:
+            raise ValueError(f"Error: unknown export format [{format}].")
+
+        self.entities = tuple(entities)
+        unknown = [entity for entity in self.entities if entity not in MODELS]
+        if unknown:
+            raise ValueError(f"Error: unknown entity types {unknown}.")
+
+        self.client = client if client is not None else Client()
+        self.directory = directory
+        self.format = format
+        self.checkpoint_pages = max(1, checkpoint_pages)
+        self.restart = restart
+
+    def path(self, entity: str) -> str:
+        """Return the path of the file of an entity type"""
+        return os.path.join(self.directory, entity + WRITERS[self.format].extension)
+
+    def _load(self, entity: str) -> Optional[Dict[str, Any]]:
+        """Read the checkpoint of an entity type, None if the export must start over"""
+        if self.restart:
+            return None
+
+        try:
+            with open(self.path(entity) + '.checkpoint') as fh:
+                state = json.load(fh)
+
+        except (OSError, ValueError):
+            return None
+
+        if state.get('format') != self.format:
+            return None
+
+        # the file must contain everything written before the checkpoint
+        try:
+            if os.path.getsize(self.path(entity)) < state['size']:
+                return None
+
+        except OSError:
+            return None
+
+        return state
+
+    def _save(self, entity: str, fh: BinaryIO, state: Dict[str, Any]) -> None:
+        """Flush the file to disk and save its checkpoint"""
+        fh.flush()
+        os.fsync(fh.fileno())
+        state['size'] = fh.tell()
+
+        path = self.path(entity) + '.checkpoint'
+        with open(path + '.tmp', 'w') as checkpoint:
+            json.dump(state, checkpoint)
+
+        os.replace(path + '.tmp', path)
+
+    def export(self, entity: str) -> ExportStats:
+        """Export an entity type, resuming from its checkpoint if any
+
+        Args:
+            entity: the entity type
+
+        Raises:
+            ConnectionError, BadRequest, InternalServerError, OSError
+
+        Returns:
+            The statistics of the export
+        """
+        start = time.perf_counter()
+        stats = ExportStats()
+
+        state = self._load(entity)
+        if (state is not None) and state['done']:
+            stats.resumed = state['records']
+            stats.size = state['size']
+            stats.elapsed = time.perf_counter() - start
+            return stats
+
+        if state is None:
+            state = { 'format': self.format, 'offset': 1, 'records': 0, 'size': 0, 'done': False }
+            fh = open(self.path(entity), 'wb')
+        else:
+            fh = open(self.path(entity), 'r+b')
+            fh.truncate(state['size'])
+            fh.seek(state['size'])
+
+        stats.resumed = state['records']
+        url = self.client._url(entity)
+        window = self.client.config.prefetch_pages
+        pages = Paginator(lambda offset, limit: self.client._page(url, offset, limit),
+                          limit=MAX_SEARCH_LIMIT, window=window,
+                          executor=self.client._executor() if window > 0 else None,
+                          offset=state['offset'])
+
+        with fh:
+            writer = WRITERS[self.format](fh, entity, self.client._context().codec)
+            if state['size'] == 0:
+                writer.header()
+                self._save(entity, fh, state)
+
+            for page in pages:
+                records = page[entity]
+                if records:
+                    writer.write(records)
+
+                stats.pages += 1
+                stats.records += len(records)
+                state['offset'] += len(records)
+                state['records'] += len(records)
+
+                if stats.pages % self.checkpoint_pages == 0:
+                    self._save(entity, fh, state)
+
+            state['done'] = True
+            self._save(entity, fh, state)
+
+        stats.size = state['size']
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def run(self, *, parallel: bool = True) -> ExportStats:
+        """Export all the entity types
+
+        Args:
+            parallel: export the entity types concurrently
+
+        Raises:
+            ConnectionError, BadRequest, InternalServerError, OSError
+
+        Returns:
+            The statistics of the export
+        """
+        start = time.perf_counter()
+        total = ExportStats()
+        os.makedirs(self.directory, exist_ok=True)
+
+        if parallel and (len(self.entities) > 1):
+            with ThreadPoolExecutor(max_workers=len(self.entities), thread_name_prefix='pyDUDe-export') as executor:
+                futures = { entity: executor.submit(contextvars.copy_context().run, self.export, entity)
+                            for entity in self.entities }
+                results = { entity: future.result() for entity, future in futures.items() }
+        else:
+            results = { entity: self.export(entity) for entity in self.entities }
+
+        for entity, stats in results.items():
+            total.add(entity, stats)
+
+        total.elapsed = time.perf_counter() - start
+        return total
+
+
+#----- Main
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the DUDe directory")
+    parser.add_argument('directory', help="the directory of the files")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='ndjson')
+    parser.add_argument('--entities', type=lambda value: value.split(','), default=list(ENTITIES),
+                        help="comma-separated entity types")
+    parser.add_argument('--env', default='.env', help="the .env file of the configuration")
+    parser.add_argument('--restart', action='store_true', help="ignore the checkpoints of a previous export")
+    parser.add_argument('--sequential', action='store_true', help="export the entity types one after the other")
+    args = parser.parse_args()
+
+    config = DUDeConfig()
+    if not config.readFile(args.env):
+        parser.error(f"cannot read the configuration file [{args.env}]")
+
+    try:
+        exporter = Exporter(Client(config), directory=args.directory, format=args.format,
+                            entities=args.entities, restart=args.restart)
+    except ValueError as e:
+        parser.error(str(e))
+
+    stats = exporter.run(parallel=not args.sequential)
+    for entity, item in stats.entities.items():
+        print(f"{entity:<12} {item.records + item.resumed:>10} records {item.size:>12} bytes")
+
+    print(f"{stats.records} records exported in {stats.elapsed:.2f}s")
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Coalescing of the identical requests in flight (single-flight)
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import asyncio
+import copy
+import threading
+
+from .deadline import remaining
+from . import exceptions
+
+
+#----- Functions
+def _never(error: BaseException) -> bool:
+    """Share all the errors of the leader with its followers"""
+    return False
+
+
+def _expired() -> exceptions.DeadlineExceeded:
+    """Return the exception raised by a follower reaching its deadline"""
+    return exceptions.DeadlineExceeded("Error: the deadline of the call has expired.")
+
+
+def _cancelling() -> bool:
+    """Check if the cancellation of the current task has been requested"""
+    task = asyncio.current_task()
+    cancelling = getattr(task, 'cancelling', None)
+    return (task is None) or (cancelling is None) or (cancelling() > 0)
+
+
+#----- Classes
+class _Call:
+    """A request in flight, shared by its leader and its followers"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Execute only once the identical calls running at the same time
+
+    The first thread calling do() for a key (the leader) executes the function, while
+    the threads calling do() with the same key before it returns (the followers) wait
+    for its result. The followers receive a copy of the value, or the same exception,
+    of the leader, so the callers can modify their results.
+
+    A follower waits no longer than its own deadline (see pyDUDe.deadline). The errors
+    of the leader for which private() is true (its deadline or its timeout expired)
+    are not shared: the followers execute the call again.
+    """
+
+    def __init__(self, private: Callable[[BaseException], bool] = _never) -> None:
+        """
+        Args:
+            private: check if an error of the leader must not be given to the followers
+        """
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._private = private
+
+        self._leaders = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Execute a function, or wait for the identical call in flight
+
+        Args:
+            key: the identity of the call
+            fn: the function to execute
+
+        Raises:
+            DeadlineExceeded: the deadline expired while waiting for the leader
+
+        Returns:
+            The value returned by the function
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    self._coalesced += 1
+                else:
+                    call = self._calls[key] = _Call()
+                    self._leaders += 1
+                    break
+
+            left = remaining()
+            if not call.done.wait(max(left, 0.0) if left is not None else None):
+                raise _expired()
+
+            if call.error is None:
+                return copy.deepcopy(call.value)
+
+            if not self._private(call.error):
+                raise call.error
+
+        try:
+            call.value = fn()
+            return call.value
+
+        except BaseException as e:
+            call.error = e
+            raise
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the statistics of the coalescing
+
+        Returns:
+            A dictionary with the number of calls executed (leaders), the number of
+            calls that waited for an identical call (coalesced) and the calls in flight
+        """
+        with self._lock:
+            return {
+                'leaders': self._leaders,
+                'coalesced': self._coalesced,
+                'inflight': len(self._calls)
+            }
+
+
+class AsyncSingleFlight:
+    """Execute only once the identical coroutines running at the same time
+
+    This is the asyncio counterpart of SingleFlight. When the leader is cancelled, its
+    followers are not: they execute the call again.
+    """
+
+    def __init__(self, private: Callable[[BaseException], bool] = _never) -> None:
+        """
+        Args:
+            private: check if an error of the leader must not be given to the followers
+        """
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._private = private
+
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await a coroutine function, or wait for the identical call in flight
+
+        Args:
+            key: the identity of the call
+            fn: the coroutine function to await
+
+        Raises:
+            DeadlineExceeded: the deadline expired while waiting for the leader
+
+        Returns:
+            The value returned by the coroutine
+        """
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+
+            self._coalesced += 1
+            left = remaining()
+            try:
+                await asyncio.wait_for(asyncio.shield(future), max(left, 0.0) if left is not None else None)
+
+            except asyncio.TimeoutError:
+                if not future.done():
+                    raise _expired() from None
+
+            except asyncio.CancelledError:
+                # the follower itself was cancelled, not only the leader
+                if (not future.cancelled()) or _cancelling():
+                    raise
+
+            except Exception:
+                pass
+
+            # the leader was cancelled: execute the call again
+            if future.cancelled():
+                continue
+
+            error = future.exception()
+            if error is None:
+                return copy.deepcopy(future.result())
+
+            if not self._private(error):
+                raise error
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self._leaders += 1
+        try:
+            value = await fn()
+            future.set_result(value)
+            return value
+
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        except BaseException as e:
+            future.set_exception(e)
+
+            # mark the exception as retrieved, there may be no follower
+            future.exception()
+            raise
+
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the statistics of the coalescing"""
+        return {
+            'leaders': self._leaders,
+            'coalesced': self._coalesced,
+            'inflight': len(self._calls)
+        }
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Metrics of the requests per endpoint and HTTP status, with span hooks
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import bisect
+import inspect
+import threading
+import time
+
+from contextvars import ContextVar
+
+try:
+    from opentelemetry import context as otel_context, trace
+except ImportError:
+    otel_context = trace = None
+
+
+#----- Globals
+# latency buckets (seconds) of the histograms
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name of the requests sent outside of an endpoint function (e.g. scan())
+OTHER = 'other'
+
+# endpoint function in progress in the current thread or task
+_endpoint: ContextVar[Optional[str]] = ContextVar('pyDUDe_endpoint', default=None)
+
+# measure of the request in progress in the current thread or task
+_measure: ContextVar[Optional[Measure]] = ContextVar('pyDUDe_measure', default=None)
+
+
+#----- Functions
+def currentEndpoint() -> str:
+    """Return the name of the endpoint function in progress"""
+    return _endpoint.get() or OTHER
+
+
+def currentMeasure() -> Optional[Measure]:
+    """Return the measure of the request in progress, None if the metrics are disabled"""
+    return _measure.get()
+
+
+def _iterate(iterator: Iterator[Any], name: str) -> Iterator[Any]:
+    """Iterate over the results of an endpoint function with its name"""
+    while True:
+        token = _endpoint.set(name)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _endpoint.reset(token)
+
+        yield item
+
+
+async def _await(awaitable: Awaitable[Any], name: str) -> Any:
+    """Await the result of an endpoint function with its name"""
+    token = _endpoint.set(name)
+    try:
+        return await awaitable
+    finally:
+        _endpoint.reset(token)
+
+
+async def _aiterate(iterator: AsyncIterator[Any], name: str) -> AsyncIterator[Any]:
+    """Iterate asynchronously over the results of an endpoint function with its name"""
+    while True:
+        token = _endpoint.set(name)
+        try:
+            item = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _endpoint.reset(token)
+
+        yield item
+
+
+def withEndpoint(name: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    """Call a function with the name of the endpoint its requests are recorded under
+
+    The name also applies to the requests sent later by the generator, coroutine
+    or asynchronous generator returned by the function.
+
+    Args:
+        name: the name of the endpoint function
+        fn: the function to call
+
+    Returns:
+        The value returned by the function
+    """
+    token = _endpoint.set(name)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        _endpoint.reset(token)
+
+    if inspect.isgenerator(result):
+        return _iterate(result, name)
+
+    if inspect.isasyncgen(result):
+        return _aiterate(result, name)
+
+    if inspect.isawaitable(result):
+        return _await(result, name)
+
+    return result
+
+
+#----- Classes
+class Measure:
+    """Measure of a request, from its first attempt to the conversion of its response
+
+    Used as a context manager around the request: the measure is recorded in
+    the registry and given to the hooks when the block exits.
+    """
+
+    __slots__ = ('registry', 'endpoint', 'method', 'url', 'status', 'sent', 'received',
+                 'decode', 'retries', '_start', '_decoding', '_spans', '_token')
+
+    def __init__(self, registry: Registry, endpoint: str, method: str, url: str) -> None:
+        self.registry = registry
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+
+        self.status = 0             # HTTP status of the response, 0 if none was received
+        self.sent = 0               # bytes of the request bodies (all attempts)
+        self.received = 0           # bytes of the response body
+        self.decode = 0.0           # time (seconds) spent decoding the response body
+        self.retries = 0            # attempts after the first one
+
+        self._start = 0.0
+        self._decoding = 0.0
+        self._spans: List[Any] = []
+        self._token = None
+
+    def __enter__(self) -> Measure:
+        self._spans = [(hook, hook.start(self)) for hook in self.registry.hooks]
+        self._token = _measure.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, kind, error, traceback) -> None:
+        latency = time.perf_counter() - self._start
+        _measure.reset(self._token)
+        self.registry.record(self, latency)
+
+        for hook, span in self._spans:
+            hook.end(span, self, error)
+
+    def response(self, status: int, size: int) -> None:
+        """Note the response received, before its body is decoded"""
+        self.status = status
+        self.received = size
+        self._decoding = time.perf_counter()
+
+    def decoded(self) -> None:
+        """Note the end of the decoding of the response body"""
+        self.decode = time.perf_counter() - self._decoding
+
+
+class Histogram:
+    """Distribution of values in fixed buckets (not thread-safe, protected by the registry)"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)       # the last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Return the (upper bound, number of values below it) of each bucket"""
+        result = []
+        total = 0
+        for bound, count in zip([*self.bounds, float('inf')], self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation in its bucket"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        lower = 0.0
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            if (count > 0) and (total + count >= rank):
+                return lower + (bound - lower) * (rank - total) / count
+
+            total += count
+            lower = bound
+
+        return self.bounds[-1]
+
+
+class Series:
+    """Metrics of the requests of an endpoint answered with a HTTP status"""
+
+    __slots__ = ('latency', 'sent', 'received', 'decode', 'retries')
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.latency = Histogram(buckets)
+        self.sent = 0
+        self.received = 0
+        self.decode = 0.0
+        self.retries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            'count': latency.count,
+            'latency': latency.sum,
+            'p50': latency.quantile(0.50),
+            'p95': latency.quantile(0.95),
+            'p99': latency.quantile(0.99),
+            'bytes_sent': self.sent,
+            'bytes_received': self.received,
+            'decode': self.decode,
+            'retries': self.retries
+        }
+
+
+class Registry:
+    """In-process registry of the metrics of the requests
+
+    The requests are recorded per endpoint function name and HTTP status (0 when
+    no response was received): number, latency histogram, bytes sent and received,
+    decoding time and retries, along with the cache hits of each endpoint.
+
+        registry = client.metrics
+        registry.stats()['getSingleUser']['statuses'][200]['p99']
+        registry.prometheus()
+
+    Hooks receive each request: hook.start(measure) is called before it is sent
+    and its result is given back to hook.end(result, measure, error) once done
+    (see OpenTelemetryHook).
+    """
+
+    def __init__(self, *, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = 'pydude') -> None:
+        """
+        Args:
+            buckets: the upper bounds (seconds) of the latency buckets, in increasing order
+            prefix: the prefix of the names of the Prometheus metrics
+        """
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.hooks: List[Any] = []
+
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, int], Series] = {}
+        self._hits: Dict[str, int] = {}
+
+    def addHook(self, hook: Any) -> None:
+        """Give the requests to a hook (with start and end methods)"""
+        self.hooks = [*self.hooks, hook]
+
+    def removeHook(self, hook: Any) -> None:
+        """Stop giving the requests to a hook"""
+        self.hooks = [item for item in self.hooks if item is not hook]
+
+    def measure(self, endpoint: str, method: str, url: str) -> Measure:
+        """Create the measure of a request
+
+        Args:
+            endpoint: the name of the endpoint function
+            method: the HTTP method
+            url: the URL of the request
+        """
+        return Measure(self, endpoint, method, url)
+
+    def record(self, measure: Measure, latency: float) -> None:
+        """Add a request to the metrics
+
+        Args:
+            measure: the measure of the request
+            latency: the duration (seconds) of the request
+        """
+        key = (measure.endpoint, measure.status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = Series(self.buckets)
+
+            series.latency.observe(latency)
+            series.sent += measure.sent
+            series.received += measure.received
+            series.decode += measure.decode
+            series.retries += measure.retries
+
+    def hit(self, endpoint: str) -> None:
+        """Add a value served from the cache of an endpoint"""
+        with self._lock:
+            self._hits[endpoint] = self._hits.get(endpoint, 0) + 1
+
+    def reset(self) -> None:
+        """Forget all the metrics"""
+        with self._lock:
+            self._series.clear()
+            self._hits.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the metrics of each endpoint
+
+        Returns:
+            A dictionary endpoint -> { 'cache_hits': number, 'statuses': { status -> metrics } },
+            the metrics being the number of requests, their total latency and its p50, p95
+            and p99 estimates (seconds), the bytes sent and received, the decoding time and
+            the retries
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for endpoint in sorted({ *self._hits, *(endpoint for endpoint, _ in self._series) }):
+                result[endpoint] = { 'cache_hits': self._hits.get(endpoint, 0), 'statuses': {} }
+
+            for (endpoint, status), series in sorted(self._series.items()):
+                result[endpoint]['statuses'][status] = series.stats()
+
+        return result
+
+    def prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format"""
+        prefix = self.prefix
+        with self._lock:
+            series = sorted(self._series.items())
+            hits = sorted(self._hits.items())
+
+            lines = []
+            counters = (
+                ('requests_total', "Requests sent to the DUDe server.", lambda s: s.latency.count),
+                ('request_bytes_total', "Bytes of the request bodies.", lambda s: s.sent),
+                ('response_bytes_total', "Bytes of the response bodies.", lambda s: s.received),
+                ('decode_seconds_total', "Time spent decoding the response bodies.", lambda s: s.decode),
+                ('retries_total', "Attempts after the first one.", lambda s: s.retries)
+            )
+            for name, text, value in counters:
+                lines.append(f"# HELP {prefix}_{name} {text}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (endpoint, status), item in series:
+                    lines.append(f'{prefix}_{name}{{endpoint="{endpoint}",status="{status}"}} {value(item)}')
+
+            name = f"{prefix}_request_duration_seconds"
+            lines.append(f"# HELP {name} Duration of the requests, retries and decoding included.")
+            lines.append(f"# TYPE {name} histogram")
+            for (endpoint, status), item in series:
+                labels = f'endpoint="{endpoint}",status="{status}"'
+                for bound, count in item.latency.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+
+                lines.append(f'{name}_sum{{{labels}}} {item.latency.sum}')
+                lines.append(f'{name}_count{{{labels}}} {item.latency.count}')
+
+            name = f"{prefix}_cache_hits_total"
+            lines.append(f"# HELP {name} Values served from the client caches.")
+            lines.append(f"# TYPE {name} counter")
+            for endpoint, count in hits:
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class OpenTelemetryHook:
+    """Hook creating an OpenTelemetry client span for each request
+
+        client.metrics.addHook(OpenTelemetryHook())
+
+    The span is the current span while the request is sent, so the spans of an
+    instrumented HTTP library are its children.
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        """
+        Args:
+            tracer: the tracer creating the spans, the one of the global tracer provider if None
+        """
+        if trace is None:
+            raise ImportError("Error: the OpenTelemetryHook requires the opentelemetry-api package.")
+
+        self.tracer = tracer if tracer is not None else trace.get_tracer('pyDUDe')
+
+    def start(self, measure: Measure) -> Tuple[Any, Any]:
+        span = self.tracer.start_span(f"DUDe {measure.endpoint}", kind=trace.SpanKind.CLIENT, attributes={
+            'http.request.method': measure.method,
+            'url.full': measure.url,
+            'dude.endpoint': measure.endpoint
+        })
+
+        return span, otel_context.attach(trace.set_span_in_context(span))
+
+    def end(self, result: Tuple[Any, Any], measure: Measure, error: Optional[BaseException]) -> None:
+        span, token = result
+        otel_context.detach(token)
+
+        if measure.status:
+            span.set_attribute('http.response.status_code', measure.status)
+
+        span.set_attribute('dude.retries', measure.retries)
+        span.set_attribute('dude.bytes_sent', measure.sent)
+        span.set_attribute('dude.bytes_received', measure.received)
+
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+
+        span.end()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	The paginator engine for the paginated endpoints
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, Optional
+
+import asyncio
+import contextvars
+
+from collections import deque
+from concurrent.futures import Executor, Future
+
+
+#----- Types
+T_Page = Dict[str, Any]
+
+
+#----- Functions
+def isLastPage(data: T_Page) -> bool:
+    """Check if a page is the last one of a paginated endpoint"""
+    return int(data['count']) < int(data['limit'])
+
+
+#----- Classes
+class Paginator:
+    """Iterate over the pages of a paginated endpoint
+
+    The first page is fetched alone to learn the page size used by the server.
+    Then up to `window` pages are requested ahead of the consumer on the executor,
+    and delivered in order. At most window + 1 pages are held in memory.
+    """
+
+    def __init__(self, fetch: Callable[[int, int], T_Page], *, limit: int, window: int = 0,
+                 executor: Optional[Executor] = None, offset: int = 1) -> None:
+        """
+        Args:
+            fetch: the function retrieving the page for an (offset, limit) pair
+            limit: the number of records per page
+            window: the number of pages requested ahead of the consumer
+            executor: the executor running the read-ahead requests
+            offset: the offset of the first page (e.g. to resume an interrupted iteration)
+        """
+        self.fetch = fetch
+        self.limit = limit
+        self.window = window if executor is not None else 0
+        self.executor = executor
+        self.offset = offset
+
+    def __iter__(self) -> Iterator[T_Page]:
+        offset = self.offset
+        data = self.fetch(offset, self.limit)
+        yield data
+
+        if isLastPage(data):
+            return
+
+        offset += int(data['count'])
+        limit = int(data['limit'])
+
+        # no read-ahead, fetch the pages one after the other
+        if self.window <= 0:
+            while True:
+                data = self.fetch(offset, limit)
+                yield data
+
+                if isLastPage(data):
+                    return
+
+                offset += int(data['count'])
+
+        pending: Deque[Future] = deque()
+        try:
+            while True:
+                # keep the read-ahead window full
+                while len(pending) <= self.window:
+                    pending.append(self.executor.submit(contextvars.copy_context().run, self.fetch, offset, limit))
+                    offset += limit
+
+                data = pending.popleft().result()
+                yield data
+
+                if isLastPage(data):
+                    return
+
+        finally:
+            # the requests after the last page (or after the consumer stopped) are useless
+            for future in pending:
+                future.cancel()
+
+
+class AsyncPaginator:
+    """Iterate asynchronously over the pages of a paginated endpoint
+
+    This is the asyncio counterpart of the Paginator, the read-ahead requests
+    being asyncio tasks instead of executor jobs.
+    """
+
+    def __init__(self, fetch: Callable[[int, int], Awaitable[T_Page]], *, limit: int, window: int = 0) -> None:
+        """
+        Args:
+            fetch: the coroutine function retrieving the page for an (offset, limit) pair
+            limit: the number of records per page
+            window: the number of pages requested ahead of the consumer
+        """
+        self.fetch = fetch
+        self.limit = limit
+        self.window = window
+
+    async def __aiter__(self) -> AsyncIterator[T_Page]:
+        offset = 1
+        data = await self.fetch(offset, self.limit)
+        yield data
+
+        if isLastPage(data):
+            return
+
+        offset += int(data['count'])
+        limit = int(data['limit'])
+
+        # no read-ahead, fetch the pages one after the other
+        if self.window <= 0:
+            while True:
+                data = await self.fetch(offset, limit)
+                yield data
+
+                if isLastPage(data):
+                    return
+
+                offset += int(data['count'])
+
+        pending: Deque[asyncio.Task] = deque()
+        try:
+            while True:
+                # keep the read-ahead window full
+                while len(pending) <= self.window:
+                    pending.append(asyncio.ensure_future(self.fetch(offset, limit)))
+                    offset += limit
+
+                data = await pending.popleft()
+                yield data
+
+                if isLastPage(data):
+                    return
+
+        finally:
+            # the requests after the last page (or after the consumer stopped) are useless
+            for task in pending:
+                task.cancel()
+
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
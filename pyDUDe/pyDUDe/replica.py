@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Local in-memory replica of the DUDe directory
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import contextvars
+import hashlib
+import time
+
+from attrs import define, field
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import MAX_SEARCH_LIMIT
+from .core import Client
+from .paginator import Paginator
+
+
+#----- Types
+T_Record = Dict[str, Any]
+
+
+#----- Globals
+
+# entity type (paginated endpoint) -> (indexed foreign keys, unique fields)
+ENTITIES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    'companies':    ((), ()),
+    'units':        (('company_id',), ()),
+    'teams':        (('unit_id',), ()),
+    'users':        (('team_id',), ('email',)),
+    'rights':       (('team_id',), ()),
+    'software':     (('team_id',), ()),
+    'user-rights':  (('user_id', 'right_id'), ()),
+}
+
+
+#----- Classes
+@define
+class PageState:
+    """What is known about a page of an entity type after a load or a refresh"""
+
+    digest: bytes                           # hash of the content of the page
+    ids: Tuple[int, ...]                    # ids of the records in the page
+    count: int                              # number of records in the page
+    limit: int                              # page size used by the server
+    etag: Optional[str] = None              # ETag header sent by the server if any
+    last_modified: Optional[str] = None     # Last-Modified header sent by the server if any
+
+
+@define
+class RefreshStats:
+    """Statistics of a load or a refresh of the replica"""
+
+    inserts: int = 0                # records added
+    updates: int = 0                # records modified
+    deletes: int = 0                # records removed
+    pages: int = 0                  # pages retrieved
+    unchanged: int = 0              # pages not modified since the previous load/refresh
+    elapsed: float = 0.0            # time spent (seconds)
+    entities: Dict[str, RefreshStats] = field(factory=dict, repr=False)
+
+    def add(self, entity: str, stats: RefreshStats) -> None:
+        """Add the statistics of an entity type"""
+        self.entities[entity] = stats
+        self.inserts += stats.inserts
+        self.updates += stats.updates
+        self.deletes += stats.deletes
+        self.pages += stats.pages
+        self.unchanged += stats.unchanged
+
+
+class Table:
+    """Records of an entity type indexed by id, with secondary indexes"""
+
+    def __init__(self, indexes: Tuple[str, ...] = (), unique: Tuple[str, ...] = ()) -> None:
+        """
+        Args:
+            indexes: the fields indexed as value -> set of ids
+            unique: the fields indexed as value -> id
+        """
+        self.records: Dict[int, T_Record] = {}
+        self.indexes: Dict[str, Dict[Any, Set[int]]] = { name: {} for name in indexes }
+        self.unique: Dict[str, Dict[Any, int]] = { name: {} for name in unique }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self.records
+
+    def get(self, record_id: int) -> Optional[T_Record]:
+        """Retrieve a record by id"""
+        return self.records.get(record_id)
+
+    def insert(self, record: T_Record) -> None:
+        """Insert a record, replacing the previous version if any"""
+        record_id = int(record['id'])
+        if record_id in self.records:
+            self.remove(record_id)
+
+        self.records[record_id] = record
+
+        for name, index in self.indexes.items():
+            value = record.get(name)
+            if value is not None:
+                index.setdefault(value, set()).add(record_id)
+
+        for name, index in self.unique.items():
+            value = record.get(name)
+            if value is not None:
+                index[value] = record_id
+
+    def remove(self, record_id: int) -> Optional[T_Record]:
+        """Remove a record and return it"""
+        record = self.records.pop(record_id, None)
+        if record is None:
+            return None
+
+        for name, index in self.indexes.items():
+            ids = index.get(record.get(name))
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del index[record.get(name)]
+
+        for name, index in self.unique.items():
+            if index.get(record.get(name)) == record_id:
+                del index[record.get(name)]
+
+        return record
+
+    def lookup(self, name: str, value: Any) -> List[T_Record]:
+        """Retrieve the records for a value of an indexed field"""
+        return [self.records[record_id] for record_id in sorted(self.indexes[name].get(value, ()))]
+
+    def lookupUnique(self, name: str, value: Any) -> Optional[T_Record]:
+        """Retrieve the record for a value of a unique field"""
+        record_id = self.unique[name].get(value)
+        return self.records.get(record_id) if record_id is not None else None
+
+
+class DirectoryReplica:
+    """In-memory copy of the whole DUDe directory
+
+    The replica loads all the companies, units, teams, users, rights, software and
+    user-rights through the paginated endpoints, and answers the lookups from local
+    indexes instead of HTTP round trips:
+
+        replica = DirectoryReplica(client)
+        replica.load()
+
+        user = replica.userByEmail('john@acme.com')
+        rights = replica.rightsOfUser(user['id'])
+    """
+
+    def __init__(self, client: Optional[Client] = None) -> None:
+        self.client = client if client is not None else Client()
+        self.tables: Dict[str, Table] = self._newTables()
+        self.pages: Dict[str, Dict[int, PageState]] = { name: {} for name in ENTITIES }
+        self.loaded_at: Optional[float] = None      # time.time() of the last load/refresh
+
+    @staticmethod
+    def _newTables() -> Dict[str, Table]:
+        """Create empty tables for all the entity types"""
+        return {
+            name: Table(indexes, unique)
+            for name, (indexes, unique) in ENTITIES.items()
+        }
+
+    def _fetchPage(self, url: str, offset: int, limit: int, previous: Optional[PageState]) -> Dict[str, Any]:
+        """Retrieve a page, conditionally if the server provided a validator for it
+
+        Raises:
+            ConnectionError, or the exception corresponding to the HTTP status
+
+        Returns:
+            The page with its new state, its records being None if it has not changed
+        """
+        headers = {}
+        if previous is not None:
+            if previous.etag is not None:
+                headers['If-None-Match'] = previous.etag
+            if previous.last_modified is not None:
+                headers['If-Modified-Since'] = previous.last_modified
+
+        params = {
+            'offset': offset,
+            'limit': limit
+        }
+
+        # keep the raw content of the page for its digest
+        codec = self.client._context().codec
+        expect = { 200: lambda data: data }
+        if previous is not None:
+            expect[304] = lambda data: None
+
+        page, response = self.client._call("GET", url, params=params, expect=expect, headers=headers,
+                                           decode=lambda content: (content, codec.decode(content)),
+                                           with_headers=True)
+        if page is None:
+            return { 'offset': offset, 'count': previous.count, 'limit': previous.limit,
+                     'state': previous, 'records': None }
+
+        content, data = page
+        return { 'offset': offset, 'count': data['count'], 'limit': data['limit'], 'content': content,
+                 'etag': response.get('ETag'), 'last_modified': response.get('Last-Modified'),
+                 'data': data }
+
+    def _sync(self, entity: str, table: Table, previous: Dict[int, PageState]) -> Tuple[Dict[int, PageState], RefreshStats]:
+        """Bring a table up to date with the server
+
+        Args:
+            entity: the entity type
+            table: the table to update
+            previous: the state of the pages after the previous load/refresh
+
+        Returns:
+            The new state of the pages and the statistics
+        """
+        url = self.client._url(entity)
+        stats = RefreshStats()
+        current: Dict[int, PageState] = {}
+        seen: Set[int] = set()
+
+        window = self.client.config.prefetch_pages
+        pages = Paginator(lambda offset, limit: self._fetchPage(url, offset, limit, previous.get(offset)),
+                          limit=MAX_SEARCH_LIMIT, window=window,
+                          executor=self.client._executor() if window > 0 else None)
+
+        for page in pages:
+            stats.pages += 1
+            offset = page['offset']
+
+            if page.get('records', True) is None:
+                state = page['state']
+                records = None
+
+            else:
+                records = page['data'][entity]
+                state = PageState(
+                    digest=hashlib.blake2b(page['content'], digest_size=16).digest(),
+                    ids=tuple(int(record['id']) for record in records),
+                    count=int(page['count']),
+                    limit=int(page['limit']),
+                    etag=page['etag'],
+                    last_modified=page['last_modified']
+                )
+
+                # same content as the previous time
+                if (offset in previous) and (previous[offset].digest == state.digest):
+                    records = None
+
+            current[offset] = state
+            seen.update(state.ids)
+
+            if records is None:
+                stats.unchanged += 1
+                continue
+
+            for record in records:
+                old = table.get(int(record['id']))
+                if old is None:
+                    table.insert(record)
+                    stats.inserts += 1
+                elif old != record:
+                    table.insert(record)
+                    stats.updates += 1
+
+        # the records not seen anymore have been deleted
+        for record_id in [record_id for record_id in table.records if record_id not in seen]:
+            table.remove(record_id)
+            stats.deletes += 1
+
+        return current, stats
+
+    def _run(self, tables: Dict[str, Table], pages: Dict[str, Dict[int, PageState]],
+             parallel: bool) -> RefreshStats:
+        """Synchronize all the tables with the server"""
+        start = time.perf_counter()
+        total = RefreshStats()
+
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(tables), thread_name_prefix='pyDUDe-replica') as executor:
+                futures = { entity: executor.submit(contextvars.copy_context().run,
+                                                    self._sync, entity, tables[entity], pages[entity])
+                            for entity in tables }
+                results = { entity: future.result() for entity, future in futures.items() }
+        else:
+            results = { entity: self._sync(entity, tables[entity], pages[entity]) for entity in tables }
+
+        for entity, (state, stats) in results.items():
+            pages[entity] = state
+            total.add(entity, stats)
+
+        total.elapsed = time.perf_counter() - start
+        return total
+
+    def load(self, *, parallel: bool = True) -> RefreshStats:
+        """Load the whole directory from the server
+
+        The new tables replace the current ones only once they are complete.
+
+        Args:
+            parallel: load the entity types concurrently
+
+        Returns:
+            The statistics of the load
+        """
+        tables = self._newTables()
+        pages: Dict[str, Dict[int, PageState]] = { name: {} for name in ENTITIES }
+
+        stats = self._run(tables, pages, parallel)
+
+        self.tables, self.pages = tables, pages
+        self.loaded_at = time.time()
+        return stats
+
+    def refresh(self, *, parallel: bool = True) -> RefreshStats:
+        """Update the replica with the changes made on the server since the last load/refresh
+
+        The pages are requested with If-None-Match/If-Modified-Since when the server
+        provided an ETag/Last-Modified for them, and compared with the hash of their
+        previous content otherwise. Only the records of the modified pages are compared,
+        and the differences are applied to the current tables.
+
+        Args:
+            parallel: refresh the entity types concurrently
+
+        Returns:
+            The number of inserts, updates and deletes, and the time spent
+        """
+        if self.loaded_at is None:
+            return self.load(parallel=parallel)
+
+        stats = self._run(self.tables, self.pages, parallel)
+
+        self.loaded_at = time.time()
+        return stats
+
+    def age(self) -> Optional[float]:
+        """Return the number of seconds since the last load, None if never loaded"""
+        if self.loaded_at is None:
+            return None
+
+        return time.time() - self.loaded_at
+
+    #
+    # Lookups
+    #
+
+    @property
+    def companies(self) -> Table:
+        return self.tables['companies']
+
+    @property
+    def units(self) -> Table:
+        return self.tables['units']
+
+    @property
+    def teams(self) -> Table:
+        return self.tables['teams']
+
+    @property
+    def users(self) -> Table:
+        return self.tables['users']
+
+    @property
+    def rights(self) -> Table:
+        return self.tables['rights']
+
+    @property
+    def software(self) -> Table:
+        return self.tables['software']
+
+    @property
+    def userrights(self) -> Table:
+        return self.tables['user-rights']
+
+    def userByEmail(self, email: str) -> Optional[T_Record]:
+        """Retrieve a user by email"""
+        return self.users.lookupUnique('email', email)
+
+    def unitsOfCompany(self, company_id: int) -> List[T_Record]:
+        """Retrieve the units of a company"""
+        return self.units.lookup('company_id', company_id)
+
+    def teamsOfUnit(self, unit_id: int) -> List[T_Record]:
+        """Retrieve the teams of a unit"""
+        return self.teams.lookup('unit_id', unit_id)
+
+    def usersOfTeam(self, team_id: int) -> List[T_Record]:
+        """Retrieve the users of a team"""
+        return self.users.lookup('team_id', team_id)
+
+    def rightsOfTeam(self, team_id: int) -> List[T_Record]:
+        """Retrieve the rights of a team"""
+        return self.rights.lookup('team_id', team_id)
+
+    def softwareOfTeam(self, team_id: int) -> List[T_Record]:
+        """Retrieve the software of a team"""
+        return self.software.lookup('team_id', team_id)
+
+    def userRightsOfUser(self, user_id: int) -> List[T_Record]:
+        """Retrieve the user-rights associations of a user"""
+        return self.userrights.lookup('user_id', user_id)
+
+    def userRightsOfRight(self, right_id: int) -> List[T_Record]:
+        """Retrieve the user-rights associations of a right"""
+        return self.userrights.lookup('right_id', right_id)
+
+    def rightsOfUser(self, user_id: int) -> List[T_Record]:
+        """Retrieve the rights granted to a user"""
+        rights = (self.rights.get(int(item['right_id'])) for item in self.userRightsOfUser(user_id))
+        return [right for right in rights if right is not None]
+
+    def usersWithRight(self, right_id: int) -> List[T_Record]:
+        """Retrieve the users having a right"""
+        users = (self.users.get(int(item['user_id'])) for item in self.userRightsOfRight(right_id))
+        return [user for user in users if user is not None]
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Retry policy of the requests with a token-bucket retry budget
+
+#----- Imports
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+
+import random
+import threading
+
+
+#----- Globals
+RETRY_STATUSES: Tuple[int, ...] = (502, 503, 504)   # transient HTTP errors
+
+
+#----- Classes
+class RetryBudget:
+    """Token bucket limiting the number of retries
+
+    Each request deposits `ratio` token in the bucket (up to `burst` tokens), and each
+    retry withdraws one. Whatever the failure rate, the retries cannot exceed `ratio`
+    times the number of requests plus `burst`, so they cannot amplify an outage.
+    """
+
+    def __init__(self, *, ratio: float = 0.1, burst: int = 10) -> None:
+        self.ratio = ratio
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._lock = threading.Lock()
+
+        self._retries = 0
+        self._denied = 0
+
+    def deposit(self) -> None:
+        """Credit the bucket for a new request"""
+        with self._lock:
+            self._tokens = min(float(self.burst), self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take a token for a retry
+
+        Returns:
+            True if the retry is allowed
+        """
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self._retries += 1
+                return True
+
+            self._denied += 1
+            return False
+
+    def stats(self) -> Dict[str, float]:
+        """Return the number of retries, of retries denied and the tokens available"""
+        with self._lock:
+            return {
+                'retries': self._retries,
+                'denied': self._denied,
+                'tokens': self._tokens
+            }
+
+
+class RetryPolicy:
+    """Decide if and when a failed request is sent again
+
+    A request is retried on connection errors, timeouts and 502/503/504 responses,
+    with an exponential backoff and full jitter, while attempts remain and the
+    budget allows it. A request that is not idempotent (e.g. the POST creating a
+    record) is only retried when it could not reach the server.
+    """
+
+    def __init__(self, *, attempts: int = 3, backoff: float = 0.1, backoff_max: float = 2.0,
+                 budget: Optional[RetryBudget] = None, statuses: Tuple[int, ...] = RETRY_STATUSES) -> None:
+        """
+        Args:
+            attempts: the maximum number of attempts of a request (1 to disable the retries)
+            backoff: the base delay (seconds) of the exponential backoff
+            backoff_max: the maximum delay (seconds) between two attempts
+            budget: the retry budget shared by the requests
+            statuses: the HTTP status codes to retry
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.budget = budget if budget is not None else RetryBudget()
+        self.statuses = statuses
+
+    def delay(self, attempt: int) -> float:
+        """Return the time to wait before a retry (full jitter)
+
+        Args:
+            attempt: the number of attempts already made
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** (attempt - 1))))
+
+    def retry(self, attempt: int, *, idempotent: bool, status: Optional[int] = None,
+              sent: bool = True) -> Optional[float]:
+        """Decide if a failed request must be sent again
+
+        Args:
+            attempt: the number of attempts already made
+            idempotent: the request can be repeated safely
+            status: the HTTP status code received, None after a connection error
+            sent: the request may have reached the server
+
+        Returns:
+            The time to wait before the retry, None if the request must not be retried
+        """
+        if attempt >= self.attempts:
+            return None
+
+        if status is not None:
+            if (status not in self.statuses) or (not idempotent):
+                return None
+
+        elif sent and not idempotent:
+            return None
+
+        if not self.budget.withdraw():
+            return None
+
+        return self.delay(attempt)
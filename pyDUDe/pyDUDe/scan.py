@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Parallel offset-sharded scans of the paginated endpoints
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import asyncio
+import contextvars
+import queue
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import MAX_SEARCH_LIMIT
+from .paginator import T_Page, isLastPage
+
+
+#----- Types
+T_Shard = Tuple[int, Optional[int]]     # (first offset, last offset or None for the last shard)
+
+
+#----- Globals
+_DONE = object()        # marker put in the queues when a shard is finished
+
+
+#----- Functions
+def shardRanges(total: int, workers: int) -> List[T_Shard]:
+    """Split the offset space of an endpoint in disjoint ranges
+
+    The last range is open, so the records added during the scan are not lost.
+
+    Args:
+        total: the number of records of the endpoint
+        workers: the number of ranges
+
+    Returns:
+        A list of (first offset, last offset) tuples
+    """
+    workers = max(1, min(workers, (total + MAX_SEARCH_LIMIT - 1) // MAX_SEARCH_LIMIT))
+    size = (total + workers - 1) // workers
+
+    shards: List[T_Shard] = []
+    for index in range(workers):
+        start = 1 + index * size
+        end = start + size - 1 if index < workers - 1 else None
+        shards.append((start, end))
+
+    return shards
+
+
+def _probeBounds() -> Iterator[int]:
+    """Search for the number of records with a galloping search
+
+    This is a generator receiving the number of records found at each offset
+    it yields, and returning the total with StopIteration.
+    """
+    if (yield 1) == 0:
+        return 0
+
+    # gallop until an empty offset is found
+    low, high = 1, 2
+    while (yield high) > 0:
+        low, high = high, high * 2
+
+    # low holds a record, high does not
+    while high - low > 1:
+        middle = (low + high) // 2
+        if (yield middle) > 0:
+            low = middle
+        else:
+            high = middle
+
+    return low
+
+
+def probeTotal(page: Callable[[int, int], T_Page]) -> int:
+    """Find the number of records of an endpoint
+
+    Args:
+        page: the function retrieving the page for an (offset, limit) pair
+
+    Returns:
+        The number of records
+    """
+    search = _probeBounds()
+    offset = next(search)
+    try:
+        while True:
+            offset = search.send(int(page(offset, 1)['count']))
+
+    except StopIteration as e:
+        return e.value
+
+
+async def probeTotalAsync(page: Callable[[int, int], Awaitable[T_Page]]) -> int:
+    """Find the number of records of an endpoint (asyncio version)"""
+    search = _probeBounds()
+    offset = next(search)
+    try:
+        while True:
+            offset = search.send(int((await page(offset, 1))['count']))
+
+    except StopIteration as e:
+        return e.value
+
+
+def _shardPages(page: Callable[[int, int], T_Page], shard: T_Shard) -> Iterator[T_Page]:
+    """Iterate over the pages of a shard, stopping on a short page"""
+    offset, end = shard
+    while (end is None) or (offset <= end):
+        limit = MAX_SEARCH_LIMIT if end is None else min(MAX_SEARCH_LIMIT, end - offset + 1)
+        data = page(offset, limit)
+        yield data
+
+        if isLastPage(data):
+            return
+
+        offset += int(data['count'])
+
+
+#----- Classes
+class Scanner:
+    """Scan all the records of a paginated endpoint with a pool of threads
+
+    The offset space is split in `workers` disjoint ranges, each one being read by its
+    own thread. The records are delivered either in order (shard after shard) or as
+    soon as a page is received. Each shard buffers at most `buffer` pages.
+    """
+
+    def __init__(self, page: Callable[[int, int], T_Page], key: str, *, workers: int = 4,
+                 total: Optional[int] = None, ordered: bool = True, buffer: int = 16) -> None:
+        """
+        Args:
+            page: the function retrieving the page for an (offset, limit) pair
+            key: the name of the list of records in the pages
+            workers: the number of threads
+            total: the number of records, probed from the server if None
+            ordered: deliver the records in the offset order
+            buffer: the number of pages buffered per shard
+        """
+        self.page = page
+        self.key = key
+        self.workers = workers
+        self.total = total
+        self.ordered = ordered
+        self.buffer = buffer
+
+    def _run(self, shard: T_Shard, output: queue.Queue, stop: threading.Event) -> None:
+        """Read a shard and put its pages in the output queue"""
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    output.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for data in _shardPages(self.page, shard):
+                if not put(data[self.key]):
+                    return
+
+        except Exception as e:
+            put(e)
+            return
+
+        put(_DONE)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        total = self.total if self.total is not None else probeTotal(self.page)
+        shards = shardRanges(total, self.workers)
+
+        # one queue per shard when ordered, a single shared queue otherwise
+        if self.ordered:
+            queues = [queue.Queue(maxsize=self.buffer) for _ in shards]
+        else:
+            queues = [queue.Queue(maxsize=self.buffer * len(shards))] * len(shards)
+
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix='pyDUDe-scan')
+        try:
+            for shard, output in zip(shards, queues):
+                executor.submit(contextvars.copy_context().run, self._run, shard, output, stop)
+
+            remaining = len(shards)
+            index = 0
+            while remaining > 0:
+                item = queues[index].get()
+                if item is _DONE:
+                    remaining -= 1
+                    if self.ordered:
+                        index += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield from item
+
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+
+class AsyncScanner:
+    """Scan all the records of a paginated endpoint with asyncio tasks
+
+    This is the asyncio counterpart of the Scanner.
+    """
+
+    def __init__(self, page: Callable[[int, int], Awaitable[T_Page]], key: str, *, workers: int = 4,
+                 total: Optional[int] = None, ordered: bool = True, buffer: int = 16) -> None:
+        self.page = page
+        self.key = key
+        self.workers = workers
+        self.total = total
+        self.ordered = ordered
+        self.buffer = buffer
+
+    async def _run(self, shard: T_Shard, output: asyncio.Queue) -> None:
+        """Read a shard and put its pages in the output queue"""
+        offset, end = shard
+        try:
+            while (end is None) or (offset <= end):
+                limit = MAX_SEARCH_LIMIT if end is None else min(MAX_SEARCH_LIMIT, end - offset + 1)
+                data = await self.page(offset, limit)
+                await output.put(data[self.key])
+
+                if isLastPage(data):
+                    break
+
+                offset += int(data['count'])
+
+        except Exception as e:
+            await output.put(e)
+            return
+
+        await output.put(_DONE)
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        total = self.total if self.total is not None else await probeTotalAsync(self.page)
+        shards = shardRanges(total, self.workers)
+
+        # one queue per shard when ordered, a single shared queue otherwise
+        if self.ordered:
+            queues = [asyncio.Queue(maxsize=self.buffer) for _ in shards]
+        else:
+            queues = [asyncio.Queue(maxsize=self.buffer * len(shards))] * len(shards)
+
+        tasks = [asyncio.ensure_future(self._run(shard, output)) for shard, output in zip(shards, queues)]
+        try:
+            remaining = len(shards)
+            index = 0
+            while remaining > 0:
+                item = await queues[index].get()
+                if item is _DONE:
+                    remaining -= 1
+                    if self.ordered:
+                        index += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    for record in item:
+                        yield record
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	In-process stub of the DUDe server for the tests and the benchmarks
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import argparse
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import DUDeConfig, MAX_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
+from .tokens import jwtVerify
+
+
+#----- Globals
+VERSION: str = "1.0.0"
+
+# fields of the records of each entity type
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    'companies': ('name',),
+    'units': ('name', 'company_id'),
+    'teams': ('name', 'unit_id'),
+    'users': ('name', 'email', 'team_id'),
+    'rights': ('name', 'team_id'),
+    'software': ('name', 'team_id'),
+    'user-rights': ('user_id', 'right_id'),
+}
+
+# parent of each entity type: (field, parent entity type)
+PARENTS: Dict[str, Tuple[str, str]] = {
+    'units': ('company_id', 'companies'),
+    'teams': ('unit_id', 'units'),
+    'users': ('team_id', 'teams'),
+    'rights': ('team_id', 'teams'),
+    'software': ('team_id', 'teams'),
+}
+
+# children of each entity type: child entity type -> field
+CHILDREN: Dict[str, Dict[str, str]] = {
+    'companies': {'units': 'company_id'},
+    'units': {'teams': 'unit_id'},
+    'teams': {'users': 'team_id', 'rights': 'team_id', 'software': 'team_id'},
+    'users': {'user-rights': 'user_id'},
+    'rights': {'user-rights': 'right_id'},
+}
+
+
+#----- Functions
+def _b64encode(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).rstrip(b'=').decode()
+
+
+def makeToken(claims: Dict[str, Any], secret: str) -> str:
+    """Create a JSON Web Token signed with HS256
+
+    Args:
+        claims: the claims of the token
+        secret: the key signing the token
+
+    Returns:
+        The JWT
+    """
+    header = _b64encode(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+    payload = _b64encode(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64encode(signature)}"
+
+
+#----- Classes
+class StubError(Exception):
+    """Error answered by the stub with the error envelope of the server"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Directory:
+    """In-memory directory applying the rules of the DUDe server
+
+    The names are unique in their parent (the emails everywhere), a user-right
+    links a user and a right of the same team, and the records are only moved
+    inside their company. Deleting a record deletes its children.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Remove all the records and restart the identifiers at 1"""
+        with self._lock:
+            self.tables: Dict[str, Dict[int, Dict[str, Any]]] = { entity: {} for entity in FIELDS }
+            self.next_ids: Dict[str, int] = { entity: 1 for entity in FIELDS }
+
+            # unique keys of the records of each entity type -> identifier
+            self.keys: Dict[str, Dict[Tuple[Any, ...], int]] = { entity: {} for entity in FIELDS }
+
+    @staticmethod
+    def _keys(entity: str, record: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+        """Return the values that must be unique for a record"""
+        if entity == 'user-rights':
+            return [(record['user_id'], record['right_id'])]
+
+        scope = record[PARENTS[entity][0]] if entity in PARENTS else None
+        keys = [(scope, record['name'])]
+        if entity == 'users':
+            keys.append(('email', record['email']))
+
+        return keys
+
+    def _get(self, entity: str, record_id: Any) -> Dict[str, Any]:
+        try:
+            return self.tables[entity][int(record_id)]
+        except (KeyError, TypeError, ValueError):
+            raise StubError(404, f"Error: {entity} [{record_id}] not found.")
+
+    def _company(self, entity: str, record: Dict[str, Any]) -> Optional[int]:
+        """Return the company of a record"""
+        while entity != 'companies':
+            field, entity = PARENTS[entity]
+            record = self.tables[entity].get(record[field])
+            if record is None:
+                return None
+
+        return record['id']
+
+    def _check(self, entity: str, record: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> None:
+        """Check a new or modified record against the rules of the server"""
+        if entity == 'user-rights':
+            user = self._get('users', record['user_id'])
+            right = self._get('rights', record['right_id'])
+            if user['team_id'] != right['team_id']:
+                raise StubError(400, "Error: the user and the right belong to different teams.")
+
+        elif entity in PARENTS:
+            field, parent = PARENTS[entity]
+            self._get(parent, record[field])
+
+            # the records can only be moved inside their company
+            if (previous is not None) and (previous[field] != record[field]):
+                if self._company(entity, previous) != self._company(entity, record):
+                    raise StubError(404 if entity == 'teams' else 400,
+                                    f"Error: {entity} cannot be moved to another company.")
+
+        index = self.keys[entity]
+        for key in self._keys(entity, record):
+            owner = index.get(key)
+            if (owner is not None) and ((previous is None) or (owner != previous['id'])):
+                raise StubError(400, f"Error: {entity} {list(key)} already exists.")
+
+    def _index(self, entity: str, record: Dict[str, Any], add: bool) -> None:
+        index = self.keys[entity]
+        for key in self._keys(entity, record):
+            if add:
+                index[key] = record['id']
+            else:
+                index.pop(key, None)
+
+    def create(self, entity: str, body: Dict[str, Any]) -> int:
+        """Create a record
+
+        Returns:
+            The identifier of the record
+        """
+        try:
+            record = { field: body[field] for field in FIELDS[entity] }
+        except (KeyError, TypeError):
+            raise StubError(400, f"Error: missing fields for {entity}.")
+
+        with self._lock:
+            self._check(entity, record)
+            record = { 'id': self.next_ids[entity], **record }
+            self.next_ids[entity] += 1
+            self.tables[entity][record['id']] = record
+            self._index(entity, record, True)
+            return record['id']
+
+    def read(self, entity: str, record_id: Any) -> Dict[str, Any]:
+        """Return a copy of a record"""
+        with self._lock:
+            return dict(self._get(entity, record_id))
+
+    def named(self, entity: str, name: str) -> bool:
+        """Check if a record has a name"""
+        with self._lock:
+            return any(key[1] == name for key in self.keys[entity])
+
+    def update(self, entity: str, record_id: Any, body: Dict[str, Any]) -> None:
+        """Modify the fields of a record"""
+        with self._lock:
+            previous = self._get(entity, record_id)
+            record = { **previous, **{ k: v for k, v in body.items() if k in FIELDS[entity] } }
+            self._check(entity, record, previous)
+            self._index(entity, previous, False)
+            self.tables[entity][previous['id']] = record
+            self._index(entity, record, True)
+
+    def _remove(self, entity: str, record_ids: Iterable[int]) -> None:
+        """Remove records and their children"""
+        record_ids = set(record_ids)
+        for child, field in CHILDREN.get(entity, {}).items():
+            self._remove(child, [r['id'] for r in self.tables[child].values() if r[field] in record_ids])
+
+        for record_id in record_ids:
+            record = self.tables[entity].pop(record_id, None)
+            if record is not None:
+                self._index(entity, record, False)
+
+    def delete(self, entity: str, record_id: Optional[Any] = None, *, where: Optional[Tuple[str, int]] = None) -> None:
+        """Delete a record, the records matching a field value, or all the records"""
+        with self._lock:
+            if record_id is not None:
+                record_ids = [self._get(entity, record_id)['id']]
+            else:
+                record_ids = [r['id'] for r in self.tables[entity].values() if (where is None) or (r[where[0]] == where[1])]
+
+            self._remove(entity, record_ids)
+
+    def page(self, entity: str, offset: int, limit: int, *, where: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """Return the records of a page (offset starts at 1)"""
+        with self._lock:
+            records = self.tables[entity].values()
+            if where is not None:
+                records = (r for r in records if r[where[0]] == where[1])
+
+            return [dict(r) for r in itertools.islice(records, offset - 1, offset - 1 + limit)]
+
+    def allowed(self, email: str, right: str) -> bool:
+        """Check if the user has a right"""
+        with self._lock:
+            user_id = self.keys['users'].get(('email', email))
+            if user_id is None:
+                raise StubError(404, f"Error: user [{email}] not found.")
+
+            right_id = self.keys['rights'].get((self.tables['users'][user_id]['team_id'], right))
+            return (user_id, right_id) in self.keys['user-rights']
+
+
+class StubServer:
+    """Local HTTP server answering the routes of the DUDe server
+
+    All the routes used by the endpoints are implemented, with the same offset/limit
+    pagination (limit capped at MAX_SEARCH_LIMIT), the same error envelope and
+    ETag/If-None-Match on the pages. A latency and an error rate can be injected,
+    and reset() empties the directory instantly:
+
+        with StubServer() as server:
+            client = Client(server.config())
+            company_id = client.createCompany(name='ACME Corp')
+            ...
+            server.inject(latency=0.005, error_rate=0.1)
+            server.reset()
+
+    The tokens are signed with `secret` and valid for `token_lifetime` seconds.
+    The /auth route accepts any API-KEY for an existing software, unless one
+    has been registered in `apikeys` for its name.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, *, secret: str = 'secret',
+                 token_lifetime: float = 3600.0) -> None:
+        self.secret = secret
+        self.token_lifetime = token_lifetime
+        self.apikeys: Dict[str, str] = {}
+        self.directory = Directory()
+
+        # injected faults
+        self.latency = 0.0
+        self.jitter = 0.0
+        self.error_rate = 0.0
+        self.error_status = 503
+
+        # number of requests received per (method, family)
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> StubServer:
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Return the (host, port) the server listens to"""
+        return self._server.server_address[:2]
+
+    def config(self, **kwargs: Any) -> DUDeConfig:
+        """Return a configuration to connect to this server
+
+        Args:
+            kwargs: the other fields of the configuration
+        """
+        host, port = self.address
+        return DUDeConfig(scheme='http', hostname=host, port=port, **kwargs)
+
+    def start(self) -> StubServer:
+        """Serve the requests in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='pyDUDe-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and close its socket"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+    def reset(self) -> None:
+        """Empty the directory and forget the faults, API-KEYs and counters"""
+        self.directory.reset()
+        self.apikeys.clear()
+        self.inject()
+        with self._lock:
+            self.requests.clear()
+
+    def inject(self, *, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+               error_status: int = 503) -> None:
+        """Set the faults injected in the responses
+
+        Args:
+            latency: the time (seconds) added to each response
+            jitter: the maximum random time (seconds) added to the latency
+            error_rate: the ratio of requests answered with error_status
+            error_status: the HTTP status of the injected errors
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def populate(self, *, companies: int = 1, units: int = 2, teams: int = 2, users: int = 10,
+                 rights: int = 3, software: int = 1) -> None:
+        """Fill the directory with generated records
+
+        Args:
+            companies: the number of companies
+            units: the number of units per company
+            teams: the number of teams per unit
+            users: the number of users per team
+            rights: the number of rights per team, each user having all of them
+            software: the number of software per team
+        """
+        directory = self.directory
+        for c in range(companies):
+            company_id = directory.create('companies', {'name': f'Company {c + 1}'})
+            for u in range(units):
+                unit_id = directory.create('units', {'name': f'Unit {u + 1}', 'company_id': company_id})
+                for t in range(teams):
+                    team_id = directory.create('teams', {'name': f'Team {t + 1}', 'unit_id': unit_id})
+                    right_ids = [directory.create('rights', {'name': f'right{r + 1}', 'team_id': team_id})
+                                 for r in range(rights)]
+                    for s in range(software):
+                        directory.create('software', {'name': f'Software {team_id}.{s + 1}', 'team_id': team_id})
+
+                    for n in range(users):
+                        email = f'user{team_id}.{n + 1}@company{company_id}.com'
+                        user_id = directory.create('users', {'name': f'User {n + 1}', 'email': email, 'team_id': team_id})
+                        for right_id in right_ids:
+                            directory.create('user-rights', {'user_id': user_id, 'right_id': right_id})
+
+    def _count(self, method: str, family: str) -> None:
+        with self._lock:
+            self.requests[(method, family)] += 1
+
+    def _authenticate(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        name, apikey = body.get('name'), body.get('apikey')
+        if not self.directory.named('software', name):
+            raise StubError(404, f"Error: software [{name}] not found.")
+
+        if (name in self.apikeys) and (self.apikeys[name] != apikey):
+            raise StubError(401, "Error: invalid API-KEY.")
+
+        now = time.time()
+        return {'token': makeToken({'sub': name, 'iat': now, 'exp': now + self.token_lifetime}, self.secret)}
+
+    def _validate(self, body: Dict[str, Any]) -> int:
+        if not jwtVerify(str(body.get('token')), self.secret):
+            raise StubError(401, "Error: invalid token.")
+
+        return 200 if self.directory.allowed(body.get('email'), body.get('right')) else 403
+
+    def route(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        """Answer a request
+
+        Returns:
+            The HTTP status and the data of the response
+        """
+        parts = [part for part in path.split('/') if part]
+        family = parts[0] if parts else ''
+        self._count(method, family)
+
+        directory = self.directory
+        where = None
+        if len(parts) == 3:
+            # nested collection, e.g. /teams/1/users
+            parent, parent_id, entity = parts
+            if (parent not in CHILDREN) or (entity not in CHILDREN[parent]):
+                raise StubError(404, f"Error: unknown route [{path}].")
+
+            record = directory.read(parent, parent_id)
+            where = (CHILDREN[parent][entity], record['id'])
+            parts = [entity]
+            if method == "POST":
+                body = { **(body or {}), where[0]: record['id'] }
+
+        if parts == ['version'] and method == "GET":
+            return 200, {'version': VERSION}
+
+        if parts == ['auth'] and method == "POST":
+            return 200, self._authenticate(body or {})
+
+        if parts == ['validate'] and method == "POST":
+            return self._validate(body or {}), {}
+
+        if (not parts) or (parts[0] not in FIELDS) or (len(parts) > 2):
+            raise StubError(404, f"Error: unknown route [{path}].")
+
+        entity = parts[0]
+        if len(parts) == 1:
+            if method == "GET":
+                offset = max(int(query.get('offset', 1)), 1)
+                limit = min(max(int(query.get('limit', DEFAULT_SEARCH_LIMIT)), 1), MAX_SEARCH_LIMIT)
+                records = directory.page(entity, offset, limit, where=where)
+                return 200, { entity: records, 'offset': offset, 'limit': limit, 'count': len(records) }
+
+            if method == "POST":
+                return 201, {'id': directory.create(entity, body or {})}
+
+            if method == "DELETE":
+                directory.delete(entity, where=where)
+                return 204, None
+
+        else:
+            if method == "GET":
+                return 200, directory.read(entity, parts[1])
+
+            if method == "PUT":
+                directory.update(entity, parts[1], body or {})
+                return 204, None
+
+            if method == "DELETE":
+                directory.delete(entity, parts[1])
+                return 204, None
+
+        raise StubError(405, f"Error: method {method} not allowed on [{path}].")
+
+    def _handler(self) -> type:
+        """Create the request handler class bound to this server"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _reply(self, status: int, data: Any, headers: Dict[str, str] = {}) -> None:
+                content = json.dumps(data).encode() if data is not None else b''
+
+                # conditional requests on the pages
+                if (self.command == "GET") and (status == 200):
+                    etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+                    headers = { **headers, 'ETag': etag }
+                    if self.headers.get('If-None-Match') == etag:
+                        status, content = 304, b''
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if status not in (204, 304):
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def _handle(self) -> None:
+                url = urllib.parse.urlsplit(self.path)
+                query = dict(urllib.parse.parse_qsl(url.query))
+
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+
+                delay = stub.latency + (random.uniform(0, stub.jitter) if stub.jitter else 0.0)
+                if delay > 0:
+                    time.sleep(delay)
+
+                if stub.error_rate and (random.random() < stub.error_rate):
+                    stub._count(self.command, url.path.strip('/').split('/')[0])
+                    status = stub.error_status
+                    return self._reply(status, {'error': {'code': status, 'message': "Error: injected failure."}})
+
+                try:
+                    body = json.loads(raw) if raw else None
+                    status, data = stub.route(self.command, url.path, query, body)
+
+                except StubError as e:
+                    status, data = e.status, {'error': {'code': e.status, 'message': e.message}}
+
+                except (ValueError, TypeError) as e:
+                    status, data = 400, {'error': {'code': 400, 'message': f"Error: {e}"}}
+
+                self._reply(status, data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+#----- Main
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub of the DUDe server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--secret', default='secret')
+    parser.add_argument('--users', type=int, default=0, help="generate this number of users per team")
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, secret=args.secret)
+    if args.users:
+        server.populate(users=args.users)
+    server.inject(latency=args.latency, error_rate=args.error_rate)
+
+    print(f"Stub DUDe server listening on http://{args.host}:{server.address[1]}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python
+#
+# This source file is subject to the Apache License 2.0
+# that is bundled with this package in the file LICENSE.txt.
+# It is also available through the Internet at this address:
+# https://opensource.org/licenses/Apache-2.0
+#
+# @author	Sebastien LEGRAND
+# @license	Apache License 2.0
+#
+# @brief	Helpers for the JSON Web Tokens returned by the DUDe server
+
+#----- Imports
+from __future__ import annotations
+from typing import Any, Dict, Optional
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+
+#----- Globals
+_HMAC_ALGORITHMS = {
+    'HS256': hashlib.sha256,
+    'HS384': hashlib.sha384,
+    'HS512': hashlib.sha512,
+}
+
+
+#----- Functions
+def _b64decode(value: str) -> bytes:
+    """Decode a base64url value without padding"""
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def jwtClaims(token: str) -> Dict[str, Any]:
+    """Decode the claims of a JSON Web Token without verifying its signature
+
+    Args:
+        token: the JWT as returned by the auth endpoint
+
+    Returns:
+        The claims of the token, an empty dictionary if it cannot be decoded
+    """
+    try:
+        claims = json.loads(_b64decode(token.split('.')[1]))
+
+    except Exception:
+        return {}
+
+    return claims if isinstance(claims, dict) else {}
+
+
+def jwtExpiry(token: str) -> Optional[float]:
+    """Return the expiration time of a JSON Web Token
+
+    Args:
+        token: the JWT as returned by the auth endpoint
+
+    Returns:
+        The 'exp' claim as a UNIX timestamp, None if the token has no expiration
+    """
+    value = jwtClaims(token).get('exp')
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    return None
+
+
+def jwtVerify(token: str, secret: str, *, leeway: float = 0.0) -> bool:
+    """Verify the signature and the validity period of a JSON Web Token
+
+    Only the HMAC algorithms (HS256, HS384, HS512) are supported.
+
+    Args:
+        token: the JWT as returned by the auth endpoint
+        secret: the key used by the server to sign the tokens
+        leeway: the tolerance (seconds) on the 'exp' and 'nbf' claims
+
+    Returns:
+        True if the token is authentic and valid now
+    """
+    try:
+        header, payload, signature = token.split('.')
+        digest = _HMAC_ALGORITHMS[json.loads(_b64decode(header))['alg']]
+        expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), digest).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return False
+
+    except Exception:
+        return False
+
+    return jwtIsActive(token, leeway=leeway)
+
+
+def jwtIsActive(token: str, *, leeway: float = 0.0) -> bool:
+    """Check the validity period ('exp' and 'nbf' claims) of a JSON Web Token
+
+    Args:
+        token: the JWT as returned by the auth endpoint
+        leeway: the tolerance (seconds) on the claims
+
+    Returns:
+        True if the token can be used now, False if it cannot be decoded or has
+        no expiration
+    """
+    claims = jwtClaims(token)
+    now = time.time()
+
+    expiry = claims.get('exp')
+    if not isinstance(expiry, (int, float)) or (now > expiry + leeway):
+        return False
+
+    not_before = claims.get('nbf')
+    if isinstance(not_before, (int, float)) and (now < not_before - leeway):
+        return False
+
+    return True
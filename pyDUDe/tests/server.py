@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+#
+# Server used by the tests of the endpoints
+#
+
+import os
+import time
+import unittest
+
+import pyDUDe
+
+from pyDUDe.stub import StubServer
+
+
+class ServerTestCase(unittest.TestCase):
+    """Run the tests against a StubServer emptied before each test
+
+    When DUDE_SERVER_PID is set, the tests run against the real DUDe server
+    instead, restarted with an empty database (DUDE_SERVER_DATABASE) before
+    each test and given DUDE_SERVER_WAIT_TIME seconds to start.
+    """
+
+    server = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        if 'DUDE_SERVER_PID' not in os.environ:
+            cls.server = StubServer().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        if cls.server is not None:
+            cls.server.stop()
+            cls.server = None
+
+    def setUp(self) -> None:
+        self.client = pyDUDe.Client()
+        if self.server is not None:
+            self.client.config = self.server.config()
+            self.server.reset()
+            return
+
+        self.client.config.readFile()
+
+        # remove the file
+        try:
+            os.unlink(os.environ['DUDE_SERVER_DATABASE'])
+        except FileNotFoundError:
+            pass
+
+        # restart the server
+        os.kill(int(os.environ['DUDE_SERVER_PID']), 1)
+        time.sleep(float(os.environ['DUDE_SERVER_WAIT_TIME']))
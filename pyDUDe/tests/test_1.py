@@ -4,28 +4,12 @@
 # This unit will test the /companies endpoint
 #
 
-import os
-import time
-import unittest
-
 import pyDUDe
 
+from tests.server import ServerTestCase
 
-class CompanyTest(unittest.TestCase):
-
-    def setUp(self) -> None:
-        self.client = pyDUDe.Client()
-        self.client.config.readFile()
-
-        # remove the file
-        try:
-            os.unlink(os.environ['DUDE_SERVER_DATABASE'])
-        except FileNotFoundError:
-            pass
 
-        # restart the server
-        os.kill(int(os.environ['DUDE_SERVER_PID']), 1)
-        time.sleep(float(os.environ['DUDE_SERVER_WAIT_TIME']))
+class CompanyTest(ServerTestCase):
 
     def test_create_company(self):
         cid = self.client.createCompany(name='ACME Corp')
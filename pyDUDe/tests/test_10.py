@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the local replica of the directory
+#
+
+import hashlib
+import json
+import unittest
+
+from pyDUDe import DUDeConfig
+from pyDUDe.core import Client
+from pyDUDe.replica import DirectoryReplica
+
+
+class FakeResponse:
+
+    def __init__(self, status_code: int, data=None, headers=None) -> None:
+        self.status_code = status_code
+        self.content = json.dumps(data).encode() if data is not None else b''
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeClient(Client):
+    """Client answering the paginated endpoints from a small directory"""
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(self, etag: bool = False) -> None:
+        self._setup(DUDeConfig(hostname='dude', retry_backoff=0.001))
+        self.etag = etag
+        self.requests = 0
+        self.failures = 0
+        self.data = {
+            'companies': [{'id': 1, 'name': 'ACME Corp'}],
+            'units': [{'id': 1, 'name': 'Marketing', 'company_id': 1}],
+            'teams': [{'id': 1, 'name': 'Press', 'unit_id': 1},
+                      {'id': 2, 'name': 'Web', 'unit_id': 1}],
+            'users': [{'id': i, 'name': f'User {i}', 'email': f'user{i}@acme.com', 'team_id': 1 + i % 2}
+                      for i in range(1, 46)],
+            'rights': [{'id': 1, 'name': 'read', 'team_id': 1},
+                       {'id': 2, 'name': 'write', 'team_id': 1}],
+            'software': [{'id': 1, 'name': 'StoryBuilder', 'team_id': 1}],
+            'user-rights': [{'id': 1, 'user_id': 1, 'right_id': 1},
+                            {'id': 2, 'user_id': 1, 'right_id': 2},
+                            {'id': 3, 'user_id': 2, 'right_id': 1}],
+        }
+
+    def _request(self, *, request, url, params=None, body={}, headers=None):
+        self.requests += 1
+        if self.failures > 0:
+            self.failures -= 1
+            return FakeResponse(503)
+
+        entity = url.rsplit('/', 1)[-1]
+        offset, limit = params['offset'], params['limit']
+        records = self.data[entity][offset - 1:offset - 1 + limit]
+        page = { entity: records, 'count': len(records), 'limit': limit, 'offset': offset }
+
+        if not self.etag:
+            return FakeResponse(200, page)
+
+        etag = hashlib.md5(json.dumps(page).encode()).hexdigest()
+        if (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(304)
+
+        return FakeResponse(200, page, {'ETag': etag})
+
+
+class ReplicaTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.replica = DirectoryReplica(FakeClient())
+        self.replica.load()
+
+    def test_sizes(self):
+        self.assertEqual(len(self.replica.users), 45)
+        self.assertEqual(len(self.replica.userrights), 3)
+
+    def test_user_by_email(self):
+        self.assertEqual(self.replica.userByEmail('user2@acme.com')['id'], 2)
+        self.assertIsNone(self.replica.userByEmail('nobody@acme.com'))
+
+    def test_hierarchy(self):
+        self.assertEqual([t['name'] for t in self.replica.teamsOfUnit(1)], ['Press', 'Web'])
+        self.assertEqual([r['name'] for r in self.replica.rightsOfTeam(1)], ['read', 'write'])
+
+    def test_user_rights(self):
+        self.assertEqual([r['name'] for r in self.replica.rightsOfUser(1)], ['read', 'write'])
+        self.assertEqual([u['name'] for u in self.replica.usersWithRight(1)], ['User 1', 'User 2'])
+
+    def test_update_index(self):
+        self.replica.users.insert({'id': 2, 'name': 'User 2', 'email': 'jane@chicken.co', 'team_id': 2})
+        self.assertIsNone(self.replica.userByEmail('user2@acme.com'))
+        self.assertEqual(len(self.replica.usersOfTeam(1)), 21)
+        self.assertEqual(len(self.replica.usersOfTeam(2)), 24)
+
+
+class RefreshTest(unittest.TestCase):
+
+    def modify(self, client):
+        users = client.data['users']
+        users[30]['name'] = 'Renamed'
+        del users[5]
+        users.append({'id': 46, 'name': 'User 46', 'email': 'user46@acme.com', 'team_id': 1})
+
+    def test_no_change(self):
+        replica = DirectoryReplica(FakeClient())
+        replica.load()
+
+        stats = replica.refresh()
+        self.assertEqual((stats.inserts, stats.updates, stats.deletes), (0, 0, 0))
+        self.assertEqual(stats.unchanged, stats.pages)
+
+    def test_diff(self):
+        client = FakeClient()
+        replica = DirectoryReplica(client)
+        replica.load()
+
+        self.modify(client)
+        stats = replica.refresh()
+
+        self.assertEqual((stats.inserts, stats.updates, stats.deletes), (1, 1, 1))
+        self.assertEqual(replica.users.get(31)['name'], 'Renamed')
+        self.assertIsNone(replica.users.get(6))
+        self.assertEqual(replica.userByEmail('user46@acme.com')['id'], 46)
+
+    def test_etag(self):
+        client = FakeClient(etag=True)
+        replica = DirectoryReplica(client)
+        replica.load()
+
+        stats = replica.refresh()
+        self.assertEqual(stats.unchanged, stats.pages)
+
+        self.modify(client)
+        stats = replica.refresh()
+        self.assertEqual((stats.inserts, stats.updates, stats.deletes), (1, 1, 1))
+        self.assertEqual(len(replica.users), 45)
+
+    def test_retried_pages(self):
+        client = FakeClient(etag=True)
+        client.failures = 2
+        replica = DirectoryReplica(client)
+        replica.load()
+        self.assertEqual(len(replica.users), 45)
+        self.assertEqual(client.retryStats()['retries'], 2)
+
+        client.failures = 1
+        stats = replica.refresh()
+        self.assertEqual(stats.unchanged, stats.pages)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the local evaluation of the permissions
+#
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+import unittest
+
+from pyDUDe import exceptions
+from pyDUDe.evaluator import LocalEvaluator
+from pyDUDe.replica import DirectoryReplica
+
+from tests.test_10 import FakeClient
+
+
+SECRET = 'secret'
+
+
+def makeToken(claims, secret: str = SECRET) -> str:
+    def encode(value: bytes) -> str:
+        return base64.urlsafe_b64encode(value).rstrip(b'=').decode()
+
+    header = encode(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+    payload = encode(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{encode(signature)}"
+
+
+class ValidatingClient(FakeClient):
+    """FakeClient with a remote validate() granting everything"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.validations = []
+
+    def validate(self, *, email, right, token):
+        self.validations.append((email, right))
+        return True
+
+
+class EvaluatorTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.client = ValidatingClient()
+        self.replica = DirectoryReplica(self.client)
+        self.replica.load()
+        self.evaluator = LocalEvaluator(self.replica, secret=SECRET)
+        self.token = makeToken({'sub': 'StoryBuilder', 'exp': time.time() + 60})
+
+    def test_rights(self):
+        self.assertEqual(self.evaluator.rightsOf('user1@acme.com'), {'read', 'write'})
+        self.assertEqual(self.evaluator.rightsOf('user2@acme.com'), {'read'})
+        self.assertEqual(self.evaluator.rightsOf('user3@acme.com'), frozenset())
+
+    def test_local_decisions(self):
+        self.assertTrue(self.evaluator.validate(email='user2@acme.com', right='read', token=self.token))
+        self.assertFalse(self.evaluator.validate(email='user2@acme.com', right='write', token=self.token))
+        self.assertEqual(self.client.validations, [])
+        self.assertEqual(self.evaluator.stats()['local'], 2)
+
+    def test_invalid_tokens(self):
+        expired = makeToken({'exp': time.time() - 60})
+        forged = makeToken({'exp': time.time() + 60}, secret='other')
+        eternal = makeToken({'sub': 'StoryBuilder'})
+
+        for token in (expired, forged, eternal, 'not-a-token', ''):
+            with self.assertRaises(exceptions.Unauthenticated):
+                self.evaluator.validate(email='user1@acme.com', right='read', token=token)
+
+    def test_no_secret(self):
+        evaluator = LocalEvaluator(self.replica, secret='')
+        for token in ('', 'not-a-token', self.token):
+            self.assertTrue(evaluator.validate(email='user2@acme.com', right='write', token=token))
+
+        self.assertEqual(len(self.client.validations), 3)
+        self.assertEqual(evaluator.stats()['remote'], 3)
+        self.assertEqual(evaluator.stats()['local'], 0)
+
+        with self.assertRaises(ValueError):
+            LocalEvaluator(self.replica, secret='', fallback=False)
+
+    def test_unknown_email(self):
+        self.assertTrue(self.evaluator.validate(email='nobody@acme.com', right='read', token=self.token))
+        self.assertEqual(self.client.validations, [('nobody@acme.com', 'read')])
+
+        evaluator = LocalEvaluator(self.replica, secret=SECRET, fallback=False)
+        self.assertFalse(evaluator.validate(email='nobody@acme.com', right='read', token=self.token))
+
+    def test_stale_replica(self):
+        evaluator = LocalEvaluator(self.replica, secret=SECRET, max_age=60)
+        self.replica.loaded_at -= 120
+
+        self.assertTrue(evaluator.validate(email='user3@acme.com', right='read', token=self.token))
+        self.assertEqual(evaluator.stats()['remote'], 1)
+
+    def test_rebuild_after_refresh(self):
+        self.evaluator.rightsOf('user2@acme.com')
+        self.client.data['user-rights'].append({'id': 4, 'user_id': 2, 'right_id': 2})
+        self.replica.refresh()
+
+        self.assertTrue(self.evaluator.validate(email='user2@acme.com', right='write', token=self.token))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the compact entity models
+#
+
+import unittest
+
+from pyDUDe.models import EntityTable, NULL_ID, User, UserRight, Team, decode
+
+
+class ModelsTest(unittest.TestCase):
+
+    def test_from_dict(self):
+        user = User.fromDict({'id': 3, 'name': 'John', 'email': 'john@acme.com', 'team_id': 1, 'extra': True})
+        self.assertEqual(user, User(id=3, name='John', email='john@acme.com', team_id=1))
+        self.assertEqual(user.asDict(), {'id': 3, 'name': 'John', 'email': 'john@acme.com', 'team_id': 1})
+        self.assertFalse(hasattr(user, '__dict__'))
+
+    def test_decode(self):
+        records = iter([{'id': 1, 'user_id': 2, 'right_id': 3}])
+        self.assertEqual(list(decode(UserRight, records)), [UserRight(1, 2, 3)])
+
+
+class EntityTableTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.records = [{'id': i, 'name': f'Team {i % 3}', 'unit_id': i % 2} for i in range(1, 11)]
+        self.table = EntityTable.fromRecords(Team, self.records)
+
+    def test_rows(self):
+        self.assertEqual(len(self.table), 10)
+        self.assertEqual([team.asDict() for team in self.table], self.records)
+        self.assertEqual(self.table.column('unit_id').typecode, 'q')
+
+    def test_interned_names(self):
+        names = self.table.column('name')
+        self.assertIs(names[0], names[3])
+
+    def test_find(self):
+        self.assertEqual(self.table.find(4).name, 'Team 1')
+        self.assertIsNone(self.table.find(42))
+
+        self.table.append(Team(id=42, name='Late', unit_id=None))
+        self.assertIsNone(self.table.find(42).unit_id)
+        self.assertEqual(self.table.column('unit_id')[-1], NULL_ID)
+
+
+if __name__ == "__main__":
+    unittest.main()
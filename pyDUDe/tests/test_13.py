@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the JSON codecs
+#
+
+import json
+import unittest
+
+from pyDUDe.codec import CODECS, JsonCodec, getCodec
+from pyDUDe.models import User
+
+
+class CodecTest(unittest.TestCase):
+
+    PAGE = {
+        'users': [{'id': 1, 'name': 'John', 'email': 'john@acme.com', 'team_id': 2}],
+        'count': 1, 'limit': 10, 'offset': 1
+    }
+
+    def test_get_codec(self):
+        self.assertIsInstance(getCodec('json'), JsonCodec)
+        self.assertIn(getCodec().name, CODECS)
+
+        with self.assertRaises(ValueError):
+            getCodec('yaml')
+
+    def test_round_trip(self):
+        for name in CODECS:
+            codec = getCodec(name)
+            content = codec.encode(self.PAGE)
+            self.assertEqual(json.loads(content), self.PAGE)
+            self.assertEqual(codec.decode(content), self.PAGE)
+
+    def test_decode_page(self):
+        content = json.dumps(self.PAGE).encode()
+        for name in CODECS:
+            page = getCodec(name).decodePage(content, 'users', User)
+            self.assertEqual(page['users'], [User(1, 'John', 'john@acme.com', 2)])
+            self.assertEqual((page['count'], page['limit']), (1, 10))
+
+    def test_decode_error(self):
+        content = json.dumps({'error': {'message': 'not found'}}).encode()
+        for name in CODECS:
+            self.assertEqual(getCodec(name).decodePage(content, 'users', User), json.loads(content))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the coalescing of the identical requests in flight
+#
+
+import asyncio
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pyDUDe import exceptions
+from pyDUDe.core import BaseClient
+from pyDUDe.deadline import deadline
+from pyDUDe.flight import AsyncSingleFlight, SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def slow(self, value=None, error=None):
+        def fn():
+            self.calls += 1
+            self.release.wait(5)
+            if error is not None:
+                raise error
+            return value
+        return fn
+
+    def run_many(self, key, fn, count=8):
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(self.flight.do, key, fn) for _ in range(count)]
+            while self.flight.stats()['coalesced'] < count - 1:
+                time.sleep(0.01)
+            self.release.set()
+            return [future.exception() or future.result() for future in futures]
+
+    def test_coalesce(self):
+        results = self.run_many('key', self.slow(value={'id': 1}))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{'id': 1}] * 8)
+        self.assertEqual(len({id(result) for result in results}), 8)
+        self.assertEqual(self.flight.stats(), {'leaders': 1, 'coalesced': 7, 'inflight': 0})
+
+    def test_shared_exception(self):
+        results = self.run_many('key', self.slow(error=exceptions.NotFound('no user')))
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(result, exceptions.NotFound) for result in results))
+
+    def test_follower_deadline(self):
+        def follow():
+            with deadline(0.05):
+                self.flight.do('key', self.slow(1))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(self.flight.do, 'key', self.slow(1))
+            while self.flight.stats()['inflight'] == 0:
+                time.sleep(0.01)
+
+            start = time.monotonic()
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                executor.submit(follow).result()
+            self.assertLess(time.monotonic() - start, 1)
+
+            self.release.set()
+            self.assertEqual(leader.result(), 1)
+
+    def test_private_errors(self):
+        flight = SingleFlight(BaseClient._timedOut)
+        errors = [exceptions.DeadlineExceeded('leader')]
+
+        def fn():
+            self.calls += 1
+            self.release.wait(5)
+            if errors:
+                raise errors.pop(0)
+            return 'value'
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, 'key', fn) for _ in range(4)]
+            while flight.stats()['coalesced'] < 3:
+                time.sleep(0.01)
+            self.release.set()
+            results = [future.exception() or future.result() for future in futures]
+
+        self.assertEqual([type(result).__name__ for result in results].count('DeadlineExceeded'), 1)
+        self.assertEqual(results.count('value'), 3)
+        self.assertGreater(self.calls, 1)
+
+        self.assertTrue(BaseClient._timedOut(exceptions.ConnectionError(TimeoutError('read'))))
+        self.assertFalse(BaseClient._timedOut(exceptions.ConnectionError(OSError('refused'))))
+        self.assertFalse(BaseClient._timedOut(exceptions.NotFound('no user')))
+
+    def test_sequential_calls(self):
+        self.release.set()
+        self.flight.do('key', self.slow(1))
+        self.flight.do('key', self.slow(1))
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.flight.stats()['coalesced'], 0)
+
+
+class AsyncSingleFlightTest(unittest.TestCase):
+
+    def test_coalesce(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return value
+
+        async def main():
+            return await asyncio.gather(
+                *(flight.do('a', lambda: fetch('a')) for _ in range(5)),
+                flight.do('b', lambda: fetch('b'))
+            )
+
+        self.assertEqual(asyncio.run(main()), ['a'] * 5 + ['b'])
+        self.assertEqual(sorted(calls), ['a', 'b'])
+        self.assertEqual(flight.stats(), {'leaders': 2, 'coalesced': 4, 'inflight': 0})
+
+    def test_cancelled_leader(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {'id': 1}
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do('key', fetch))
+            await asyncio.sleep(0.01)
+            follower = asyncio.ensure_future(flight.do('key', fetch))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        self.assertEqual(asyncio.run(main()), {'id': 1})
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(flight.stats()['inflight'], 0)
+
+    def test_deadline_and_private_errors(self):
+        flight = AsyncSingleFlight(BaseClient._timedOut)
+        errors = [exceptions.DeadlineExceeded('leader')]
+
+        async def fetch():
+            await asyncio.sleep(0.1)
+            if errors:
+                raise errors.pop(0)
+            return 'value'
+
+        async def follow():
+            await asyncio.sleep(0.01)
+            with deadline(0.02):
+                return await flight.do('key', fetch)
+
+        async def main():
+            return await asyncio.gather(flight.do('key', fetch), follow(), flight.do('key', fetch),
+                                        return_exceptions=True)
+
+        leader, follower, other = asyncio.run(main())
+        self.assertIsInstance(leader, exceptions.DeadlineExceeded)
+        self.assertIsInstance(follower, exceptions.DeadlineExceeded)
+        self.assertEqual(str(follower), "Error: the deadline of the call has expired.")
+        self.assertEqual(other, 'value')
+
+
+if __name__ == "__main__":
+    unittest.main()
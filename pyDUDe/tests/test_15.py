@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the retry policy and the retry budget
+#
+
+import unittest
+
+from pyDUDe.retry import RetryBudget, RetryPolicy
+
+
+class RetryBudgetTest(unittest.TestCase):
+
+    def test_burst(self):
+        budget = RetryBudget(ratio=0.1, burst=2)
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        self.assertEqual(budget.stats()['denied'], 1)
+
+    def test_ratio(self):
+        budget = RetryBudget(ratio=0.5, burst=1)
+        budget.withdraw()
+
+        budget.deposit()
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+    def test_capacity(self):
+        budget = RetryBudget(ratio=1.0, burst=3)
+        for _ in range(10):
+            budget.deposit()
+        self.assertEqual(budget.stats()['tokens'], 3.0)
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.policy = RetryPolicy(attempts=3, backoff=0.1, backoff_max=0.3, budget=RetryBudget(burst=100))
+
+    def test_full_jitter(self):
+        for attempt in range(1, 6):
+            delay = self.policy.delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(0.3, 0.1 * 2 ** (attempt - 1)))
+
+    def test_attempts(self):
+        self.assertIsNotNone(self.policy.retry(1, idempotent=True, status=503))
+        self.assertIsNotNone(self.policy.retry(2, idempotent=True, status=503))
+        self.assertIsNone(self.policy.retry(3, idempotent=True, status=503))
+
+    def test_statuses(self):
+        self.assertIsNone(self.policy.retry(1, idempotent=True, status=500))
+        self.assertIsNone(self.policy.retry(1, idempotent=True, status=404))
+        self.assertIsNotNone(self.policy.retry(1, idempotent=True, status=502))
+
+    def test_idempotency(self):
+        # a create may have been executed by the server
+        self.assertIsNone(self.policy.retry(1, idempotent=False, status=503))
+        self.assertIsNone(self.policy.retry(1, idempotent=False, sent=True))
+
+        # but it is safe to retry when the connection failed
+        self.assertIsNotNone(self.policy.retry(1, idempotent=False, sent=False))
+
+    def test_budget(self):
+        policy = RetryPolicy(attempts=5, budget=RetryBudget(ratio=0.0, burst=1))
+        self.assertIsNotNone(policy.retry(1, idempotent=True, status=503))
+        self.assertIsNone(policy.retry(2, idempotent=True, status=503))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the circuit breakers
+#
+
+import time
+import unittest
+
+import pyDUDe
+
+from pyDUDe import exceptions
+from pyDUDe.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers
+from pyDUDe.stub import StubServer
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.breaker = CircuitBreaker(error_rate=0.5, min_requests=4, window=10.0, cooldown=0.1, probes=2)
+
+    def trip(self):
+        for _ in range(4):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(True)
+
+    def test_closed_below_minimum(self):
+        for _ in range(3):
+            self.breaker.record(True)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_closed_below_error_rate(self):
+        for failed in (True, False, False, False, True, False):
+            self.breaker.record(failed)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_open(self):
+        self.trip()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_half_open_recovery(self):
+        self.trip()
+        time.sleep(0.15)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+        # only the trial requests are let through
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record(False)
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_failure(self):
+        self.trip()
+        time.sleep(0.15)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(True)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_release(self):
+        self.trip()
+        time.sleep(0.15)
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+    def test_families(self):
+        breakers = CircuitBreakers(min_requests=1)
+        breakers.get('users').record(True)
+        breakers.get('validate').record(False)
+
+        self.assertIs(breakers.get('users'), breakers.get('users'))
+        self.assertEqual(breakers.states(), {'users': OPEN, 'validate': CLOSED})
+
+
+class ClientBreakerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer().start()
+        cls.server.populate()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.server.reset()
+        self.server.populate()
+        self.client = pyDUDe.Client(self.server.config(retry_attempts=1, circuit_min_requests=2,
+                                                       circuit_error_rate=0.5))
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_client_errors(self):
+        for _ in range(4):
+            with self.assertRaises(exceptions.NotFound):
+                self.client.getSingleUser(user_id=999)
+
+        self.assertEqual(self.client.circuitStats()['users']['failures'], 0)
+        self.assertEqual(self.client.circuitStates()['users'], CLOSED)
+
+    def test_caller_limits(self):
+        self.server.inject(latency=0.2)
+        for _ in range(2):
+            with self.assertRaises(exceptions.ConnectionError):
+                self.client.getSingleUser(user_id=1, timeout=0.05)
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                with self.client.deadline(0.05):
+                    self.client.getSingleUser(user_id=1)
+
+        self.assertEqual(self.client.circuitStats()['users']['requests'], 0)
+        self.assertEqual(self.client.circuitStates()['users'], CLOSED)
+
+    def test_server_errors(self):
+        self.server.inject(error_rate=1.0)
+        for _ in range(2):
+            with self.assertRaises(exceptions.UnknownError):
+                self.client.getSingleUser(user_id=1)
+
+        self.assertEqual(self.client.circuitStates()['users'], OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
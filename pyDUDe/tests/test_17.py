@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the timeouts and the deadlines
+#
+
+import asyncio
+import time
+import unittest
+
+from pyDUDe import DUDeConfig, exceptions
+from pyDUDe.deadline import callTimeout, deadline, remaining, withTimeout
+
+from tests.test_10 import FakeClient
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def test_no_deadline(self):
+        self.assertIsNone(remaining())
+
+    def test_nested(self):
+        with deadline(1.0) as outer:
+            self.assertLessEqual(remaining(), 1.0)
+
+            # a nested deadline cannot extend the enclosing one
+            with deadline(10.0) as inner:
+                self.assertEqual(inner, outer)
+
+            with deadline(0.1) as inner:
+                self.assertLess(inner, outer)
+
+        self.assertIsNone(remaining())
+
+    def test_call_timeout(self):
+        def endpoint():
+            return callTimeout()
+
+        def pages():
+            yield callTimeout()
+            yield callTimeout()
+
+        async def coroutine():
+            return callTimeout()
+
+        self.assertIsNone(withTimeout(None, endpoint))
+        self.assertEqual(withTimeout(0.5, endpoint), 0.5)
+        self.assertEqual(list(withTimeout(0.5, pages)), [0.5, 0.5])
+        self.assertEqual(asyncio.run(withTimeout(0.5, coroutine)), 0.5)
+        self.assertIsNone(callTimeout())
+
+
+class ClientTimeoutsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.client = FakeClient()
+        self.client.config = DUDeConfig(hostname='dude', connect_timeout=2.0, read_timeout=0)
+
+    def test_configuration(self):
+        self.assertEqual(self.client._timeouts(), (2.0, None))
+
+    def test_override(self):
+        self.assertEqual(withTimeout(0.3, self.client._timeouts), (0.3, 0.3))
+
+    def test_deadline(self):
+        with self.client.deadline(0.5):
+            connect, read = self.client._timeouts()
+            self.assertLessEqual(connect, 0.5)
+            self.assertLessEqual(read, 0.5)
+
+        with self.client.deadline(0.01):
+            time.sleep(0.02)
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                self.client._timeouts()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the load balancing between several servers
+#
+
+import time
+import unittest
+
+from pyDUDe.balancer import Balancer
+from pyDUDe.config import DUDeConfig
+from pyDUDe.context import RequestContext
+from pyDUDe.core import Client
+
+
+BASES = ['http://a:1', 'http://b:2', 'http://c:3']
+
+
+class BalancerTest(unittest.TestCase):
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            Balancer(BASES, strategy='random')
+
+    def test_round_robin(self):
+        balancer = Balancer(BASES)
+        picked = []
+        for _ in range(6):
+            server = balancer.pick()
+            balancer.done(server, 0.01, False)
+            picked.append(server.base)
+        self.assertEqual(picked, BASES + BASES)
+
+    def test_least_outstanding(self):
+        balancer = Balancer(BASES, strategy='least-outstanding')
+        first = balancer.pick()
+        second = balancer.pick()
+        self.assertNotEqual(first, second)
+
+        balancer.done(first, 0.01, False)
+        third = balancer.pick()
+        fourth = balancer.pick()
+        self.assertNotIn(fourth, (second, third))
+
+    def test_ewma(self):
+        balancer = Balancer(BASES, strategy='ewma')
+        for server, latency in zip(balancer.servers, (0.3, 0.01, 0.2)):
+            balancer.pick([s for s in balancer.servers if s is not server])
+            balancer.done(server, latency, False)
+
+        self.assertEqual(balancer.pick().base, 'http://b:2')
+
+    def test_exclude(self):
+        balancer = Balancer(BASES)
+        server = balancer.pick()
+        balancer.done(server, 0.01, True)
+        for _ in range(5):
+            other = balancer.pick([server])
+            balancer.done(other, 0.01, False)
+            self.assertIsNot(other, server)
+
+    def test_ejection(self):
+        balancer = Balancer(BASES[:2], eject_after=2, eject_time=0.1)
+        failing = balancer.servers[0]
+        for _ in range(2):
+            balancer.pick([balancer.servers[1]])
+            balancer.done(failing, 0.01, True)
+
+        self.assertEqual(balancer.stats()['http://a:1']['state'], 'down')
+        for _ in range(4):
+            server = balancer.pick()
+            balancer.done(server, 0.01, False)
+            self.assertIsNot(server, failing)
+
+        time.sleep(0.15)
+        self.assertEqual(balancer.stats()['http://a:1']['state'], 'up')
+
+    def test_all_down(self):
+        balancer = Balancer(BASES[:2], eject_after=1)
+        for server in balancer.servers:
+            balancer.pick([s for s in balancer.servers if s is not server])
+            balancer.done(server, 0.01, True)
+
+        self.assertIn(balancer.pick(), balancer.servers)
+
+    def test_stats(self):
+        balancer = Balancer(BASES[:1])
+        server = balancer.pick()
+        self.assertEqual(balancer.stats()['http://a:1']['outstanding'], 1)
+        balancer.done(server, 0.01, True)
+        stats = balancer.stats()['http://a:1']
+        self.assertEqual((stats['outstanding'], stats['requests'], stats['errors']), (0, 1, 1))
+
+
+class ServersConfigTest(unittest.TestCase):
+
+    def test_single_server(self):
+        ctx = RequestContext.build(DUDeConfig(hostname='dude', port=8080))
+        self.assertIsNone(ctx.balancer)
+        self.assertEqual(ctx.base, 'https://dude:8080')
+
+    def test_several_servers(self):
+        config = DUDeConfig(servers=['dude1', 'dude2:9000', 'http://dude3:80'], port=8080, balancer='ewma')
+        ctx = RequestContext.build(config)
+        self.assertEqual([server.base for server in ctx.balancer.servers],
+                         ['https://dude1:8080', 'https://dude2:9000', 'http://dude3:80'])
+        self.assertEqual(ctx.balancer.strategy, 'ewma')
+
+    def test_state_kept(self):
+        client = Client(DUDeConfig(servers=['dude1', 'dude2']))
+        ctx = client._context()
+        client.config.read_timeout = 12.0
+        client.config.retry_attempts = 5
+        after = client._context()
+        self.assertIsNot(after, ctx)
+        self.assertIs(after.balancer, ctx.balancer)
+        self.assertIs(after.retry.budget, ctx.retry.budget)
+        self.assertIs(after.breakers, ctx.breakers)
+
+        client.config.circuit_window = 30.0
+        client.config.servers = ['dude1', 'dude3']
+        changed = client._context()
+        self.assertIsNot(changed.breakers, ctx.breakers)
+        self.assertIsNot(changed.balancer, ctx.balancer)
+        self.assertIs(changed.retry.budget, ctx.retry.budget)
+
+        client.config = DUDeConfig(servers=['dude1', 'dude3'], retry_budget_burst=5, circuit_window=30.0)
+        self.assertIs(client._context().balancer, changed.balancer)
+        self.assertIsNot(client._context().retry.budget, ctx.retry.budget)
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the independent client instances
+#
+
+import unittest
+
+import pyDUDe
+
+from pyDUDe.deadline import callTimeout
+
+
+class ClientInstancesTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.client = pyDUDe.Client(pyDUDe.DUDeConfig(hostname='tenant1', validate_cache=True))
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_shared_instance(self):
+        self.assertIs(pyDUDe.Client(), pyDUDe.Client())
+        self.assertIsNot(self.client, pyDUDe.Client())
+
+    def test_isolation(self):
+        other = pyDUDe.Client(pyDUDe.DUDeConfig(hostname='tenant2', validate_cache=True))
+        self.assertIsNot(other, self.client)
+        self.assertEqual(self.client._context().base, 'https://tenant1:5000')
+        self.assertEqual(other._context().base, 'https://tenant2:5000')
+        self.assertIsNot(self.client._context().retry.budget, other._context().retry.budget)
+        self.assertIsNot(self.client.decisionCache, other.decisionCache)
+        self.assertIsNot(self.client._flights, other._flights)
+        self.assertIsNot(self.client._getSession(), other._getSession())
+        other.close()
+
+    def test_endpoints(self):
+        self.client._call = lambda *args, **kwargs: (self.client, callTimeout())
+        self.assertEqual(self.client.version(), (self.client, None))
+        self.assertEqual(self.client.version(timeout=0.5), (self.client, 0.5))
+        self.assertNotIn('_call', vars(pyDUDe.Client()))
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.client.notAnEndpoint
+
+    def test_context_manager(self):
+        with pyDUDe.Client(pyDUDe.DUDeConfig()) as client:
+            session = client._getSession()
+            self.assertIs(client._getSession(), session)
+        self.assertIsNone(client._session)
+
+    def test_fork(self):
+        session = self.client._getSession()
+        self.client._pid = -1
+        self.assertIsNot(self.client._getSession(), session)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the client from several threads
+#
+
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pyDUDe
+
+from pyDUDe.config import DUDeConfig
+from pyDUDe.context import RequestContext
+from pyDUDe.stub import StubServer, makeToken
+
+
+class ThreadSafetyTest(unittest.TestCase):
+
+    THREADS = 16
+    ITERATIONS = 30
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer().start()
+        cls.server.populate(units=1, teams=1, users=47, rights=1)
+        cls.token = makeToken({'sub': 'StoryBuilder', 'exp': time.time() + 3600}, cls.server.secret)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def config(self, **kwargs) -> DUDeConfig:
+        return self.server.config(circuit_breaker=False, **kwargs)
+
+    def test_config_swapped_during_request(self):
+        client = pyDUDe.Client(self.config())
+        bases = []
+        request = client._request
+
+        def swap(**kwargs):
+            bases.append(client._context().base)
+            client.config = DUDeConfig(hostname='other')
+            bases.append(client._context().base)
+            return request(**kwargs)
+
+        client._request = swap
+        self.assertTrue(client.validate(email='user1.1@company1.com', right='right1', token=self.token))
+        self.assertEqual(bases[0], bases[1])
+        self.assertEqual(client._context().base, 'https://other:5000')
+        client.close()
+
+    def test_generation_read_first(self):
+        config = self.config()
+        ctx = RequestContext.build(config)
+        config.hostname = 'other'
+        self.assertNotEqual(ctx.generation, config.generation)
+
+    def test_threads(self):
+        client = pyDUDe.Client(self.config())
+        configs = [self.config(pool_maxsize=4), self.config(pool_maxsize=8, validate_cache=True)]
+        stop = threading.Event()
+
+        def swapper():
+            n = 0
+            while not stop.is_set():
+                n += 1
+                client.config = configs[n % 2]
+                client.config.read_timeout = 10.0 + (n % 3)
+                stop.wait(0.002)
+
+        def worker(index):
+            for i in range(self.ITERATIONS):
+                email = f'user1.{1 + (i + index) % 47}@company1.com'
+                self.assertTrue(client.validate(email=email, right='right1', token=self.token))
+                self.assertFalse(client.validate(email=email, right='right2', token=self.token))
+                if i % 10 == 0:
+                    self.assertEqual(len(list(client.getAllUsers())), 47)
+
+            return index
+
+        thread = threading.Thread(target=swapper)
+        thread.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+                results = list(executor.map(worker, range(self.THREADS)))
+        finally:
+            stop.set()
+            thread.join()
+            client.close()
+
+        self.assertEqual(results, list(range(self.THREADS)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the token manager
+#
+
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pyDUDe
+
+from pyDUDe import exceptions
+from pyDUDe.auth import TokenManager
+from pyDUDe.tokens import jwtClaims
+
+from tests.test_10 import FakeClient
+from tests.test_11 import makeToken
+
+
+class AuthClient(FakeClient):
+    """FakeClient issuing tokens with a given lifetime"""
+
+    def __init__(self, lifetime: float) -> None:
+        super().__init__()
+        self.lifetime = lifetime
+        self.issued = 0
+        self.fail = False
+        self.delay = 0.0
+
+    def authenticate(self, *, appname, apikey):
+        time.sleep(self.delay)
+        if self.fail:
+            raise exceptions.ConnectionError('down')
+
+        self.issued += 1
+        now = time.time()
+        return makeToken({'sub': appname, 'iat': now, 'exp': now + self.lifetime, 'n': self.issued})
+
+
+class TokenManagerTest(unittest.TestCase):
+
+    def test_cached(self):
+        client = AuthClient(lifetime=60)
+        manager = TokenManager(client, appname='StoryBuilder', apikey='key')
+        token = manager.token()
+        self.assertEqual(manager.token(), token)
+        self.assertEqual(client.issued, 1)
+        self.assertAlmostEqual(manager.stats()['expires_in'], 60, delta=1)
+
+    def test_refresh_time(self):
+        client = AuthClient(lifetime=100)
+        manager = TokenManager(client, appname='StoryBuilder', apikey='key', refresh_ratio=0.8, jitter=0.1)
+        manager.token()
+        self.assertGreaterEqual(manager._refresh_at - time.time(), 69)
+        self.assertLessEqual(manager._refresh_at - time.time(), 80)
+
+    def test_proactive_refresh(self):
+        client = AuthClient(lifetime=0.5)
+        manager = TokenManager(client, appname='StoryBuilder', apikey='key', refresh_ratio=0.2, jitter=0)
+        first = manager.token()
+        time.sleep(0.15)
+        second = manager.token()
+        self.assertNotEqual(first, second)
+        self.assertEqual(client.issued, 2)
+
+    def test_refresh_failure_keeps_token(self):
+        client = AuthClient(lifetime=0.5)
+        manager = TokenManager(client, appname='StoryBuilder', apikey='key', refresh_ratio=0.2, jitter=0)
+        token = manager.token()
+        client.fail = True
+        time.sleep(0.15)
+        self.assertEqual(manager.token(), token)
+        self.assertEqual(manager.stats()['failures'], 1)
+
+        time.sleep(0.4)
+        with self.assertRaises(exceptions.ConnectionError):
+            manager.token()
+
+    def test_single_flight(self):
+        client = AuthClient(lifetime=60)
+        client.delay = 0.05
+        manager = TokenManager(client, appname='StoryBuilder', apikey='key')
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = set(executor.map(lambda _: manager.token(), range(16)))
+
+        self.assertEqual(len(tokens), 1)
+        self.assertEqual(client.issued, 1)
+
+    def test_invalidate(self):
+        client = AuthClient(lifetime=60)
+        manager = TokenManager(client, appname='StoryBuilder', apikey='key')
+        token = manager.token()
+        manager.invalidate()
+        self.assertNotEqual(manager.token(), token)
+
+    def test_background(self):
+        client = AuthClient(lifetime=0.3)
+        with TokenManager(client, appname='StoryBuilder', apikey='key', refresh_ratio=0.5, jitter=0) as manager:
+            token = manager.token()
+            time.sleep(0.5)
+            self.assertGreaterEqual(client.issued, 3)
+
+            # the token was refreshed in the background, not by the call
+            issued = client.issued
+            self.assertNotEqual(manager.token(), token)
+            self.assertGreaterEqual(jwtClaims(manager.token())['n'], issued)
+
+        issued = client.issued
+        time.sleep(0.3)
+        self.assertEqual(client.issued, issued)
+
+    def test_validate(self):
+        client = AuthClient(lifetime=60)
+        with self.assertRaises(ValueError):
+            client.validate(email='user1@acme.com', right='read')
+
+        manager = TokenManager(client, appname='StoryBuilder', apikey='key')
+        client._call = lambda *args, body, **kwargs: body['token']
+        self.assertEqual(client.validate(email='user1@acme.com', right='read'), manager.token())
+        self.assertEqual(client.validate(email='user1@acme.com', right='read', token='other'), 'other')
+
+    def test_async_client(self):
+        client = pyDUDe.AsyncClient(pyDUDe.DUDeConfig(hostname='dude'))
+        with self.assertRaises(TypeError):
+            TokenManager(client, appname='StoryBuilder', apikey='key')
+
+        manager = TokenManager(AuthClient(lifetime=60), appname='StoryBuilder', apikey='key')
+        with self.assertRaises(TypeError):
+            manager.attach(client)
+        self.assertIsNone(client.tokens)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the stub of the DUDe server
+#
+
+import time
+import unittest
+
+import requests
+
+import pyDUDe
+
+from pyDUDe.stub import StubServer
+
+
+class StubServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.server.reset()
+        self.client = pyDUDe.Client(self.server.config(retry_attempts=1, circuit_breaker=False))
+        self.url = self.client._url('users')
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_pagination(self):
+        self.server.populate(units=1, teams=1, users=45)
+        data = requests.get(self.url, params={'offset': 41, 'limit': 100}).json()
+        self.assertEqual((data['offset'], data['limit'], data['count']), (41, 20, 5))
+        self.assertEqual([user['id'] for user in data['users']], [41, 42, 43, 44, 45])
+        self.assertEqual(len(list(self.client.getAllUsers())), 45)
+
+    def test_error_envelope(self):
+        response = requests.get(self.client._url('users', path='1'))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('message', response.json()['error'])
+
+        with self.assertRaises(pyDUDe.exceptions.NotFound):
+            self.client.getSingleUser(user_id=1)
+
+    def test_etag(self):
+        self.server.populate(units=1, teams=1, users=5)
+        response = requests.get(self.url, params={'offset': 1, 'limit': 10})
+        etag = response.headers['ETag']
+
+        response = requests.get(self.url, params={'offset': 1, 'limit': 10}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.client.updateSingleUser(user_id=1, name='John DOE')
+        response = requests.get(self.url, params={'offset': 1, 'limit': 10}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_cascade(self):
+        self.server.populate(companies=2, units=1, teams=1, users=3)
+        self.client.deleteSingleCompany(company_id=1)
+        self.assertEqual(len(list(self.client.getAllUsers())), 3)
+        self.assertEqual(len(list(self.client.getAllUserRights())), 9)
+
+    def test_auth_and_validate(self):
+        self.server.populate(units=1, teams=1, users=1, rights=1)
+        self.server.apikeys['Software 1.1'] = 'key'
+        with self.assertRaises(pyDUDe.exceptions.Unauthenticated):
+            self.client.authenticate(appname='Software 1.1', apikey='other')
+        with self.assertRaises(pyDUDe.exceptions.NotFound):
+            self.client.authenticate(appname='Unknown', apikey='key')
+
+        token = self.client.authenticate(appname='Software 1.1', apikey='key')
+        self.assertTrue(self.client.validate(email='user1.1@company1.com', right='right1', token=token))
+        self.assertFalse(self.client.validate(email='user1.1@company1.com', right='right2', token=token))
+        with self.assertRaises(pyDUDe.exceptions.Unauthenticated):
+            self.client.validate(email='user1.1@company1.com', right='right1', token='invalid')
+
+    def test_injected_latency(self):
+        self.server.inject(latency=0.05)
+        start = time.perf_counter()
+        self.client.version()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+    def test_injected_errors(self):
+        self.server.inject(error_rate=1.0, error_status=500)
+        with self.assertRaises(pyDUDe.exceptions.InternalServerError):
+            self.client.version()
+
+        self.server.inject(error_rate=0.5)
+        statuses = {requests.get(self.client._url('version')).status_code for _ in range(50)}
+        self.assertEqual(statuses, {200, 503})
+
+    def test_reset(self):
+        self.server.populate(users=2)
+        self.client.version()
+        self.server.reset()
+        self.assertEqual(list(self.client.getAllCompanies()), [])
+        self.assertEqual(self.client.createCompany(name='ACME Corp'), 1)
+        self.assertEqual(self.server.requests[('GET', 'companies')], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the metrics of the requests
+#
+
+import asyncio
+import unittest
+
+import pyDUDe
+
+from pyDUDe.metrics import Histogram, OpenTelemetryHook, Registry, trace
+from pyDUDe.stub import StubServer
+
+try:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+except ImportError:
+    TracerProvider = None
+
+
+class RecordingHook:
+    """Hook keeping the requests it receives"""
+
+    def __init__(self) -> None:
+        self.started = []
+        self.ended = []
+
+    def start(self, measure):
+        self.started.append(measure.endpoint)
+        return len(self.started)
+
+    def end(self, result, measure, error):
+        self.ended.append((result, measure.endpoint, measure.status, type(error).__name__ if error else None))
+
+
+class MetricsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.server.reset()
+        self.server.populate(units=1, teams=1, users=30, rights=1)
+        self.client = pyDUDe.Client(self.server.config(metrics=True, retry_backoff=0.001, circuit_breaker=False))
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_disabled(self):
+        client = pyDUDe.Client(self.server.config())
+        self.assertIsNone(client.metrics)
+        client.getSingleUser(user_id=1)
+        self.assertIsNone(client._metrics)
+        client.close()
+
+    def test_endpoints_and_statuses(self):
+        self.client.getSingleUser(user_id=1)
+        self.client.getSingleUser(user_id=2)
+        with self.assertRaises(pyDUDe.exceptions.NotFound):
+            self.client.getSingleUser(user_id=999)
+        self.client.createUser(team_id=1, name='John DOE', email='john@acme.com')
+
+        stats = self.client.metrics.stats()
+        self.assertEqual(stats['getSingleUser']['statuses'][200]['count'], 2)
+        self.assertEqual(stats['getSingleUser']['statuses'][404]['count'], 1)
+        self.assertGreater(stats['getSingleUser']['statuses'][200]['bytes_received'], 0)
+        self.assertEqual(stats['getSingleUser']['statuses'][200]['bytes_sent'], 0)
+        self.assertGreater(stats['createUser']['statuses'][201]['bytes_sent'], 0)
+        self.assertGreater(stats['createUser']['statuses'][201]['latency'], 0)
+
+    def test_pages_and_other(self):
+        self.assertEqual(len(list(self.client.getAllUsers(limit=10))), 30)
+        self.assertEqual(len(list(self.client.scan('users', workers=2, total=30))), 30)
+
+        stats = self.client.metrics.stats()
+        self.assertEqual(stats['getAllUsers']['statuses'][200]['count'], 4)
+        self.assertIn('other', stats)
+
+    def test_retries_and_errors(self):
+        self.server.inject(error_rate=1.0)
+        with self.assertRaises(pyDUDe.exceptions.UnknownError):
+            self.client.version()
+
+        statuses = self.client.metrics.stats()['version']['statuses']
+        self.assertEqual(statuses[503]['count'], 1)
+        self.assertEqual(statuses[503]['retries'], 2)
+
+        # no response
+        client = pyDUDe.Client(pyDUDe.DUDeConfig(scheme='http', hostname='127.0.0.1', port=1, metrics=True,
+                                                 retry_attempts=1, circuit_breaker=False))
+        with self.assertRaises(pyDUDe.exceptions.ConnectionError):
+            client.version()
+
+        self.assertEqual(client.metrics.stats()['version']['statuses'][0]['count'], 1)
+        client.close()
+
+    def test_cache_hits(self):
+        self.client.config.validate_cache = True
+        token = self.client.authenticate(appname='Software 1.1', apikey='key')
+        for _ in range(3):
+            self.assertTrue(self.client.validate(email='user1.1@company1.com', right='right1', token=token))
+
+        stats = self.client.metrics.stats()['validate']
+        self.assertEqual(stats['cache_hits'], 2)
+        self.assertEqual(stats['statuses'][200]['count'], 1)
+
+    def test_prometheus(self):
+        self.client.getSingleUser(user_id=1)
+        self.client.metrics.hit('validate')
+        text = self.client.metrics.prometheus()
+
+        self.assertIn('# TYPE pydude_requests_total counter', text)
+        self.assertIn('pydude_requests_total{endpoint="getSingleUser",status="200"} 1', text)
+        self.assertIn('pydude_request_duration_seconds_bucket{endpoint="getSingleUser",status="200",le="+Inf"} 1', text)
+        self.assertIn('pydude_request_duration_seconds_count{endpoint="getSingleUser",status="200"} 1', text)
+        self.assertIn('pydude_cache_hits_total{endpoint="validate"} 1', text)
+
+    def test_histogram(self):
+        histogram = Histogram((0.1, 0.2, 0.4))
+        for value in (0.05, 0.15, 0.15, 0.3, 1.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [(0.1, 1), (0.2, 3), (0.4, 4), (float('inf'), 5)])
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.175)
+        self.assertEqual(histogram.quantile(0.99), 0.4)
+
+    def test_hooks_and_shared_registry(self):
+        registry = Registry()
+        hook = RecordingHook()
+        registry.addHook(hook)
+
+        other = pyDUDe.Client(self.server.config(metrics=True))
+        self.client.metrics = other.metrics = registry
+
+        self.client.getSingleUser(user_id=1)
+        with self.assertRaises(pyDUDe.exceptions.NotFound):
+            other.getSingleUser(user_id=999)
+        other.close()
+
+        self.assertEqual(hook.started, ['getSingleUser', 'getSingleUser'])
+        self.assertEqual(hook.ended, [(1, 'getSingleUser', 200, None), (2, 'getSingleUser', 404, 'NotFound')])
+        self.assertEqual(sorted(registry.stats()['getSingleUser']['statuses']), [200, 404])
+
+        registry.removeHook(hook)
+        self.client.getSingleUser(user_id=1)
+        self.assertEqual(len(hook.started), 2)
+
+    @unittest.skipIf((trace is None) or (TracerProvider is None), "requires the opentelemetry-sdk package")
+    def test_opentelemetry(self):
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        self.client.metrics.addHook(OpenTelemetryHook(provider.get_tracer('test')))
+
+        self.client.getSingleUser(user_id=1)
+        with self.assertRaises(pyDUDe.exceptions.NotFound):
+            self.client.getSingleUser(user_id=999)
+
+        ok, failed = exporter.get_finished_spans()
+        self.assertEqual(ok.name, 'DUDe getSingleUser')
+        self.assertEqual(ok.attributes['http.response.status_code'], 200)
+        self.assertEqual(ok.attributes['http.request.method'], 'GET')
+        self.assertFalse(failed.status.is_ok)
+        self.assertEqual(failed.attributes['http.response.status_code'], 404)
+
+    def test_async(self):
+        async def run():
+            async with pyDUDe.AsyncClient(self.server.config(metrics=True)) as client:
+                await client.getSingleUser(user_id=1)
+                await client.createUser(team_id=1, name='John DOE', email='john@acme.com')
+                self.assertEqual(len([user async for user in client.getAllUsers(limit=10)]), 31)
+                return client.metrics.stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual(stats['getSingleUser']['statuses'][200]['count'], 1)
+        self.assertGreater(stats['createUser']['statuses'][201]['bytes_sent'], 0)
+        self.assertEqual(stats['getAllUsers']['statuses'][200]['count'], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the export of the directory
+#
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import pyDUDe
+
+from pyDUDe.export import Exporter, _ints, _strings, readColumnar, readNdjson
+from pyDUDe.paginator import Paginator
+from pyDUDe.stub import StubServer
+
+
+# entity type -> paginated endpoint
+GETALL = {
+    'companies': 'getAllCompanies',
+    'units': 'getAllUnits',
+    'teams': 'getAllTeams',
+    'users': 'getAllUsers',
+    'rights': 'getAllRights',
+    'software': 'getAllSoftware',
+    'user-rights': 'getAllUserRights',
+}
+
+
+class FailingClient(pyDUDe.Client):
+    """Client failing after a number of pages"""
+
+    pages = 0
+
+    def _page(self, url, offset, limit, decode=None):
+        if self.pages <= 0:
+            raise pyDUDe.exceptions.ConnectionError('down')
+
+        self.pages -= 1
+        return super()._page(url, offset, limit, decode)
+
+
+class ExportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer().start()
+        cls.server.populate(companies=2, units=2, teams=2, users=15, rights=2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.client = pyDUDe.Client(self.server.config(retry_attempts=1, circuit_breaker=False))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.tmp.cleanup()
+
+    def expected(self, entity):
+        return list(getattr(self.client, GETALL[entity])())
+
+    def test_ndjson(self):
+        stats = Exporter(self.client, directory=self.directory).run()
+        self.assertEqual(sorted(stats.entities), sorted(GETALL))
+        for entity in GETALL:
+            records = list(readNdjson(os.path.join(self.directory, f'{entity}.ndjson')))
+            self.assertEqual(records, self.expected(entity))
+            self.assertEqual(stats.entities[entity].records, len(records))
+
+    def test_columnar(self):
+        Exporter(self.client, directory=self.directory, format='columnar').run()
+        for entity in GETALL:
+            tables = list(readColumnar(os.path.join(self.directory, f'{entity}.dcol')))
+            self.assertEqual([row.asDict() for table in tables for row in table], self.expected(entity))
+
+        ndjson = Exporter(self.client, directory=self.directory, entities=['user-rights']).run()
+        self.assertLess(os.path.getsize(os.path.join(self.directory, 'user-rights.dcol')), ndjson.size / 3)
+
+    def test_sequential(self):
+        parallel = Exporter(self.client, directory=os.path.join(self.directory, 'a')).run()
+        sequential = Exporter(self.client, directory=os.path.join(self.directory, 'b')).run(parallel=False)
+        self.assertEqual(parallel.records, sequential.records)
+        for entity in GETALL:
+            with open(os.path.join(self.directory, 'a', f'{entity}.ndjson'), 'rb') as a, \
+                 open(os.path.join(self.directory, 'b', f'{entity}.ndjson'), 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_resume(self):
+        for format in ('ndjson', 'columnar'):
+            client = FailingClient(self.server.config(retry_attempts=1, circuit_breaker=False))
+            client.pages = 7
+            exporter = Exporter(client, directory=self.directory, format=format, entities=['user-rights'],
+                                checkpoint_pages=3)
+            with self.assertRaises(pyDUDe.exceptions.ConnectionError):
+                exporter.run()
+
+            # resumed after the 6 pages of the last checkpoint
+            client.pages = 1000
+            stats = exporter.run()
+            self.assertEqual(stats.resumed, 6 * 20)
+            self.assertEqual(stats.records + stats.resumed, len(self.expected('user-rights')))
+            client.close()
+
+        records = list(readNdjson(os.path.join(self.directory, 'user-rights.ndjson')))
+        self.assertEqual(records, self.expected('user-rights'))
+        tables = list(readColumnar(os.path.join(self.directory, 'user-rights.dcol')))
+        self.assertEqual([row.asDict() for table in tables for row in table], records)
+
+    def test_done_and_restart(self):
+        Exporter(self.client, directory=self.directory, entities=['users']).run()
+        stats = Exporter(self.client, directory=self.directory, entities=['users']).run()
+        self.assertEqual((stats.records, stats.resumed, stats.pages), (0, 120, 0))
+
+        stats = Exporter(self.client, directory=self.directory, entities=['users'], restart=True).run()
+        self.assertEqual((stats.records, stats.resumed), (120, 0))
+        self.assertEqual(len(list(readNdjson(os.path.join(self.directory, 'users.ndjson')))), 120)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Exporter(self.client, directory=self.directory, format='parquet')
+        with self.assertRaises(ValueError):
+            Exporter(self.client, directory=self.directory, entities=['groups'])
+
+        path = os.path.join(self.directory, 'users.dcol')
+        with open(path, 'wb') as fh:
+            fh.write(b'{"id": 1}\n')
+        with self.assertRaises(ValueError):
+            list(readColumnar(path))
+
+        Exporter(self.client, directory=self.directory, format='columnar', entities=['users']).run()
+        size = os.path.getsize(path)
+        with open(path, 'ab') as fh:
+            fh.write(b'\x01\x00')
+        with self.assertRaises(ValueError):
+            list(readColumnar(path))
+
+        with open(path, 'r+b') as fh:
+            fh.truncate(size - 10)
+        with self.assertRaises(ValueError):
+            list(readColumnar(path))
+
+    def test_column_encoding(self):
+        self.assertEqual(_ints([1, -2]), b'b\x01\xfe')
+        self.assertEqual(_ints([1, 70000]), b'i' + (1).to_bytes(4, 'little') + (70000).to_bytes(4, 'little'))
+        self.assertEqual(_ints([1 << 40]), b'q' + (1 << 40).to_bytes(8, 'little'))
+        self.assertEqual(_strings(['ab', None]), b'\x02\x00\x00\x00\xff\xff\xff\xffab')
+
+    def test_paginator_offset(self):
+        fetched = []
+
+        def fetch(offset, limit):
+            fetched.append(offset)
+            count = max(0, min(limit, 46 - offset))
+            return { 'count': count, 'limit': limit, 'offset': offset }
+
+        pages = list(Paginator(fetch, limit=10, offset=21))
+        self.assertEqual(fetched, [21, 31, 41])
+        self.assertEqual(sum(page['count'] for page in pages), 25)
+
+    def test_cli(self):
+        host, port = self.server.address
+        env = os.path.join(self.directory, '.env')
+        with open(env, 'w') as fh:
+            fh.write(f"SCHEME=http\nHOSTNAME={host}\nPORT={port}\n")
+
+        output = os.path.join(self.directory, 'snapshot')
+        result = subprocess.run([sys.executable, '-m', 'pyDUDe.export', output, '--env', env,
+                                 '--format', 'columnar', '--entities', 'users,rights'],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('users', result.stdout)
+        self.assertEqual(sorted(name for name in os.listdir(output) if name.endswith('.dcol')),
+                         ['rights.dcol', 'users.dcol'])
+
+
+if __name__ == "__main__":
+    unittest.main()
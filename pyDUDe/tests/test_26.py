@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the AsyncClient against the server
+#
+
+import asyncio
+import unittest
+
+import pyDUDe
+
+from pyDUDe.stub import StubServer
+from tests.server import ServerTestCase
+
+
+class AsyncClientTest(ServerTestCase):
+
+    def run_async(self, fn):
+        async def main():
+            async with pyDUDe.AsyncClient(self.client.config) as client:
+                return await fn(client)
+
+        return asyncio.run(main())
+
+    async def team(self, client):
+        cid = await client.createCompany(name='ACME Corp')
+        uid = await client.createCompanyUnit(company_id=cid, name='Marketing')
+        return await client.createUnitTeam(unit_id=uid, name='Press')
+
+    def test_endpoints(self):
+        async def run(client):
+            self.assertIsNotNone(await client.version())
+
+            tid = await self.team(client)
+            user_id = await client.createTeamUser(team_id=tid, name='John DOE', email='john@acme.com')
+            right_id = await client.createTeamRight(team_id=tid, name='read')
+            await client.createUserRight(user_id=user_id, right_id=right_id)
+
+            self.assertTrue(await client.updateSingleUser(user_id=user_id, name='Jane DOE'))
+            self.assertEqual((await client.getSingleUser(user_id=user_id))['name'], 'Jane DOE')
+
+            with self.assertRaises(pyDUDe.exceptions.BadRequest):
+                await client.createTeamUser(team_id=tid, name='Jane DOE', email='john@acme.com')
+
+            self.assertTrue(await client.deleteSingleUser(user_id=user_id))
+            with self.assertRaises(pyDUDe.exceptions.NotFound):
+                await client.getSingleUser(user_id=user_id)
+
+        self.run_async(run)
+
+    def test_paginator(self):
+        async def run(client):
+            tid = await self.team(client)
+            users = [{'team_id': tid, 'name': f'User {i}', 'email': f'user{i}@acme.com'} for i in range(45)]
+            await client.createUsers(users=users)
+
+            records = [user async for user in client.getAllUsers(limit=10)]
+            self.assertEqual(sorted(user['email'] for user in records), sorted(user['email'] for user in users))
+            self.assertEqual(len([user async for user in client.getTeamUsers(team_id=tid, limit=20)]), 45)
+
+        self.run_async(run)
+
+    def test_bulk(self):
+        async def run(client):
+            tid = await self.team(client)
+            users = [{'team_id': tid, 'name': f'User {i}', 'email': f'user{i}@acme.com'} for i in range(5)]
+            users.insert(2, dict(users[0]))
+
+            results = await client.createUsers(users=users, window=2)
+            self.assertIsInstance(results[2], pyDUDe.exceptions.BadRequest)
+            self.assertEqual(len({result for result in results if isinstance(result, int)}), 5)
+
+            results = await client.createUsers(users=users, window=1, stop_on_error=True)
+            self.assertIsInstance(results[0], pyDUDe.exceptions.BadRequest)
+            self.assertEqual(results[1:], [None] * 5)
+
+        self.run_async(run)
+
+    def test_many(self):
+        async def run(client):
+            tid = await self.team(client)
+            ids = [await client.createTeamUser(team_id=tid, name=f'User {i}', email=f'user{i}@acme.com')
+                   for i in range(3)]
+
+            results = await client.getManyUsers(user_ids=ids + [ids[0], 999], window=2)
+            self.assertEqual(sorted(results), sorted(ids + [999]))
+            self.assertEqual(results[ids[1]]['email'], 'user1@acme.com')
+            self.assertIsInstance(results[999], pyDUDe.exceptions.NotFound)
+
+        self.run_async(run)
+
+    def test_scan(self):
+        async def run(client):
+            tid = await self.team(client)
+            users = [{'team_id': tid, 'name': f'User {i}', 'email': f'user{i}@acme.com'} for i in range(55)]
+            await client.createUsers(users=users)
+
+            expected = [user async for user in client.getAllUsers()]
+            self.assertEqual([user async for user in client.scan('users', workers=3)], expected)
+
+            unordered = [user async for user in client.scan('users', workers=3, total=55, ordered=False)]
+            self.assertEqual(sorted(user['id'] for user in unordered), [user['id'] for user in expected])
+
+        self.run_async(run)
+
+
+class AsyncSessionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer().start()
+        cls.server.populate()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def test_config_changed_in_flight(self):
+        self.server.inject(latency=0.2)
+
+        async def run():
+            async with pyDUDe.AsyncClient(self.server.config(coalesce_requests=False)) as client:
+                first = [asyncio.ensure_future(client.getSingleUser(user_id=i)) for i in range(1, 6)]
+                await asyncio.sleep(0.05)
+                session = client._session
+
+                client.config.pool_maxsize = 3
+                second = [asyncio.ensure_future(client.getSingleUser(user_id=i)) for i in range(1, 6)]
+                await asyncio.sleep(0.05)
+                self.assertIn(session, client._stale)
+                self.assertFalse(session.closed)
+
+                users = await asyncio.gather(*first, *second)
+                self.assertEqual(client._stale, [])
+                self.assertTrue(session.closed)
+                return users
+
+        try:
+            users = asyncio.run(run())
+        finally:
+            self.server.inject()
+
+        self.assertEqual([user['id'] for user in users], [1, 2, 3, 4, 5] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the connection pool of the Client
+#
+
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pyDUDe
+
+from pyDUDe.stub import StubServer
+
+
+class PoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = StubServer().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.server.inject()
+        self.client = pyDUDe.Client(self.server.config(pool_keepalive=0.3, coalesce_requests=False))
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def concurrent(self, count):
+        self.server.inject(latency=0.1)
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            for future in [executor.submit(self.client.version) for _ in range(count)]:
+                future.result()
+        self.server.inject()
+
+    def test_reuse(self):
+        for _ in range(5):
+            self.client.version()
+
+        self.assertEqual(self.client.poolStats(), {'created': 1, 'reused': 4, 'idle': 1})
+
+    def test_idle_session(self):
+        self.client.version()
+        time.sleep(0.4)
+        self.client.version()
+
+        stats = self.client.poolStats()
+        self.assertEqual((stats['created'], stats['reused']), (2, 0))
+
+    def test_idle_connection(self):
+        self.concurrent(2)
+        self.assertEqual(self.client.poolStats()['created'], 2)
+
+        # the last connection released is kept busy, the other one becomes idle
+        for _ in range(5):
+            self.client.version()
+            time.sleep(0.1)
+        self.assertEqual(self.client.poolStats()['created'], 2)
+
+        self.concurrent(2)
+        self.assertEqual(self.client.poolStats()['created'], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the creation of several entities with concurrent requests
+#
+
+import threading
+import time
+import unittest
+
+import pyDUDe
+
+from tests.server import ServerTestCase
+
+
+class CountingClient(pyDUDe.Client):
+    """Client answering the requests after a delay and counting the requests in flight"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.peak = 0
+
+    def _call(self, request, url, **kwargs):
+        with self.lock:
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+
+        time.sleep(0.02)
+        with self.lock:
+            self.inflight -= 1
+
+        return kwargs['body']['name']
+
+
+class BulkTest(ServerTestCase):
+
+    def team(self):
+        cid = self.client.createCompany(name='ACME Corp')
+        uid = self.client.createCompanyUnit(company_id=cid, name='Marketing')
+        return self.client.createUnitTeam(unit_id=uid, name='Press')
+
+    def test_create_users(self):
+        tid = self.team()
+        users = [{'team_id': tid, 'name': f'User {i}', 'email': f'user{i}@acme.com'} for i in range(12)]
+        users.insert(5, dict(users[1]))
+
+        results = self.client.createUsers(users=users, window=4)
+        self.assertIsInstance(results[5], pyDUDe.exceptions.BadRequest)
+
+        ids = results[:5] + results[6:]
+        self.assertEqual(len(set(ids)), 12)
+        for user, user_id in zip(users[:5] + users[6:], ids):
+            self.assertEqual(self.client.getSingleUser(user_id=user_id)['email'], user['email'])
+
+    def test_create_rights(self):
+        tid = self.team()
+        rights = [{'team_id': tid, 'name': f'right{i}'} for i in range(6)] + [{'team_id': 999, 'name': 'other'}]
+
+        results = self.client.createRights(rights=rights, window=3)
+        self.assertEqual([self.client.getSingleRight(right_id=right_id)['name'] for right_id in results[:6]],
+                         [f'right{i}' for i in range(6)])
+        self.assertIsInstance(results[6], Exception)
+
+    def test_create_user_rights(self):
+        tid = self.team()
+        user_ids = [self.client.createTeamUser(team_id=tid, name=f'User {i}', email=f'user{i}@acme.com')
+                    for i in range(3)]
+        right_id = self.client.createTeamRight(team_id=tid, name='read')
+
+        userrights = [{'user_id': user_id, 'right_id': right_id} for user_id in user_ids]
+        results = self.client.createUserRights(userrights=userrights + [{'user_id': 999, 'right_id': right_id}])
+        self.assertEqual([self.client.getSingleUserRight(userright_id=userright_id)['user_id']
+                          for userright_id in results[:3]], user_ids)
+        self.assertIsInstance(results[3], Exception)
+
+    def test_stop_on_error(self):
+        tid = self.team()
+        users = [{'team_id': tid, 'name': f'User {i}', 'email': f'user{i}@acme.com'} for i in range(6)]
+        self.client.createUser(**users[2])
+
+        results = self.client.createUsers(users=users, window=1, stop_on_error=True)
+        self.assertIsInstance(results[0], int)
+        self.assertIsInstance(results[1], int)
+        self.assertIsInstance(results[2], pyDUDe.exceptions.BadRequest)
+        self.assertEqual(results[3:], [None] * 3)
+
+        # the remaining users have not been sent to the server
+        self.assertEqual(len(list(self.client.getAllUsers())), 3)
+
+
+class WindowTest(unittest.TestCase):
+
+    def test_capped_by_max_workers(self):
+        client = CountingClient(pyDUDe.DUDeConfig(hostname='dude', max_workers=3))
+        users = [{'team_id': 1, 'name': f'User {i}', 'email': f'user{i}@acme.com'} for i in range(12)]
+
+        results = client.createUsers(users=users, window=10)
+        self.assertEqual(results, [user['name'] for user in users])
+        self.assertLessEqual(client.peak, 3)
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
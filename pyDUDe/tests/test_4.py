@@ -4,28 +4,12 @@
 # This unit will test the /users endpoint
 #
 
-import os
-import time
-import unittest
-
 import pyDUDe
 
+from tests.server import ServerTestCase
 
-class UserTest(unittest.TestCase):
-
-    def setUp(self) -> None:
-        self.client = pyDUDe.Client()
-        self.client.config.readFile()
 
-        # remove the file
-        try:
-            os.unlink(os.environ['DUDE_SERVER_DATABASE'])
-        except FileNotFoundError:
-            pass
-
-        # restart the server
-        os.kill(int(os.environ['DUDE_SERVER_PID']), 1)
-        time.sleep(float(os.environ['DUDE_SERVER_WAIT_TIME']))
+class UserTest(ServerTestCase):
 
     def test_create_user(self):
         cid = self.client.createCompany(name='ACME Corp')
@@ -141,3 +125,15 @@ class UserTest(unittest.TestCase):
 
         with self.assertRaises(pyDUDe.exceptions.BadRequest):
             self.client.updateSingleUser(user_id=usr1, team_id=tid2)
+
+    def test_get_many_users(self):
+        cid = self.client.createCompany(name='ACME Corp')
+        uid = self.client.createUnit(company_id=cid, name='Marketing')
+        tid = self.client.createTeam(unit_id=uid, name='Press')
+        usr1 = self.client.createUser(team_id=tid, name='John', email='john@acme.com')
+        usr2 = self.client.createUser(team_id=tid, name='Jane', email='jane@acme.com')
+
+        users = self.client.getManyUsers(user_ids=[usr2, usr1, usr2, 42])
+        self.assertEqual(list(users.keys()), [usr2, usr1, 42])
+        self.assertEqual(users[usr1]['email'], 'john@acme.com')
+        self.assertIsInstance(users[42], pyDUDe.exceptions.NotFound)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the decision cache of the validate endpoint
+#
+
+import base64
+import json
+import time
+import unittest
+
+from pyDUDe.cache import DecisionCache
+
+
+def make_token(exp: float) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({'exp': exp}).encode()).decode().rstrip('=')
+    return f"e30.{payload}.signature"
+
+
+class DecisionCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.token = make_token(time.time() + 3600)
+
+    def test_hit_and_miss(self):
+        cache = DecisionCache()
+        key = ('john@acme.com', 'read', self.token)
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, True)
+        self.assertTrue(cache.get(key))
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_lru_eviction(self):
+        cache = DecisionCache(maxsize=2)
+        keys = [(f'user{i}@acme.com', 'read', self.token) for i in range(3)]
+
+        cache.put(keys[0], True)
+        cache.put(keys[1], True)
+        cache.get(keys[0])
+        cache.put(keys[2], True)
+
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertTrue(cache.get(keys[0]))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_deny_ttl(self):
+        cache = DecisionCache(allow_ttl=60, deny_ttl=0.01)
+        key = ('john@acme.com', 'write', self.token)
+
+        cache.put(key, False)
+        self.assertFalse(cache.get(key))
+
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_token_expiry(self):
+        cache = DecisionCache(allow_ttl=60)
+        key = ('john@acme.com', 'read', make_token(time.time() - 1))
+
+        cache.put(key, True)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+#
+# This unit will test the paginator engine and the sharded scans
+#
+
+import asyncio
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pyDUDe.paginator import Paginator, AsyncPaginator
+from pyDUDe.scan import AsyncScanner, Scanner, probeTotal, shardRanges
+
+
+class FakeEndpoint:
+
+    def __init__(self, total: int, server_limit: int = 20) -> None:
+        self.records = list(range(1, total + 1))
+        self.server_limit = server_limit
+        self.calls = []
+
+    def fetch(self, offset: int, limit: int):
+        self.calls.append(offset)
+        limit = min(limit, self.server_limit)
+        page = self.records[offset - 1:offset - 1 + limit]
+        return { 'records': page, 'count': len(page), 'limit': limit, 'offset': offset }
+
+    async def afetch(self, offset: int, limit: int):
+        await asyncio.sleep(0)
+        return self.fetch(offset, limit)
+
+
+def records(pages):
+    return [item for page in pages for item in page['records']]
+
+
+class PaginatorTest(unittest.TestCase):
+
+    def test_serial(self):
+        endpoint = FakeEndpoint(47)
+        self.assertEqual(records(Paginator(endpoint.fetch, limit=10)), endpoint.records)
+        self.assertEqual(endpoint.calls, [1, 11, 21, 31, 41])
+
+    def test_exact_multiple(self):
+        endpoint = FakeEndpoint(40)
+        self.assertEqual(records(Paginator(endpoint.fetch, limit=10)), endpoint.records)
+
+    def test_read_ahead(self):
+        endpoint = FakeEndpoint(95)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pages = Paginator(endpoint.fetch, limit=10, window=4, executor=executor)
+            self.assertEqual(records(pages), endpoint.records)
+
+    def test_server_limit(self):
+        endpoint = FakeEndpoint(95, server_limit=7)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pages = Paginator(endpoint.fetch, limit=20, window=3, executor=executor)
+            self.assertEqual(records(pages), endpoint.records)
+
+    def test_async_read_ahead(self):
+        endpoint = FakeEndpoint(95)
+
+        async def collect():
+            return [page async for page in AsyncPaginator(endpoint.afetch, limit=10, window=4)]
+
+        self.assertEqual(records(asyncio.run(collect())), endpoint.records)
+
+
+class ScanTest(unittest.TestCase):
+
+    def test_shard_ranges(self):
+        self.assertEqual(shardRanges(0, 4), [(1, None)])
+        self.assertEqual(shardRanges(100, 4), [(1, 25), (26, 50), (51, 75), (76, None)])
+
+    def test_probe_total(self):
+        for total in (0, 1, 2, 20, 47, 1000):
+            self.assertEqual(probeTotal(FakeEndpoint(total).fetch), total)
+
+    def test_ordered(self):
+        endpoint = FakeEndpoint(347)
+        records = list(Scanner(endpoint.fetch, 'records', workers=4))
+        self.assertEqual(records, endpoint.records)
+
+    def test_unordered(self):
+        endpoint = FakeEndpoint(347)
+        records = list(Scanner(endpoint.fetch, 'records', workers=4, ordered=False))
+        self.assertEqual(sorted(records), endpoint.records)
+
+    def test_outdated_total(self):
+        endpoint = FakeEndpoint(347)
+        records = list(Scanner(endpoint.fetch, 'records', workers=4, total=100))
+        self.assertEqual(records, endpoint.records)
+
+    def test_async_ordered(self):
+        endpoint = FakeEndpoint(347)
+
+        async def collect():
+            return [record async for record in AsyncScanner(endpoint.afetch, 'records', workers=4)]
+
+        self.assertEqual(asyncio.run(collect()), endpoint.records)